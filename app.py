@@ -1,21 +1,26 @@
 # app/main.py
 import streamlit as st
-from qdrant_client import QdrantClient
 
 from src.vector_db.search_strategy import QdrantSearcher
+from src.vector_db.cache import SearchCache
 from src.vector_db.client import QdrantIngestor
+from src.vector_db.connection import get_qdrant_client
 from src.embedding.embedding import ModelEmbeddings
-from src.llm.llm import LLMConfig, LLMGenerator
+from src.llm.llm import NOT_FOUND_MESSAGE, LLMConfig, LLMGenerator
+from src.serving.pipeline import QueryPipeline
 from src.utils.logger import Logger
 from src.utils.config import get_settings
 from src.utils.text_cleaner import TextCleaner
+from src.utils.warmup import warm_up
 
 # ==============================
 # 🔹 Init logger
 # ==============================
 logger = Logger(name="STREAMLIT_APP").get_logger()
 settings = get_settings()
-client = QdrantClient(host="localhost", port=6333)  # hoặc "127.0.0.1"
+# Load weights embedding trong nền trong lúc kết nối Qdrant / dựng corpus
+warm_up(settings)
+client = get_qdrant_client()  # REST/gRPC, timeout... cấu hình qua Settings
 
 # 2️⃣ Khởi tạo embedding model
 embedding_model = ModelEmbeddings(
@@ -23,6 +28,7 @@ embedding_model = ModelEmbeddings(
     task="retrieval.passage",
     device="cpu",
     log_name="EMBEDDING",
+    backend=settings.EMBED_BACKEND,
 )
 
 # 3️⃣ Khởi tạo Qdrant ingestor
@@ -35,6 +41,17 @@ qdrant_ingestor = QdrantIngestor(
     reset_collection=False,
 )
 
+# Node mới: nạp collection + keyword index từ snapshot thay vì embedding lại
+corpus = None
+if settings.SNAPSHOT_PATH:
+    from src.vector_db.snapshot import bootstrap_from_snapshot
+
+    corpus = bootstrap_from_snapshot(
+        qdrant_ingestor,
+        settings.SNAPSHOT_PATH,
+        parallel=settings.SNAPSHOT_IMPORT_PARALLEL,
+    )
+
 # 4️⃣ TextCleaner
 text_cleaner = TextCleaner("TextCleaner")
 
@@ -45,6 +62,9 @@ searcher = QdrantSearcher(
     collection_name=settings.COLLECTION_NAME,
     text_cleaner=text_cleaner,
     log_name="SearcherDemo",
+    cache=SearchCache.from_settings(),
+    payload_fields=["text", "source", "page_number"],
+    corpus=corpus,
 )
 
 
@@ -62,8 +82,15 @@ def get_llm():
     return LLMGenerator(config=config)
 
 
+@st.cache_resource(show_spinner=False)
+def get_pipeline():
+    # Answerability gate: bằng chứng yếu → trả fallback ngay, không gọi LLM
+    return QueryPipeline.from_settings(searcher=get_searcher(), llm=get_llm())
+
+
 searcher = get_searcher()
 llm = get_llm()
+pipeline = get_pipeline()
 
 # ==============================
 # 🔹 Streamlit UI
@@ -85,22 +112,35 @@ use_hybrid = st.checkbox("Sử dụng hybrid search", value=True)
 if st.button("Gửi câu hỏi") and user_query.strip():
     with st.spinner("🔍 Retrieving context..."):
         try:
-            if use_hybrid:
-                contexts = searcher.hybrid_search(
-                    query=user_query, top_k=top_k, alpha=0.9
-                )
-            else:
-                contexts = searcher.semantic_search(query=user_query, top_k=top_k)
+            retrieval = pipeline.retrieve(
+                query=user_query,
+                top_k=top_k,
+                mode="hybrid" if use_hybrid else "semantic",
+                alpha=0.9,
+            )
+            contexts = retrieval.contexts
 
-            if not contexts:
+            if not retrieval.answerable:
                 st.warning("Không tìm thấy thông tin phù hợp trong tài liệu!")
             else:
                 st.success(f"✅ Tìm thấy {len(contexts)} context(s).")
 
         except Exception as e:
             st.error(f"❌ Lỗi khi search: {e}")
+            retrieval = None
             contexts = []
 
+    if retrieval is not None and retrieval.decision and not retrieval.answerable:
+        # Gate chặn: trả câu trả lời mẫu ngay, không tốn một lượt gọi LLM
+        st.markdown("### 🧠 Câu trả lời:")
+        st.info(NOT_FOUND_MESSAGE)
+        st.caption(
+            f"Gate: {retrieval.decision.reason} — semantic "
+            f"{retrieval.decision.semantic_top:.3f}, keyword "
+            f"{retrieval.decision.keyword_top:.3f}, agreement "
+            f"{retrieval.decision.agreement:.2f}"
+        )
+
     if contexts:
         with st.spinner("💬 Generating answer..."):
             response = llm.generate_answer(
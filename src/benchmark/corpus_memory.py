@@ -0,0 +1,182 @@
+"""
+Benchmark bộ nhớ keyword corpus của QdrantSearcher: cách cũ (list point_id +
+list token của từng chunk + BM25Okapi) so với CompactCorpus (vocab + token id
+trong mảng liên tục + offset + postings), đo bằng tracemalloc.
+
+Kiểm tra luôn điểm BM25 hai cách giống hệt nhau và so sánh thời gian truy vấn.
+
+Ví dụ:
+    python -m src.benchmark.corpus_memory --chunks 100000
+    python -m src.benchmark.corpus_memory --chunks 200000 --vocab 50000 --output mem.json
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+from src.vector_db.compact_corpus import CompactCorpus
+
+
+@dataclass
+class CorpusMemoryResult:
+    """Kết quả đo cho một cách lưu corpus."""
+
+    label: str
+    chunks: int
+    tokens: int
+    build_s: float
+    bytes_total: int
+    bytes_per_chunk: float
+    query_ms: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def synthetic_corpus(
+    n: int, vocab_size: int = 30000, tokens_per_chunk: int = 120, seed: int = 42
+) -> Tuple[List[str], List[List[str]]]:
+    """Chunk giả với tần suất từ kiểu Zipf; id dạng md5 hex như QdrantIngestor."""
+    rng = random.Random(seed)
+    vocab = [f"tok{i}" for i in range(vocab_size)]
+    weights = [1.0 / (rank + 1) for rank in range(vocab_size)]
+    ids = [uuid.UUID(int=rng.getrandbits(128)).hex for _ in range(n)]
+    tokenized = [
+        rng.choices(
+            vocab, weights, k=rng.randint(tokens_per_chunk // 2, tokens_per_chunk)
+        )
+        for _ in range(n)
+    ]
+    return ids, tokenized
+
+
+def _traced(build: Callable[[], Any]) -> Tuple[Any, int, float]:
+    """Build trong tracemalloc; trả về (object, byte còn giữ, thời gian build)."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return obj, retained, elapsed
+
+
+def _query_ms(
+    score: Callable[[List[str]], np.ndarray], queries: List[List[str]]
+) -> float:
+    started = time.perf_counter()
+    for q in queries:
+        np.argsort(score(q))[::-1][:10]
+    return (time.perf_counter() - started) * 1000.0 / max(len(queries), 1)
+
+
+def run_benchmark(
+    chunks: int, vocab_size: int, tokens_per_chunk: int, queries: int, seed: int
+) -> Tuple[List[CorpusMemoryResult], bool]:
+    ids, tokenized = synthetic_corpus(chunks, vocab_size, tokens_per_chunk, seed)
+    rng = random.Random(seed + 1)
+    query_tokens = [
+        rng.sample(tokenized[rng.randrange(chunks)], 3) for _ in range(queries)
+    ]
+    total_tokens = sum(len(t) for t in tokenized)
+
+    # Cách cũ: giữ lại ids + tokenized_corpus + BM25Okapi. Token list dựng lại
+    # từ text như khi scroll Qdrant (string mới cho mỗi chunk, không dùng chung).
+    texts = [" ".join(t) for t in tokenized]
+    del tokenized
+
+    def build_legacy() -> Tuple[List[str], List[List[str]], BM25Okapi]:
+        point_ids = [str(i) for i in ids]
+        tokenized_corpus = [text.split() for text in texts]
+        return point_ids, tokenized_corpus, BM25Okapi(tokenized_corpus)
+
+    legacy, legacy_bytes, legacy_s = _traced(build_legacy)
+    legacy_ms = _query_ms(legacy[2].get_scores, query_tokens)
+    legacy_scores = [legacy[2].get_scores(q) for q in query_tokens[:20]]
+    del legacy
+    gc.collect()
+
+    def build_compact() -> CompactCorpus:
+        corpus = CompactCorpus()
+        for point_id, text in zip(ids, texts):
+            corpus.add(point_id, text.split())
+        return corpus.finalize()
+
+    compact, compact_bytes, compact_s = _traced(build_compact)
+    compact_ms = _query_ms(compact.get_scores, query_tokens)
+    identical = all(
+        np.array_equal(expected, compact.get_scores(q))
+        for expected, q in zip(legacy_scores, query_tokens)
+    )
+
+    results = [
+        CorpusMemoryResult(
+            label, chunks, total_tokens, build_s, size, size / chunks, query_ms
+        )
+        for label, build_s, size, query_ms in (
+            ("legacy", legacy_s, legacy_bytes, legacy_ms),
+            ("compact", compact_s, compact_bytes, compact_ms),
+        )
+    ]
+    return results, identical
+
+
+def format_results(results: Sequence[CorpusMemoryResult]) -> str:
+    """Định dạng kết quả dạng bảng text."""
+    header = (
+        f"{'corpus':>8} {'chunks':>8} {'tokens':>10} {'build (s)':>10} "
+        f"{'MB':>9} {'bytes/chunk':>12} {'query (ms)':>11}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.label:>8} {r.chunks:>8} {r.tokens:>10} {r.build_s:>10.2f} "
+            f"{r.bytes_total / 1e6:>9.1f} {r.bytes_per_chunk:>12.1f} "
+            f"{r.query_ms:>11.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bộ nhớ keyword corpus")
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--vocab", type=int, default=30000)
+    parser.add_argument("--tokens-per-chunk", type=int, default=120)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Ghi kết quả JSON ra file")
+    args = parser.parse_args()
+
+    results, identical = run_benchmark(
+        args.chunks, args.vocab, args.tokens_per_chunk, args.queries, args.seed
+    )
+    print(format_results(results))
+    legacy, compact = results
+    print(
+        f"\nBộ nhớ giảm {legacy.bytes_per_chunk / compact.bytes_per_chunk:.1f}x; "
+        f"điểm BM25 giống hệt: {identical}"
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"identical": identical, "results": [r.to_dict() for r in results]},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Benchmark các backend suy luận embedding trên CPU (torch fp32 / int8 / onnx).
+
+Với mỗi backend: thời gian load model, latency embed một query (p50/p95),
+latency một batch document (p50/p95), throughput (texts/giây) và độ lệch so với
+fp32 — cosine giữa vector của backend và vector "torch" trên cùng tập text
+(mean / min). Backend không dùng được trong môi trường hiện tại được ghi nhận
+qua cột `active` (quay về torch).
+
+Để chạy nhanh có thể dùng một model nhỏ lưu local (thư mục `save()` của
+SentenceTransformer), VD:
+    python -m src.benchmark.embedding_backends --model models/minilm \\
+        --backends torch,int8,onnx --texts 256 --min-cosine 0.99
+
+Exit code 1 nếu có backend có min cosine dưới ngưỡng (mặc định
+EMBED_BACKEND_MIN_COSINE), dùng được như bước kiểm tra trước khi đổi EMBED_BACKEND.
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.benchmark.embedding_throughput import load_texts, synthetic_texts
+from src.embedding.backends import BACKENDS, compare_embeddings
+from src.utils.config import get_settings
+from src.utils.lazy import optional_import
+
+
+@dataclass
+class BackendResult:
+    """Kết quả đo cho một backend."""
+
+    backend: str
+    active: str
+    load_s: float
+    query_p50_ms: float
+    query_p95_ms: float
+    batch_p50_ms: float
+    batch_p95_ms: float
+    texts_per_s: float
+    mean_cosine: Optional[float] = None
+    min_cosine: Optional[float] = None
+    passed: Optional[bool] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _p50_p95(values_s: Sequence[float]) -> Tuple[float, float]:
+    import numpy as np
+
+    p50, p95 = np.percentile(np.asarray(values_s) * 1000.0, [50, 95])
+    return float(p50), float(p95)
+
+
+def run_backend(
+    model_name: str,
+    backend: str,
+    texts: List[str],
+    queries: List[str],
+    batch_size: int = 32,
+) -> Tuple[BackendResult, List[List[float]]]:
+    """Load model với `backend`, đo latency / throughput; trả kèm embedding của `texts`."""
+    from src.embedding.embedding import ModelEmbeddings
+
+    settings = get_settings()
+    started = time.perf_counter()
+    model = ModelEmbeddings(
+        model_name=model_name,
+        task=settings.JINA_TASK,
+        device="cpu",
+        log_name=f"BackendBenchmark-{backend}",
+        backend=backend,
+        verify=False,  # đo độ lệch thật của backend, không quay về fp32
+    )
+    model.model  # chờ load xong
+    load_s = time.perf_counter() - started
+
+    model.embed_documents(texts[:batch_size])  # warm-up
+
+    query_s = []
+    for q in queries:
+        t0 = time.perf_counter()
+        model.embed_query(q)
+        query_s.append(time.perf_counter() - t0)
+
+    batch_s, embeddings = [], []
+    for i in range(0, len(texts), batch_size):
+        t0 = time.perf_counter()
+        embeddings.extend(model.embed_documents(texts[i : i + batch_size]))
+        batch_s.append(time.perf_counter() - t0)
+
+    query_p50, query_p95 = _p50_p95(query_s)
+    batch_p50, batch_p95 = _p50_p95(batch_s)
+    total_s = sum(batch_s)
+    result = BackendResult(
+        backend=backend,
+        active=model.active_backend,
+        load_s=load_s,
+        query_p50_ms=query_p50,
+        query_p95_ms=query_p95,
+        batch_p50_ms=batch_p50,
+        batch_p95_ms=batch_p95,
+        texts_per_s=len(texts) / total_s if total_s > 0 else 0.0,
+    )
+    return result, embeddings
+
+
+def run(
+    model_name: str,
+    backends: Sequence[str],
+    texts: List[str],
+    queries: List[str],
+    batch_size: int = 32,
+    min_cosine: float = 0.99,
+) -> List[BackendResult]:
+    """Đo lần lượt các backend; "torch" luôn chạy trước để làm chuẩn fp32."""
+    order = ["torch"] + [b for b in backends if b != "torch"]
+    results, reference = [], None
+    for backend in order:
+        result, embeddings = run_backend(
+            model_name, backend, texts, queries, batch_size
+        )
+        if reference is None:
+            reference = embeddings
+        else:
+            accuracy = compare_embeddings(reference, embeddings, backend, min_cosine)
+            result.mean_cosine = accuracy.mean_cosine
+            result.min_cosine = accuracy.min_cosine
+            result.passed = accuracy.passed
+        if backend in backends:
+            results.append(result)
+    return results
+
+
+def format_results(results: Sequence[BackendResult]) -> str:
+    """Định dạng kết quả dạng bảng text."""
+    header = (
+        f"{'backend':>8} {'active':>7} {'load (s)':>9} {'query p50/p95 (ms)':>19} "
+        f"{'batch p50/p95 (ms)':>19} {'texts/s':>9} {'cos mean/min':>14}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        cosine = (
+            f"{r.mean_cosine:.4f}/{r.min_cosine:.4f}"
+            if r.min_cosine is not None
+            else "fp32"
+        )
+        lines.append(
+            f"{r.backend:>8} {r.active:>7} {r.load_s:>9.2f} "
+            f"{r.query_p50_ms:>9.1f}/{r.query_p95_ms:<9.1f} "
+            f"{r.batch_p50_ms:>9.1f}/{r.batch_p95_ms:<9.1f} "
+            f"{r.texts_per_s:>9.1f} {cosine:>14}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Benchmark backend embedding trên CPU")
+    parser.add_argument(
+        "--model",
+        default=settings.JINA_MODEL_NAME,
+        help="Tên model hoặc đường dẫn model lưu local",
+    )
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument(
+        "--input", help="File .txt / .jsonl chứa text (mặc định sinh ngẫu nhiên)"
+    )
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None, help="Số thread torch")
+    parser.add_argument(
+        "--min-cosine", type=float, default=settings.EMBED_BACKEND_MIN_COSINE
+    )
+    parser.add_argument("--output", help="Ghi kết quả JSON ra file")
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        parser.error(f"Backend không hợp lệ: {unknown} (chọn {BACKENDS})")
+
+    torch = optional_import("torch")
+    if args.threads and torch is not None:
+        torch.set_num_threads(args.threads)
+
+    if args.input:
+        texts = load_texts(args.input, args.texts)
+    else:
+        texts = synthetic_texts(args.texts)
+    queries = synthetic_texts(args.queries, min_words=3, max_words=15, seed=7)
+
+    results = run(
+        args.model, backends, texts, queries, args.batch_size, args.min_cosine
+    )
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "model": args.model,
+                    "texts": len(texts),
+                    "min_cosine": args.min_cosine,
+                    "results": [r.to_dict() for r in results],
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+    failed = [r.backend for r in results if r.passed is False]
+    if failed:
+        print(f"\n⚠️ Cosine so với fp32 dưới {args.min_cosine}: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
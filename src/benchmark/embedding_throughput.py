@@ -0,0 +1,184 @@
+"""
+Benchmark throughput embedding (texts/giây) khi tăng số worker của EmbeddingPool.
+
+So sánh với baseline một process (`ModelEmbeddings.embed_documents`, một lần
+encode với cấu hình thread mặc định của torch). Text lấy từ file (.txt mỗi dòng
+1 đoạn, hoặc .jsonl có field "text") hoặc sinh ngẫu nhiên với độ dài dao động.
+
+Ví dụ:
+    python -m src.benchmark.embedding_throughput --workers 1,2,4,8 --texts 4000
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.embedding.pool import EmbeddingPool
+from src.utils.config import get_settings
+
+_VOCAB = (
+    "mô hình image captioning sinh mô tả cho ảnh dựa trên encoder decoder attention "
+    "bộ dữ liệu huấn luyện đánh giá kết quả BLEU CIDEr đặc trưng CNN LSTM transformer "
+    "caption token câu văn hình ảnh đối tượng vùng ngữ cảnh"
+).split()
+
+
+@dataclass
+class ThroughputResult:
+    """Kết quả đo cho một cấu hình."""
+
+    label: str
+    workers: int
+    threads_per_worker: Optional[int]
+    texts: int
+    seconds: float
+    texts_per_s: float
+    speedup: float = 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def synthetic_texts(
+    n: int, min_words: int = 10, max_words: int = 300, seed: int = 42
+) -> List[str]:
+    """Sinh `n` đoạn text có độ dài (số từ) phân bố đều trong [min_words, max_words]."""
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choices(_VOCAB, k=rng.randint(min_words, max_words)))
+        for _ in range(n)
+    ]
+
+
+def load_texts(path: str, limit: Optional[int] = None) -> List[str]:
+    texts: List[str] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            texts.append(json.loads(line)["text"] if path.endswith(".jsonl") else line)
+            if limit and len(texts) >= limit:
+                break
+    return texts
+
+
+def _timed(
+    label: str,
+    workers: int,
+    threads: Optional[int],
+    texts: List[str],
+    embed: Callable[[List[str]], Any],
+) -> ThroughputResult:
+    started = time.perf_counter()
+    embed(texts)
+    seconds = time.perf_counter() - started
+    return ThroughputResult(
+        label=label,
+        workers=workers,
+        threads_per_worker=threads,
+        texts=len(texts),
+        seconds=seconds,
+        texts_per_s=len(texts) / seconds if seconds > 0 else 0.0,
+    )
+
+
+def run_baseline(texts: List[str]) -> ThroughputResult:
+    """Một process, một lần encode (đường cũ của ingest)."""
+    from src.embedding.embedding import get_embedding_model
+
+    settings = get_settings()
+    model = get_embedding_model(
+        model_name=settings.JINA_MODEL_NAME,
+        task=settings.JINA_TASK,
+        device=settings.DEVICE,
+        backend=settings.EMBED_BACKEND,
+    )
+    model.embed_documents(texts[:8])  # warm-up
+    return _timed("baseline", 1, None, texts, model.embed_documents)
+
+
+def run_pool(
+    texts: List[str],
+    workers: int,
+    threads_per_worker: Optional[int] = None,
+    batch_size: int = 32,
+) -> ThroughputResult:
+    """Đo một cấu hình pool; thời gian load model của worker không được tính."""
+    settings = get_settings()
+    pool = EmbeddingPool(
+        model_name=settings.JINA_MODEL_NAME,
+        task=settings.JINA_TASK,
+        device=settings.DEVICE,
+        num_workers=workers,
+        threads_per_worker=threads_per_worker,
+        batch_size=batch_size,
+        log_name="EmbeddingBenchmark",
+        backend=settings.EMBED_BACKEND,
+    )
+    with pool:
+        return _timed(
+            "pool", workers, pool.threads_per_worker, texts, pool.embed_documents
+        )
+
+
+def format_results(results: Sequence[ThroughputResult]) -> str:
+    """Định dạng kết quả dạng bảng text."""
+    header = (
+        f"{'config':>10} {'workers':>8} {'threads':>8} {'texts':>7} "
+        f"{'time (s)':>9} {'texts/s':>9} {'speedup':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.label:>10} {r.workers:>8} {str(r.threads_per_worker or '-'):>8} "
+            f"{r.texts:>7} {r.seconds:>9.2f} {r.texts_per_s:>9.1f} {r.speedup:>7.2f}x"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark throughput embedding")
+    parser.add_argument("--texts-file", help="File text (.txt hoặc .jsonl)")
+    parser.add_argument("--texts", type=int, default=2000, help="Số text")
+    parser.add_argument(
+        "--workers",
+        default=",".join(str(w) for w in (1, 2, 4, 8) if w <= (os.cpu_count() or 1)),
+        help="Danh sách số worker",
+    )
+    parser.add_argument("--threads-per-worker", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--no-baseline", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Ghi kết quả JSON ra file")
+    args = parser.parse_args()
+
+    if args.texts_file:
+        texts = load_texts(args.texts_file, limit=args.texts)
+    else:
+        texts = synthetic_texts(args.texts, seed=args.seed)
+
+    results: List[ThroughputResult] = []
+    if not args.no_baseline:
+        results.append(run_baseline(texts))
+    for workers in [int(x) for x in args.workers.split(",") if x.strip()]:
+        results.append(
+            run_pool(texts, workers, args.threads_per_worker, args.batch_size)
+        )
+
+    reference = results[0].texts_per_s
+    for r in results:
+        r.speedup = r.texts_per_s / reference if reference else 0.0
+
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([r.to_dict() for r in results], f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Đo thời gian import (cold start) của các module trong project.
+
+Mỗi module được import trong một process Python mới với `-X importtime`; từ stderr
+lấy thời gian cumulative của chính module đó và các import nặng nhất kéo theo,
+cùng wall time của cả process. Dùng để phát hiện import nặng bị kéo lên đầu module.
+
+Ví dụ:
+    python -m src.benchmark.import_time --repeat 3 --top 5
+    python -m src.benchmark.import_time --modules src.ingestion.splitter --max-ms 150
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+DEFAULT_MODULES = (
+    "src.utils.config",
+    "src.ingestion.pdf_reader",
+    "src.ingestion.splitter",
+    "src.embedding.embedding",
+    "src.vector_db.search_strategy",
+    "src.llm.llm",
+    "src.serving.pipeline",
+)
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+@dataclass
+class ImportTimeResult:
+    """Thời gian import của một module (median qua các lần chạy)."""
+
+    module: str
+    import_ms: float
+    wall_ms: float
+    runs: int
+    heaviest: List[Tuple[str, float]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Cumulative ms của từng module top-level trong output `-X importtime`."""
+    cumulative: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            name = match.group(4)
+            cumulative[name] = max(
+                cumulative.get(name, 0.0), int(match.group(2)) / 1000.0
+            )
+    return cumulative
+
+
+def _run_once(module: str) -> Tuple[Dict[str, float], float]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.getcwd(),
+    )
+    wall_ms = (time.perf_counter() - start) * 1000.0
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1:] or [""]
+        raise RuntimeError(f"Import {module} thất bại: {last[0]}")
+    return parse_importtime(proc.stderr), wall_ms
+
+
+def measure(module: str, repeat: int = 3, top: int = 5) -> ImportTimeResult:
+    """Import `module` `repeat` lần trong process mới, lấy median."""
+    runs = [_run_once(module) for _ in range(max(1, repeat))]
+    import_ms = statistics.median(r[0].get(module, 0.0) for r in runs)
+    wall_ms = statistics.median(r[1] for r in runs)
+
+    # Import nặng nhất: chỉ tính package gốc (numpy, qdrant_client...) ngoài project
+    roots: Dict[str, List[float]] = {}
+    for cumulative, _ in runs:
+        for name, ms in cumulative.items():
+            if "." in name or name == module.split(".")[0]:
+                continue
+            roots.setdefault(name, []).append(ms)
+    heaviest = sorted(
+        ((name, statistics.median(v)) for name, v in roots.items()),
+        key=lambda x: x[1],
+        reverse=True,
+    )[:top]
+    return ImportTimeResult(
+        module=module,
+        import_ms=import_ms,
+        wall_ms=wall_ms,
+        runs=len(runs),
+        heaviest=[(name, round(ms, 1)) for name, ms in heaviest],
+    )
+
+
+def format_results(results: Sequence[ImportTimeResult]) -> str:
+    """Định dạng bảng kết quả."""
+    header = f"{'module':<32} {'import_ms':>10} {'wall_ms':>9}  heaviest"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        heavy = ", ".join(f"{name} {ms:.0f}" for name, ms in r.heaviest)
+        lines.append(f"{r.module:<32} {r.import_ms:>10.1f} {r.wall_ms:>9.1f}  {heavy}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Đo thời gian import các module")
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5, help="Số import nặng nhất in ra")
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Exit code 1 nếu có module import lâu hơn ngưỡng (ms)",
+    )
+    parser.add_argument("--output", help="Ghi kết quả JSON ra file")
+    args = parser.parse_args()
+
+    modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+    results = [measure(m, args.repeat, args.top) for m in modules]
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([r.to_dict() for r in results], f, ensure_ascii=False, indent=2)
+
+    if args.max_ms is not None:
+        slow = [r for r in results if r.import_ms > args.max_ms]
+        if slow:
+            names = ", ".join(f"{r.module} ({r.import_ms:.0f} ms)" for r in slow)
+            print(f"\n⚠️ Vượt ngưỡng {args.max_ms:.0f} ms: {names}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,636 @@
+"""
+Load-test cho luồng truy vấn: QdrantSearcher.hybrid_search + LLMGenerator.generate_answer.
+
+Hỗ trợ:
+    - Chế độ open-loop (request đến theo phân phối Poisson với tốc độ cố định)
+      và closed-loop (N client, mỗi client gửi request mới ngay khi xong request cũ).
+    - Worker dạng thread (dùng chung 1 searcher/LLM) hoặc process (mỗi process
+      tự khởi tạo pipeline qua factory).
+    - Replay query log (.txt mỗi dòng 1 query, hoặc .jsonl có field "query"/"question")
+      hoặc query mix tổng hợp có trọng số.
+    - LLM giả lập có độ trễ cấu hình được (FakeLLMGenerator).
+
+Ví dụ:
+    python -m src.benchmark.load_test --queries data/queries.txt \\
+        --mode open --rate 5 --duration 30 --concurrency 1,2,4,8 --executor thread
+"""
+
+import argparse
+import importlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.logger import Logger
+
+DEFAULT_PIPELINE_FACTORY = "src.benchmark.load_test:build_default_pipeline"
+STAGES = ("queue", "search", "llm", "total")
+DEFAULT_QUERY_MIX = [
+    ("Mô hình image captioning hoạt động như thế nào?", 3.0),
+    ("Bộ dữ liệu nào được sử dụng để huấn luyện?", 2.0),
+    ("Kết quả đánh giá BLEU của mô hình là bao nhiêu?", 2.0),
+    ("Kiến trúc encoder-decoder gồm những thành phần nào?", 1.0),
+    ("Hạn chế của phương pháp đề xuất là gì?", 1.0),
+]
+
+
+# ==========================================================
+# 🔹 Cấu hình & báo cáo
+# ==========================================================
+@dataclass
+class LoadTestConfig:
+    """Cấu hình cho một lần chạy load-test."""
+
+    mode: str = "closed"  # "open" | "closed"
+    concurrency: int = 4
+    executor: str = "thread"  # "thread" | "process"
+    arrival_rate: float = 5.0  # request/giây, chỉ dùng cho open-loop
+    duration_s: float = 30.0
+    top_k: int = 3
+    alpha: float = 0.9
+    run_llm: bool = True
+    seed: int = 42
+
+
+@dataclass
+class LoadTestReport:
+    """Kết quả một lần chạy load-test."""
+
+    config: LoadTestConfig
+    requests: int
+    errors: int
+    error_rate: float
+    errors_by_stage: Dict[str, int]
+    throughput: float  # số request thành công / giây
+    offered_rate: Optional[float]
+    wall_time_s: float
+    max_in_flight: int
+    latency: Dict[str, Dict[str, float]]  # stage -> {mean, p50, p95, p99}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# ==========================================================
+# 🔹 Nguồn query
+# ==========================================================
+class QuerySource:
+    """
+    Cung cấp query cho các client một cách thread-safe.
+
+    - replay=True: lần lượt đi hết query log theo thứ tự rồi quay vòng.
+    - replay=False: chọn ngẫu nhiên theo trọng số (synthetic mix).
+    """
+
+    def __init__(
+        self,
+        queries: Sequence[str],
+        weights: Optional[Sequence[float]] = None,
+        replay: bool = True,
+        seed: int = 42,
+    ) -> None:
+        if not queries:
+            raise ValueError("❌ Danh sách query rỗng")
+        self.queries = list(queries)
+        self.weights = list(weights) if weights else None
+        self.replay = replay
+        self._rng = random.Random(seed)
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str, replay: bool = True, seed: int = 42) -> "QuerySource":
+        """
+        Đọc query từ file .txt (mỗi dòng 1 query) hoặc .jsonl
+        (field "query" hoặc "question", tuỳ chọn "weight").
+        """
+        queries: List[str] = []
+        weights: List[float] = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if Path(path).suffix.lower() == ".jsonl":
+                    record = json.loads(line)
+                    queries.append(record.get("query") or record.get("question", ""))
+                    weights.append(float(record.get("weight", 1.0)))
+                else:
+                    queries.append(line)
+                    weights.append(1.0)
+        return cls(queries, weights=weights, replay=replay, seed=seed)
+
+    @classmethod
+    def synthetic(
+        cls, mix: Sequence[Tuple[str, float]], seed: int = 42
+    ) -> "QuerySource":
+        """Tạo query mix tổng hợp từ danh sách (query, trọng số)."""
+        return cls(
+            [q for q, _ in mix], weights=[w for _, w in mix], replay=False, seed=seed
+        )
+
+    def next(self) -> str:
+        with self._lock:
+            if self.replay:
+                query = self.queries[self._cursor % len(self.queries)]
+                self._cursor += 1
+                return query
+            return self._rng.choices(self.queries, weights=self.weights, k=1)[0]
+
+
+# ==========================================================
+# 🔹 Pipeline
+# ==========================================================
+def build_default_pipeline(
+    llm_latency_ms: float = 800.0,
+    llm_jitter_ms: float = 200.0,
+    llm_error_rate: float = 0.0,
+    real_llm: bool = False,
+) -> Tuple[Any, Any]:
+    """
+    Khởi tạo searcher + LLM giống app.py, đọc cấu hình từ Settings.
+
+    Returns:
+        Tuple[QdrantSearcher, LLMGenerator]
+    """
+    from src.embedding.embedding import get_embedding_model
+    from src.llm.fake_llm import FakeLLMGenerator
+    from src.llm.llm import LLMConfig, LLMGenerator
+    from src.utils.config import get_settings
+    from src.utils.text_cleaner import TextCleaner
+    from src.vector_db.client import QdrantIngestor
+    from src.vector_db.connection import get_qdrant_client
+    from src.vector_db.search_strategy import QdrantSearcher
+
+    settings = get_settings()
+    client = get_qdrant_client()
+    embedding_model = get_embedding_model(
+        model_name=settings.JINA_MODEL_NAME,
+        task=settings.JINA_TASK,
+        device=settings.DEVICE,
+        backend=settings.EMBED_BACKEND,
+    )
+    ingestor = QdrantIngestor(
+        client=client,
+        collection_name=settings.COLLECTION_NAME,
+        vector_size=settings.VECTOR_SIZE,
+        device=settings.DEVICE,
+        log_name="LoadTestIngestor",
+        reset_collection=False,
+    )
+    searcher = QdrantSearcher(
+        embedding_model=embedding_model,
+        qdrant_db=ingestor,
+        collection_name=settings.COLLECTION_NAME,
+        text_cleaner=TextCleaner("TextCleaner"),
+        log_name="LoadTestSearcher",
+    )
+
+    if real_llm:
+        llm = LLMGenerator(config=LLMConfig.from_settings())
+    else:
+        llm = FakeLLMGenerator(
+            latency_ms=llm_latency_ms,
+            jitter_ms=llm_jitter_ms,
+            error_rate=llm_error_rate,
+        )
+    return searcher, llm
+
+
+def _load_factory(path: str) -> Callable[..., Tuple[Any, Any]]:
+    """Import factory dạng "module:function"."""
+    module_name, _, func_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def run_query(
+    searcher: Any,
+    llm: Any,
+    query: str,
+    top_k: int,
+    alpha: float,
+    run_llm: bool = True,
+) -> Dict[str, Any]:
+    """
+    Chạy một request qua pipeline và đo thời gian từng stage.
+
+    Returns:
+        Dict[str, Any]: {"search", "llm", "error_stage", "error"} (thời gian tính bằng giây).
+    """
+    record: Dict[str, Any] = {
+        "search": None,
+        "llm": None,
+        "error_stage": None,
+        "error": None,
+    }
+
+    start = time.perf_counter()
+    try:
+        contexts = searcher.hybrid_search(query=query, top_k=top_k, alpha=alpha)
+    except Exception as e:
+        record.update(error_stage="search", error=repr(e))
+        return record
+    finally:
+        record["search"] = time.perf_counter() - start
+
+    if run_llm and contexts:
+        start = time.perf_counter()
+        response = llm.generate_answer(query=query, contexts=contexts)
+        record["llm"] = time.perf_counter() - start
+        if response.get("error"):
+            record.update(error_stage="llm", error=response["error"])
+    return record
+
+
+# Pipeline riêng của từng worker process
+_WORKER_PIPELINE: Optional[Tuple[Any, Any]] = None
+
+
+def _init_worker(factory_path: str, factory_kwargs: Dict[str, Any]) -> None:
+    global _WORKER_PIPELINE
+    _WORKER_PIPELINE = _load_factory(factory_path)(**factory_kwargs)
+
+
+def _run_in_worker(
+    query: str, top_k: int, alpha: float, run_llm: bool
+) -> Dict[str, Any]:
+    searcher, llm = _WORKER_PIPELINE
+    return run_query(searcher, llm, query, top_k, alpha, run_llm)
+
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    arr = np.asarray(values, dtype=np.float64)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "mean": float(arr.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+    }
+
+
+# ==========================================================
+# 🔹 Load tester
+# ==========================================================
+class LoadTester:
+    """
+    Sinh tải lên pipeline truy vấn và thu thập latency/throughput/error.
+    """
+
+    def __init__(
+        self,
+        query_source: QuerySource,
+        pipeline_factory: str = DEFAULT_PIPELINE_FACTORY,
+        factory_kwargs: Optional[Dict[str, Any]] = None,
+        log_name: str = "LoadTester",
+    ) -> None:
+        """
+        Args:
+            query_source (QuerySource): Nguồn query.
+            pipeline_factory (str): Factory dạng "module:function" trả về (searcher, llm).
+            factory_kwargs (dict, optional): Tham số truyền vào factory.
+            log_name (str): Tên logger.
+        """
+        self.logger = Logger(name=log_name).get_logger()
+        self.query_source = query_source
+        self.pipeline_factory = pipeline_factory
+        self.factory_kwargs = factory_kwargs or {}
+        self._pipeline: Optional[Tuple[Any, Any]] = None
+
+    def _get_pipeline(self) -> Tuple[Any, Any]:
+        """Pipeline dùng chung cho chế độ thread (khởi tạo 1 lần)."""
+        if self._pipeline is None:
+            self._pipeline = _load_factory(self.pipeline_factory)(**self.factory_kwargs)
+        return self._pipeline
+
+    def _make_executor(self, config: LoadTestConfig) -> Executor:
+        if config.executor == "process":
+            return ProcessPoolExecutor(
+                max_workers=config.concurrency,
+                initializer=_init_worker,
+                initargs=(self.pipeline_factory, self.factory_kwargs),
+            )
+        if config.executor == "thread":
+            return ThreadPoolExecutor(max_workers=config.concurrency)
+        raise ValueError(f"❌ Executor không hợp lệ: {config.executor}")
+
+    def _submit(self, executor: Executor, config: LoadTestConfig, query: str) -> Future:
+        if config.executor == "process":
+            return executor.submit(
+                _run_in_worker, query, config.top_k, config.alpha, config.run_llm
+            )
+        searcher, llm = self._get_pipeline()
+        return executor.submit(
+            run_query, searcher, llm, query, config.top_k, config.alpha, config.run_llm
+        )
+
+    @staticmethod
+    def _finalize(future: Future, scheduled_at: float) -> Dict[str, Any]:
+        """Gộp kết quả worker với thời gian chờ trong hàng đợi."""
+        try:
+            record = future.result()
+        except Exception as e:
+            record = {
+                "search": None,
+                "llm": None,
+                "error_stage": "worker",
+                "error": repr(e),
+            }
+        record["total"] = time.perf_counter() - scheduled_at
+        service = (record["search"] or 0.0) + (record["llm"] or 0.0)
+        record["queue"] = max(record["total"] - service, 0.0)
+        return record
+
+    # ------------------------------------------------------
+    def _run_closed(self, executor: Executor, config: LoadTestConfig) -> List[Dict]:
+        records: List[Dict[str, Any]] = []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + config.duration_s
+
+        def client_loop() -> None:
+            while time.perf_counter() < deadline:
+                scheduled_at = time.perf_counter()
+                future = self._submit(executor, config, self.query_source.next())
+                record = self._finalize(future, scheduled_at)
+                with lock:
+                    records.append(record)
+
+        clients = [
+            threading.Thread(target=client_loop, daemon=True)
+            for _ in range(config.concurrency)
+        ]
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join()
+        return records
+
+    def _run_open(
+        self, executor: Executor, config: LoadTestConfig
+    ) -> Tuple[List[Dict], int]:
+        records: List[Dict[str, Any]] = []
+        lock = threading.Lock()
+        rng = random.Random(config.seed)
+        completed = threading.Semaphore(0)
+        in_flight = 0
+        max_in_flight = 0
+
+        def on_done(future: Future, scheduled_at: float) -> None:
+            nonlocal in_flight
+            record = self._finalize(future, scheduled_at)
+            with lock:
+                records.append(record)
+                in_flight -= 1
+            completed.release()
+
+        start = time.perf_counter()
+        deadline = start + config.duration_s
+        next_arrival = start
+        submitted = 0
+        while True:
+            next_arrival += rng.expovariate(config.arrival_rate)
+            if next_arrival >= deadline:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            future = self._submit(executor, config, self.query_source.next())
+            future.add_done_callback(lambda f, t=next_arrival: on_done(f, t))
+            submitted += 1
+
+        # Chờ các request còn tồn đọng hoàn tất
+        for _ in range(submitted):
+            completed.acquire()
+        return records, max_in_flight
+
+    # ------------------------------------------------------
+    def run(self, config: LoadTestConfig) -> LoadTestReport:
+        """Chạy một lần load-test với cấu hình cho trước."""
+        if config.mode not in ("open", "closed"):
+            raise ValueError(f"❌ Mode không hợp lệ: {config.mode}")
+
+        if config.executor == "thread":
+            self._get_pipeline()
+
+        self.logger.info(
+            f"🚀 Load-test mode={config.mode} executor={config.executor} "
+            f"concurrency={config.concurrency} duration={config.duration_s}s"
+        )
+        executor = self._make_executor(config)
+        try:
+            if config.executor == "process":
+                # Đợi các process khởi tạo pipeline xong trước khi đo
+                self._warm_up_workers(executor, config)
+
+            started = time.perf_counter()
+            if config.mode == "closed":
+                records = self._run_closed(executor, config)
+                max_in_flight = config.concurrency
+            else:
+                records, max_in_flight = self._run_open(executor, config)
+            wall_time = time.perf_counter() - started
+        finally:
+            executor.shutdown(wait=True)
+
+        report = self._build_report(config, records, wall_time, max_in_flight)
+        self.logger.info(
+            f"✅ Load-test xong: {report.requests} requests, "
+            f"{report.throughput:.2f} req/s, error_rate={report.error_rate:.2%}"
+        )
+        return report
+
+    def _warm_up_workers(self, executor: Executor, config: LoadTestConfig) -> None:
+        warmup_config = LoadTestConfig(**{**asdict(config), "run_llm": False})
+        futures = [
+            self._submit(executor, warmup_config, self.query_source.queries[0])
+            for _ in range(config.concurrency)
+        ]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                self.logger.warning(f"⚠️ Warm-up worker lỗi: {e}")
+
+    @staticmethod
+    def _build_report(
+        config: LoadTestConfig,
+        records: List[Dict[str, Any]],
+        wall_time: float,
+        max_in_flight: int,
+    ) -> LoadTestReport:
+        errors_by_stage: Dict[str, int] = {}
+        for r in records:
+            if r["error_stage"]:
+                errors_by_stage[r["error_stage"]] = (
+                    errors_by_stage.get(r["error_stage"], 0) + 1
+                )
+        errors = sum(errors_by_stage.values())
+        ok = [r for r in records if not r["error_stage"]]
+
+        latency = {
+            stage: _summarize([r[stage] for r in ok if r.get(stage) is not None])
+            for stage in STAGES
+        }
+        return LoadTestReport(
+            config=config,
+            requests=len(records),
+            errors=errors,
+            error_rate=errors / len(records) if records else 0.0,
+            errors_by_stage=errors_by_stage,
+            throughput=len(ok) / wall_time if wall_time > 0 else 0.0,
+            offered_rate=config.arrival_rate if config.mode == "open" else None,
+            wall_time_s=wall_time,
+            max_in_flight=max_in_flight,
+            latency=latency,
+        )
+
+    def sweep(
+        self, config: LoadTestConfig, concurrency_levels: Sequence[int]
+    ) -> List[LoadTestReport]:
+        """Chạy lần lượt với nhiều mức concurrency (số thread/process)."""
+        reports = []
+        for level in concurrency_levels:
+            level_config = LoadTestConfig(**{**asdict(config), "concurrency": level})
+            reports.append(self.run(level_config))
+        return reports
+
+
+# ==========================================================
+# 🔹 Phân tích kết quả
+# ==========================================================
+def find_saturation_point(
+    reports: Sequence[LoadTestReport],
+    min_gain: float = 0.05,
+    p99_slo_s: Optional[float] = None,
+) -> Optional[int]:
+    """
+    Tìm mức concurrency bão hoà: mức cuối cùng trước khi throughput
+    tăng ít hơn `min_gain` (tương đối) hoặc p99 tổng vượt SLO.
+
+    Returns:
+        Optional[int]: Mức concurrency bão hoà, None nếu chưa bão hoà.
+    """
+    ordered = sorted(reports, key=lambda r: r.config.concurrency)
+    for prev, cur in zip(ordered, ordered[1:]):
+        if p99_slo_s is not None and cur.latency["total"]["p99"] > p99_slo_s:
+            return prev.config.concurrency
+        if (
+            prev.throughput > 0
+            and (cur.throughput - prev.throughput) / prev.throughput < min_gain
+        ):
+            return prev.config.concurrency
+    return None
+
+
+def format_reports(reports: Sequence[LoadTestReport]) -> str:
+    """Định dạng báo cáo dạng bảng text."""
+    header = f"{'conc':>5} {'req':>6} {'req/s':>8} {'err%':>6} " + " ".join(
+        f"{s + ' p50/p95/p99 (ms)':>28}" for s in STAGES
+    )
+    lines = [header, "-" * len(header)]
+    for r in reports:
+        stage_cols = []
+        for s in STAGES:
+            lat = r.latency[s]
+            stage_cols.append(
+                f"{lat['p50'] * 1000:>8.1f}/{lat['p95'] * 1000:>8.1f}/"
+                f"{lat['p99'] * 1000:>8.1f}"
+            )
+        lines.append(
+            f"{r.config.concurrency:>5} {r.requests:>6} {r.throughput:>8.2f} "
+            f"{r.error_rate * 100:>6.2f} " + " ".join(f"{c:>28}" for c in stage_cols)
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test luồng truy vấn RAG")
+    parser.add_argument("--queries", help="File query log (.txt hoặc .jsonl)")
+    parser.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="Chọn query ngẫu nhiên theo trọng số thay vì replay tuần tự",
+    )
+    parser.add_argument("--mode", choices=["open", "closed"], default="closed")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--rate", type=float, default=5.0, help="Request/giây (open)")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument(
+        "--concurrency", default="1,2,4,8", help="Danh sách mức concurrency"
+    )
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--alpha", type=float, default=0.9)
+    parser.add_argument("--no-llm", action="store_true", help="Chỉ đo stage search")
+    parser.add_argument("--real-llm", action="store_true", help="Gọi Groq thật")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--pipeline", default=DEFAULT_PIPELINE_FACTORY)
+    parser.add_argument("--p99-slo-ms", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Ghi báo cáo JSON ra file")
+    args = parser.parse_args()
+
+    if args.queries:
+        source = QuerySource.from_file(
+            args.queries, replay=not args.synthetic, seed=args.seed
+        )
+    else:
+        source = QuerySource.synthetic(DEFAULT_QUERY_MIX, seed=args.seed)
+
+    tester = LoadTester(
+        query_source=source,
+        pipeline_factory=args.pipeline,
+        factory_kwargs={
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms,
+            "llm_error_rate": args.llm_error_rate,
+            "real_llm": args.real_llm,
+        },
+    )
+    config = LoadTestConfig(
+        mode=args.mode,
+        executor=args.executor,
+        arrival_rate=args.rate,
+        duration_s=args.duration,
+        top_k=args.top_k,
+        alpha=args.alpha,
+        run_llm=not args.no_llm,
+        seed=args.seed,
+    )
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    reports = tester.sweep(config, levels)
+
+    print(format_reports(reports))
+    p99_slo = args.p99_slo_ms / 1000.0 if args.p99_slo_ms else None
+    saturation = find_saturation_point(reports, p99_slo_s=p99_slo)
+    print(f"\nSaturation point (concurrency): {saturation or 'chưa bão hoà'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "reports": [r.to_dict() for r in reports],
+                    "saturation_concurrency": saturation,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark REST vs gRPC cho Qdrant: throughput upload (point/giây, upsert theo batch
+song song qua QdrantIngestor) và throughput truy vấn (query/giây, p50/p95) với
+nhiều thread dùng chung một client.
+
+Chạy với Qdrant local (docker-compose mở cổng 6333 REST và 6334 gRPC):
+    python -m src.benchmark.qdrant_transport --points 20000 --queries 2000 --threads 8
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from src.utils.config import get_settings
+from src.vector_db.client import QdrantIngestor
+from src.vector_db.connection import create_qdrant_client
+
+TRANSPORTS = {"rest": {"prefer_grpc": False}, "grpc": {"prefer_grpc": True}}
+
+
+@dataclass
+class TransportResult:
+    """Kết quả đo cho một transport."""
+
+    transport: str
+    points: int
+    upload_s: float
+    upload_points_per_s: float
+    queries: int
+    query_s: float
+    queries_per_s: float
+    query_p50_ms: float
+    query_p95_ms: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _random_unit_vectors(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def run_transport(
+    transport: str,
+    points: int,
+    queries: int,
+    threads: int,
+    batch_size: int,
+    parallel: int,
+    top_k: int = 5,
+    seed: int = 42,
+) -> TransportResult:
+    settings = get_settings()
+    client = create_qdrant_client(**TRANSPORTS[transport])
+    collection = f"bench_transport_{transport}"
+    ingestor = QdrantIngestor(
+        client=client,
+        collection_name=collection,
+        vector_size=settings.VECTOR_SIZE,
+        log_name="TransportBenchmark",
+        reset_collection=True,
+        upload_batch_size=batch_size,
+        upload_parallel=parallel,
+    )
+
+    rng = np.random.default_rng(seed)
+    vectors = _random_unit_vectors(points, settings.VECTOR_SIZE, rng)
+    chunks = [
+        {"text": f"benchmark chunk {i}", "page": i % 50 + 1, "source": "bench"}
+        for i in range(points)
+    ]
+    started = time.perf_counter()
+    ingestor.upsert_to_qdrant("bench.pdf", chunks, vectors.tolist())
+    upload_s = time.perf_counter() - started
+
+    query_vectors = _random_unit_vectors(queries, settings.VECTOR_SIZE, rng).tolist()
+
+    def one_query(vector: List[float]) -> float:
+        t0 = time.perf_counter()
+        client.query_points(
+            collection_name=collection, query=vector, limit=top_k, with_payload=True
+        )
+        return time.perf_counter() - t0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one_query, query_vectors))
+    query_s = time.perf_counter() - started
+
+    client.delete_collection(collection_name=collection)
+    client.close()
+    return TransportResult(
+        transport=transport,
+        points=points,
+        upload_s=upload_s,
+        upload_points_per_s=points / upload_s if upload_s > 0 else 0.0,
+        queries=queries,
+        query_s=query_s,
+        queries_per_s=queries / query_s if query_s > 0 else 0.0,
+        query_p50_ms=float(np.percentile(latencies, 50)) * 1000.0,
+        query_p95_ms=float(np.percentile(latencies, 95)) * 1000.0,
+    )
+
+
+def format_results(results: Sequence[TransportResult]) -> str:
+    """Định dạng kết quả dạng bảng text."""
+    header = (
+        f"{'transport':>9} {'points':>7} {'upload pts/s':>13} "
+        f"{'queries':>8} {'qps':>9} {'p50 (ms)':>9} {'p95 (ms)':>9}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.transport:>9} {r.points:>7} {r.upload_points_per_s:>13.1f} "
+            f"{r.queries:>8} {r.queries_per_s:>9.1f} {r.query_p50_ms:>9.2f} "
+            f"{r.query_p95_ms:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark REST vs gRPC cho Qdrant")
+    parser.add_argument("--transports", default="rest,grpc")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8, help="Thread truy vấn")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--parallel", type=int, default=4, help="Upsert song song")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Ghi kết quả JSON ra file")
+    args = parser.parse_args()
+
+    results = [
+        run_transport(
+            transport,
+            points=args.points,
+            queries=args.queries,
+            threads=args.threads,
+            batch_size=args.batch_size,
+            parallel=args.parallel,
+            seed=args.seed,
+        )
+        for transport in args.transports.split(",")
+        if transport.strip()
+    ]
+    print(format_results(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([r.to_dict() for r in results], f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
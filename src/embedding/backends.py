@@ -0,0 +1,225 @@
+"""
+Backend suy luận cho model embedding trên CPU.
+
+    - "torch": SentenceTransformer PyTorch fp32 (mặc định, như trước).
+    - "int8":  PyTorch với dynamic quantization int8 cho các lớp Linear
+               (weights int8, activation lượng tử hoá lúc chạy) — chỉ chạy CPU.
+    - "onnx":  ONNX Runtime qua `SentenceTransformer(..., backend="onnx")`
+               (cần sentence-transformers >= 3.2, optimum và onnxruntime).
+
+Backend không dùng được (thiếu thư viện, model không export được...) sẽ quay
+về "torch" kèm cảnh báo; backend thực tế được ghi vào `model.embedding_backend`.
+
+Backend lượng tử hoá làm vector lệch khỏi fp32 một chút. Khi load "int8"/"onnx"
+với `min_cosine`, vector của vài câu mẫu (PROBE_SENTENCES) được so với bản fp32
+một lần; dưới ngưỡng thì dùng luôn bản fp32 (hoặc báo lỗi với `strict=True`).
+Đo đầy đủ trên dữ liệu thật bằng `python -m src.benchmark.embedding_backends`.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Sequence
+
+from src.utils.lazy import optional_import
+
+BACKENDS = ("torch", "int8", "onnx")
+
+
+class BackendCheckError(RuntimeError):
+    """Backend lệch khỏi fp32 quá ngưỡng khi kiểm tra lúc load (`strict=True`)."""
+
+
+# Câu mẫu cho kiểm tra lúc load (ngắn/dài, tiếng Việt/tiếng Anh, số)
+PROBE_SENTENCES = (
+    "Mô hình image captioning sinh mô tả cho ảnh dựa trên encoder decoder.",
+    "Bộ dữ liệu gồm 8.000 ảnh, mỗi ảnh có 5 câu mô tả tiếng Việt.",
+    "Kết quả BLEU-4 đạt 0,27 khi dùng attention trên đặc trưng CNN.",
+    "The transformer decoder attends to region features extracted by the CNN.",
+    "Tóm tắt",
+    "Chương 3 trình bày phương pháp đánh giá và so sánh với các mô hình LSTM "
+    "truyền thống trên cùng tập kiểm thử, cùng cấu hình siêu tham số.",
+)
+
+
+# ==========================================================
+# 🔹 Load model theo backend
+# ==========================================================
+def _load_torch(sentence_transformers: Any, model_name: str, device: str) -> Any:
+    return sentence_transformers.SentenceTransformer(
+        model_name, trust_remote_code=True, device=device
+    )
+
+
+def _load_int8(sentence_transformers: Any, model_name: str, logger: Any) -> Any:
+    torch = optional_import("torch")
+    model = _load_torch(sentence_transformers, model_name, "cpu")
+    quantization = getattr(torch, "ao", torch).quantization
+    # Lượng tử hoá tại chỗ để không giữ song song bản fp32 trong bộ nhớ
+    quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+    logger.info("⚙️ Đã lượng tử hoá int8 (dynamic) các lớp Linear")
+    return model
+
+
+def _load_onnx(sentence_transformers: Any, model_name: str) -> Any:
+    return sentence_transformers.SentenceTransformer(
+        model_name, trust_remote_code=True, device="cpu", backend="onnx"
+    )
+
+
+def load_backend(
+    sentence_transformers: Any,
+    model_name: str,
+    device: str,
+    backend: str,
+    logger: Any,
+    min_cosine: Optional[float] = None,
+    strict: bool = False,
+) -> Any:
+    """
+    Load SentenceTransformer với backend suy luận `backend`.
+
+    Args:
+        sentence_transformers (module): Module sentence_transformers đã import.
+        model_name (str): Tên model trên HuggingFace hoặc đường dẫn model local.
+        device (str): Thiết bị cho backend "torch" ("int8"/"onnx" luôn chạy CPU).
+        backend (str): Một trong BACKENDS.
+        logger: Logger để ghi cảnh báo khi phải quay về "torch".
+        min_cosine (float, optional): Nếu có, backend khác "torch" được kiểm tra
+            một lần trên PROBE_SENTENCES so với fp32 (`check_backend`); None = bỏ qua.
+        strict (bool): Dưới ngưỡng thì raise BackendCheckError thay vì dùng fp32.
+
+    Returns:
+        SentenceTransformer: Model đã load, có thuộc tính `embedding_backend`.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend không hợp lệ: {backend!r} (chọn {BACKENDS})")
+
+    used = backend
+    if backend != "torch" and device != "cpu":
+        logger.warning("⚠️ Backend %s chỉ chạy CPU, bỏ qua device=%s", backend, device)
+
+    if backend == "int8" and optional_import("torch") is None:
+        logger.warning("⚠️ Không có torch, không lượng tử hoá được → dùng torch fp32")
+        used = "torch"
+    elif backend == "onnx" and optional_import("onnxruntime") is None:
+        logger.warning("⚠️ Không có onnxruntime → dùng torch fp32")
+        used = "torch"
+
+    model = None
+    if used == "int8":
+        try:
+            model = _load_int8(sentence_transformers, model_name, logger)
+        except Exception as e:
+            logger.warning("⚠️ Lượng tử hoá int8 lỗi (%s) → dùng torch fp32", e)
+            used = "torch"
+    elif used == "onnx":
+        try:
+            model = _load_onnx(sentence_transformers, model_name)
+        except Exception as e:
+            logger.warning("⚠️ Không load được ONNX (%s) → dùng torch fp32", e)
+            used = "torch"
+
+    if model is None:
+        model = _load_torch(sentence_transformers, model_name, device)
+    model.embedding_backend = used
+
+    if used != "torch" and min_cosine is not None:
+        reference = _load_torch(sentence_transformers, model_name, "cpu")
+        reference.embedding_backend = "torch"
+        accuracy = check_backend(model, reference, min_cosine)
+        if not accuracy.passed:
+            message = (
+                f"Backend {used} lệch khỏi fp32: min cosine "
+                f"{accuracy.min_cosine:.4f} < {min_cosine}"
+            )
+            if strict:
+                raise BackendCheckError(message)
+            logger.error("❌ %s → dùng torch fp32", message)
+            return reference
+        logger.info(
+            "✅ Backend %s khớp fp32 trên câu mẫu (min cosine %.4f)",
+            used,
+            accuracy.min_cosine,
+        )
+    return model
+
+
+# ==========================================================
+# 🔹 Kiểm tra độ lệch so với fp32
+# ==========================================================
+@dataclass
+class BackendAccuracy:
+    """Cosine giữa vector của một backend và vector fp32 trên cùng tập text."""
+
+    backend: str
+    texts: int
+    mean_cosine: float
+    min_cosine: float
+    min_required: float
+
+    @property
+    def passed(self) -> bool:
+        return self.min_cosine >= self.min_required
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "passed": self.passed}
+
+
+def check_backend(
+    model: Any,
+    reference: Any,
+    min_cosine: float,
+    texts: Sequence[str] = PROBE_SENTENCES,
+) -> BackendAccuracy:
+    """Encode `texts` bằng `model` và bản fp32 `reference`, rồi so sánh cosine."""
+
+    def encode(m: Any) -> Any:
+        return m.encode(
+            list(texts),
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+
+    return compare_embeddings(
+        encode(reference),
+        encode(model),
+        getattr(model, "embedding_backend", "unknown"),
+        min_cosine,
+    )
+
+
+def compare_embeddings(
+    reference: Sequence[Sequence[float]],
+    candidate: Sequence[Sequence[float]],
+    backend: str,
+    min_cosine: float = 0.99,
+) -> BackendAccuracy:
+    """
+    So sánh từng cặp vector (cùng text) của backend với vector fp32.
+
+    Args:
+        reference: Embedding từ backend "torch" fp32.
+        candidate: Embedding từ backend cần kiểm tra, cùng thứ tự text.
+        backend (str): Tên backend (để báo cáo).
+        min_cosine (float): Cosine tối thiểu của mọi cặp để coi là đạt.
+    """
+    import numpy as np
+
+    ref = np.asarray(reference, dtype=np.float64)
+    cand = np.asarray(candidate, dtype=np.float64)
+    if ref.shape != cand.shape:
+        raise ValueError(f"Kích thước khác nhau: {ref.shape} vs {cand.shape}")
+    if not len(ref):
+        return BackendAccuracy(backend, 0, 1.0, 1.0, min_cosine)
+
+    norms = np.linalg.norm(ref, axis=1) * np.linalg.norm(cand, axis=1)
+    cosines = (ref * cand).sum(axis=1) / np.maximum(norms, 1e-12)
+    return BackendAccuracy(
+        backend=backend,
+        texts=len(cosines),
+        mean_cosine=float(cosines.mean()),
+        min_cosine=float(cosines.min()),
+        min_required=min_cosine,
+    )
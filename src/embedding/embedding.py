@@ -1,18 +1,17 @@
-from typing import List
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+from src.embedding.backends import BackendCheckError, load_backend
+from src.utils.lazy import optional_import
 from src.utils.logger import Logger
 from src.utils.text_cleaner import TextCleaner
 
-try:
-    from sentence_transformers import SentenceTransformer
-
-    _HAS_SENTENCE_TRANSFORMERS = True
-except Exception:
-    _HAS_SENTENCE_TRANSFORMERS = False
-
 
 class MockEmbedder:
     """Fallback embedder dùng khi không có sentence-transformers."""
 
+    embedding_backend = "mock"
+
     def __init__(self, dim: int = 768):
         self.dim = dim
 
@@ -28,37 +27,124 @@ class MockEmbedder:
         return self.embed_documents([q])[0]
 
 
+def _load_model(
+    model_name: str, device: str, backend: str, logger: Any, verify: bool = True
+) -> Any:
+    """Load SentenceTransformer (torch được import ở đây, không phải lúc import)."""
+    sentence_transformers = optional_import("sentence_transformers")
+    if sentence_transformers is None:
+        logger.warning("⚠️ sentence-transformers không khả dụng, dùng MockEmbedder")
+        return MockEmbedder(dim=768)
+
+    logger.info("🚀 Đang load model embedding: %s (backend=%s)", model_name, backend)
+    min_cosine, strict = None, False
+    if backend != "torch" and verify:
+        # Backend int8/onnx: kiểm tra một lần so với fp32 theo EMBED_BACKEND_CHECK
+        from src.utils.config import get_settings
+
+        settings = get_settings()
+        if settings.EMBED_BACKEND_CHECK != "off":
+            min_cosine = settings.EMBED_BACKEND_MIN_COSINE
+            strict = settings.EMBED_BACKEND_CHECK == "error"
+
+    try:
+        model = load_backend(
+            sentence_transformers,
+            model_name,
+            device,
+            backend,
+            logger,
+            min_cosine=min_cosine,
+            strict=strict,
+        )
+        logger.info("✅ Model loaded: %s (%s)", model_name, model.embedding_backend)
+        return model
+    except BackendCheckError:
+        # EMBED_BACKEND_CHECK=error: lệch quá ngưỡng thì dừng hẳn, không dùng Mock
+        raise
+    except Exception as e:
+        logger.exception("❌ Lỗi khi load model %s: %s", model_name, e)
+        logger.warning("⚠️ Dùng MockEmbedder do lỗi khi load model")
+        return MockEmbedder(dim=768)
+
+
 class ModelEmbeddings:
     """Wrapper cho SentenceTransformer để tạo embedding cho text hoặc query."""
 
-    _model_cache = None
-
-    def __init__(self, model_name: str, task: str, device: str, log_name: str):
+    # (model_name, device, backend) → Future của model đã/đang load
+    _models: Dict[Tuple[str, str, str], Future] = {}
+    _model_lock = threading.Lock()
+
+    def __init__(
+        self,
+        model_name: str,
+        task: str,
+        device: str,
+        log_name: str,
+        backend: str = "torch",
+        verify: bool = True,
+    ):
+        """
+        Args:
+            backend (str): Backend suy luận ("torch" / "int8" / "onnx").
+            verify (bool): Với backend khác "torch", kiểm tra một lần so với fp32
+                theo EMBED_BACKEND_CHECK (tắt khi tự đo độ lệch, VD benchmark).
+        """
         self.logger = Logger(name=log_name).get_logger()
         self.model_name = model_name
         self.task = task
         self.device = device
-
-        if ModelEmbeddings._model_cache is None:
-            if _HAS_SENTENCE_TRANSFORMERS:
-                self.logger.info("🚀 Đang load model embedding: %s", model_name)
+        self.backend = backend
+
+        # Weights load trong thread nền (hoặc đã được `preload` từ trước);
+        # chỉ chờ khi thật sự cần embed lần đầu
+        self._model_future = ModelEmbeddings.preload(
+            model_name, device, self.logger, backend=backend, verify=verify
+        )
+
+    @property
+    def model(self) -> Any:
+        return self._model_future.result()
+
+    @property
+    def active_backend(self) -> str:
+        """Backend thực tế ("torch" / "int8" / "onnx" / "mock") sau khi load."""
+        return getattr(self.model, "embedding_backend", "torch")
+
+    @classmethod
+    def preload(
+        cls,
+        model_name: str,
+        device: str = "cpu",
+        logger: Optional[Any] = None,
+        backend: str = "torch",
+        verify: bool = True,
+    ) -> Future:
+        """
+        Load weights trong thread nền (gọi sớm lúc app khởi động, trước khi dựng
+        Qdrant client / searcher...). Model được dùng chung trong process theo
+        (model_name, device, backend); các ModelEmbeddings tạo sau đó chờ Future
+        này thay vì load lại.
+        """
+        key = (model_name, device, backend)
+        with cls._model_lock:
+            if key in cls._models:
+                return cls._models[key]
+
+            future: Future = Future()
+            cls._models[key] = future
+            logger = logger or Logger(name="EMBEDDING").get_logger()
+
+            def run() -> None:
                 try:
-                    # ✅ SỬA Ở ĐÂY
-                    ModelEmbeddings._model_cache = SentenceTransformer(
-                        model_name, trust_remote_code=True, device=device
+                    future.set_result(
+                        _load_model(model_name, device, backend, logger, verify)
                     )
-                    self.logger.info("✅ Model loaded: %s", model_name)
-                except Exception as e:
-                    self.logger.exception("❌ Lỗi khi load model %s: %s", model_name, e)
-                    ModelEmbeddings._model_cache = MockEmbedder(dim=768)
-                    self.logger.warning("⚠️ Dùng MockEmbedder do lỗi khi load model")
-            else:
-                self.logger.warning(
-                    "⚠️ sentence-transformers không khả dụng, dùng MockEmbedder"
-                )
-                ModelEmbeddings._model_cache = MockEmbedder(dim=768)
-
-        self.model = ModelEmbeddings._model_cache
+                except BaseException as e:
+                    future.set_exception(e)
+
+            threading.Thread(target=run, name="preload-embedding", daemon=True).start()
+            return future
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """Sinh embedding cho danh sách đoạn văn bản."""
@@ -75,7 +161,7 @@ class ModelEmbeddings:
 
         self.logger.info("🔹Tạo embedding cho %d đoạn văn bản.", len(cleaned_texts))
 
-        if _HAS_SENTENCE_TRANSFORMERS and hasattr(self.model, "encode"):
+        if hasattr(self.model, "encode"):
             embeddings = self.model.encode(
                 cleaned_texts,
                 normalize_embeddings=True,
@@ -95,7 +181,7 @@ class ModelEmbeddings:
         cleaner = TextCleaner()
         cleaned_query = cleaner.clean(query)
 
-        if _HAS_SENTENCE_TRANSFORMERS and hasattr(self.model, "encode"):
+        if hasattr(self.model, "encode"):
             embedding = self.model.encode(
                 [cleaned_query],
                 normalize_embeddings=True,
@@ -105,11 +191,37 @@ class ModelEmbeddings:
 
         return self.model.embed_query(cleaned_query)
 
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Sinh embedding cho một batch truy vấn trong một lần encode."""
+        if not queries:
+            return []
+
+        cleaner = TextCleaner()
+        cleaned_queries = [cleaner.clean(q) for q in queries]
+
+        if hasattr(self.model, "encode"):
+            embeddings = self.model.encode(
+                cleaned_queries,
+                normalize_embeddings=True,
+                convert_to_tensor=False,
+                show_progress_bar=False,
+            )
+            return embeddings.tolist()
+
+        return [self.model.embed_query(q) for q in cleaned_queries]
+
 
 def get_embedding_model(
-    model_name: str, task: str = "retrieval.passage", device: str = "cpu"
+    model_name: str,
+    task: str = "retrieval.passage",
+    device: str = "cpu",
+    backend: str = "torch",
 ) -> ModelEmbeddings:
     """Factory function tạo instance của ModelEmbeddings."""
     return ModelEmbeddings(
-        model_name=model_name, task=task, device=device, log_name="EMBEDDING"
+        model_name=model_name,
+        task=task,
+        device=device,
+        log_name="EMBEDDING",
+        backend=backend,
     )
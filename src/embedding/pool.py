@@ -0,0 +1,230 @@
+"""
+Embedding song song nhiều process cho ingest số lượng lớn.
+
+Mỗi worker process tự load một bản model (ModelEmbeddings) và giới hạn số thread
+intra-op của torch để các worker không tranh CPU của nhau. Text được sắp theo độ
+dài rồi chia batch (các text trong cùng batch dài gần bằng nhau → ít padding),
+batch dài được gửi trước để giảm thời gian chờ batch cuối; kết quả được ghép lại
+theo đúng thứ tự đầu vào.
+
+Backend int8/onnx được kiểm tra so với fp32 (EMBED_BACKEND_CHECK) một lần trong
+một process riêng trước khi khởi động pool, thay vì mỗi worker load thêm bản fp32.
+
+Ví dụ:
+    with EmbeddingPool(model_name, num_workers=4) as pool:
+        embeddings = pool.embed_documents(chunks)
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Any, List, Optional
+
+from src.utils.logger import Logger
+
+_worker_model = None
+
+
+# ==========================================================
+# 🔹 Worker process
+# ==========================================================
+def _init_worker(
+    model_name: str, task: str, device: str, num_threads: int, backend: str = "torch"
+) -> None:
+    """Khởi tạo mỗi worker: giới hạn thread rồi load model một lần."""
+    global _worker_model
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+    os.environ["MKL_NUM_THREADS"] = str(num_threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    from src.embedding.embedding import ModelEmbeddings
+
+    _worker_model = ModelEmbeddings(
+        model_name=model_name,
+        task=task,
+        device=device,
+        log_name=f"EmbeddingWorker-{os.getpid()}",
+        backend=backend,
+        verify=False,  # backend đã được kiểm tra một lần trước khi tạo pool
+    )
+    _worker_model.model  # chờ load xong trước khi worker nhận batch
+
+
+def _check_backend(model_name: str, task: str, device: str, backend: str) -> str:
+    """Load `backend` kèm kiểm tra so với fp32; trả về backend thực tế dùng được."""
+    from src.embedding.embedding import ModelEmbeddings
+
+    model = ModelEmbeddings(
+        model_name=model_name,
+        task=task,
+        device=device,
+        log_name="EmbeddingBackendCheck",
+        backend=backend,
+    )
+    return model.active_backend
+
+
+def _encode_batch(texts: List[str]) -> List[List[float]]:
+    return _worker_model.embed_documents(texts)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+# ==========================================================
+# 🔹 Pool
+# ==========================================================
+class EmbeddingPool:
+    """Pool process sinh embedding, cùng interface `embed_documents` với ModelEmbeddings."""
+
+    def __init__(
+        self,
+        model_name: str,
+        task: str = "retrieval.passage",
+        device: str = "cpu",
+        num_workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        batch_size: int = 32,
+        log_name: str = "EmbeddingPool",
+        backend: str = "torch",
+    ) -> None:
+        """
+        Args:
+            model_name (str): Tên model SentenceTransformer.
+            task (str): Task của model embedding.
+            device (str): Thiết bị chạy model trong mỗi worker.
+            num_workers (int, optional): Số worker process; mặc định min(4, số CPU).
+            threads_per_worker (int, optional): Số thread torch mỗi worker;
+                mặc định chia đều số CPU cho các worker.
+            batch_size (int): Số text mỗi batch gửi cho worker.
+            log_name (str): Tên logger.
+            backend (str): Backend suy luận của model trong mỗi worker
+                ("torch" / "int8" / "onnx", xem src/embedding/backends.py).
+        """
+        self.logger = Logger(name=log_name).get_logger()
+        cpus = os.cpu_count() or 1
+        self.model_name = model_name
+        self.task = task
+        self.device = device
+        self.num_workers = num_workers or min(4, cpus)
+        self.threads_per_worker = threads_per_worker or max(1, cpus // self.num_workers)
+        self.batch_size = batch_size
+        self.backend = backend
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_settings(cls) -> "EmbeddingPool":
+        from src.utils.config import get_settings
+
+        settings = get_settings()
+        return cls(
+            model_name=settings.JINA_MODEL_NAME,
+            task=settings.JINA_TASK,
+            device=settings.DEVICE,
+            num_workers=settings.EMBED_WORKERS or None,
+            threads_per_worker=settings.EMBED_THREADS_PER_WORKER or None,
+            batch_size=settings.EMBED_POOL_BATCH_SIZE,
+            backend=settings.EMBED_BACKEND,
+        )
+
+    def _verified_backend(self) -> str:
+        """
+        Backend cho các worker: int8/onnx được kiểm tra một lần (process riêng,
+        không giữ model trong process chính); lệch quá ngưỡng thì dùng "torch"
+        hoặc raise BackendCheckError với EMBED_BACKEND_CHECK=error.
+        """
+        from src.utils.config import get_settings
+
+        if self.backend == "torch" or get_settings().EMBED_BACKEND_CHECK == "off":
+            return self.backend
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as checker:
+            active = checker.submit(
+                _check_backend, self.model_name, self.task, self.device, self.backend
+            ).result()
+        if active == "torch":
+            self.logger.warning(
+                "⚠️ Backend %s không dùng được, worker dùng torch fp32", self.backend
+            )
+            return active
+        return self.backend
+
+    def start(self) -> "EmbeddingPool":
+        """Khởi động các worker và chờ tất cả load xong model."""
+        if self._executor is not None:
+            return self
+
+        backend = self._verified_backend()
+        self.logger.info(
+            "🚀 Khởi động %d worker embedding (%d thread/worker).",
+            self.num_workers,
+            self.threads_per_worker,
+        )
+        # spawn: tránh fork process khi torch đã khởi tạo thread pool
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                self.model_name,
+                self.task,
+                self.device,
+                self.threads_per_worker,
+                backend,
+            ),
+        )
+        wait([self._executor.submit(_ping) for _ in range(self.num_workers)])
+        return self
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "EmbeddingPool":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """Chia index của `texts` thành các batch theo độ dài, batch dài nhất trước."""
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        return [
+            order[i : i + self.batch_size]
+            for i in range(0, len(order), self.batch_size)
+        ]
+
+    def embed_documents(self, texts: List[Any]) -> List[List[float]]:
+        """Sinh embedding cho danh sách text/chunk, giữ nguyên thứ tự đầu vào."""
+        if not texts:
+            self.logger.warning("⚠️ Danh sách text rỗng, không thể tạo embedding.")
+            return []
+
+        self.start()
+        texts = [t["text"] if isinstance(t, dict) else t for t in texts]
+        batches = self.make_batches(texts)
+        self.logger.info(
+            "🔹Tạo embedding cho %d đoạn văn bản (%d batch, %d worker).",
+            len(texts),
+            len(batches),
+            self.num_workers,
+        )
+
+        futures = [
+            (indices, self._executor.submit(_encode_batch, [texts[i] for i in indices]))
+            for indices in batches
+        ]
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for indices, future in futures:
+            for i, vector in zip(indices, future.result()):
+                embeddings[i] = vector
+        return embeddings
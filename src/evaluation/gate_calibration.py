@@ -0,0 +1,258 @@
+"""
+Hiệu chỉnh ngưỡng AnswerabilityGate offline trên tập đánh giá.
+
+Với mỗi câu hỏi: chạy hai nhánh search (semantic + keyword) lấy đặc trưng của gate
+(semantic_top, keyword_top, agreement), và gán nhãn "trả lời được" khi context
+hybrid top-k bao phủ ít nhất một đơn vị liên quan. Câu hỏi ngoài tài liệu được
+thêm vào tập đánh giá với nhãn rỗng:
+    {"question": "Thời tiết Hà Nội hôm nay?", "relevant_ids": []}
+
+Sau đó quét lưới ngưỡng và báo cáo, cho mỗi cấu hình:
+    - skip_rate: tỷ lệ câu hỏi không cần gọi LLM
+    - false_reject: tỷ lệ câu hỏi trả lời được nhưng bị gate chặn
+    - true_reject: tỷ lệ câu hỏi không trả lời được bị gate chặn
+và chọn cấu hình chặn nhiều nhất mà false_reject không vượt ngân sách.
+
+Có thể đọc lại đặc trưng đã ghi (--features) thay vì chạy search lại.
+
+Ví dụ:
+    python -m src.evaluation.gate_calibration --dataset data/eval.jsonl \\
+        --top-k 5 --max-false-reject 0.02 --save-features gate_features.jsonl
+"""
+
+import argparse
+import itertools
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.evaluation.retrieval_eval import (
+    EvalExample,
+    _build_searchers,
+    load_dataset,
+    score_ranking,
+)
+from src.serving.pipeline import AnswerabilityGate
+from src.utils.logger import Logger
+
+
+@dataclass
+class GateSample:
+    """Đặc trưng gate và nhãn của một câu hỏi."""
+
+    question: str
+    semantic_top: float
+    keyword_top: float
+    agreement: float
+    answerable: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class GateSweepResult:
+    """Kết quả của một bộ ngưỡng trên toàn bộ tập câu hỏi."""
+
+    min_semantic: float
+    strong_semantic: float
+    min_keyword: float
+    min_agreement: float
+    skip_rate: float
+    false_reject: float
+    true_reject: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def collect_samples(
+    searcher: Any,
+    examples: Sequence[EvalExample],
+    top_k: int = 5,
+    alpha: float = 0.9,
+    fusion: str = "weighted",
+) -> List[GateSample]:
+    """Chạy hai nhánh + hybrid cho từng câu hỏi, trả về đặc trưng kèm nhãn."""
+    logger = Logger(name="GateCalibration").get_logger()
+    samples = []
+    for example in examples:
+        query_vector = searcher.embedding_model.embed_query(example.question)
+        semantic = searcher.semantic_search(
+            example.question,
+            top_k=top_k,
+            with_payload=False,
+            query_vector=query_vector,
+        )
+        keyword = searcher.keyword_search(
+            example.question, top_k=top_k, with_payload=False
+        )
+        contexts = searcher.hybrid_search(
+            example.question,
+            top_k=top_k,
+            alpha=alpha,
+            fusion=fusion,
+            query_vector=query_vector,
+        )
+        samples.append(
+            GateSample(
+                question=example.question,
+                semantic_top=max((r["score"] for r in semantic), default=0.0),
+                keyword_top=max((r["score"] for r in keyword), default=0.0),
+                agreement=AnswerabilityGate.agreement(semantic, keyword),
+                answerable=score_ranking(example, contexts, top_k)["recall"] > 0,
+            )
+        )
+    positives = sum(s.answerable for s in samples)
+    logger.info(f"📊 {len(samples)} câu hỏi, {positives} câu trả lời được")
+    return samples
+
+
+def sweep(
+    samples: Sequence[GateSample],
+    min_semantic: Sequence[float],
+    strong_semantic: Sequence[float],
+    min_keyword: Sequence[float],
+    min_agreement: Sequence[float],
+) -> List[GateSweepResult]:
+    """Đánh giá mọi tổ hợp ngưỡng trên các mẫu đã thu thập."""
+    positives = sum(s.answerable for s in samples)
+    negatives = len(samples) - positives
+    gate = AnswerabilityGate(log_path=None, log_name="GateCalibration")
+    results = []
+    for sem, strong, kw, agree in itertools.product(
+        min_semantic, strong_semantic, min_keyword, min_agreement
+    ):
+        gate.min_semantic, gate.strong_semantic = sem, strong
+        gate.min_keyword, gate.min_agreement = kw, agree
+        rejected = [
+            s
+            for s in samples
+            if not gate.decide(s.semantic_top, s.keyword_top, s.agreement)[0]
+        ]
+        false_rejects = sum(s.answerable for s in rejected)
+        results.append(
+            GateSweepResult(
+                min_semantic=sem,
+                strong_semantic=strong,
+                min_keyword=kw,
+                min_agreement=agree,
+                skip_rate=len(rejected) / len(samples) if samples else 0.0,
+                false_reject=false_rejects / positives if positives else 0.0,
+                true_reject=(
+                    (len(rejected) - false_rejects) / negatives if negatives else 0.0
+                ),
+            )
+        )
+    return results
+
+
+def best_thresholds(
+    results: Sequence[GateSweepResult], max_false_reject: float
+) -> Optional[GateSweepResult]:
+    """Cấu hình chặn nhiều nhất (skip_rate cao nhất) trong ngân sách false_reject."""
+    passing = [r for r in results if r.false_reject <= max_false_reject]
+    if not passing:
+        return None
+    return max(passing, key=lambda r: (r.skip_rate, r.true_reject, -r.false_reject))
+
+
+def format_results(results: Sequence[GateSweepResult]) -> str:
+    """Định dạng bảng kết quả."""
+    header = (
+        f"{'min_sem':>8} {'strong':>7} {'min_kw':>7} {'agree':>6} "
+        f"{'skip':>7} {'false_rej':>10} {'true_rej':>9}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.min_semantic:>8.2f} {r.strong_semantic:>7.2f} {r.min_keyword:>7.2f} "
+            f"{r.min_agreement:>6.2f} {r.skip_rate:>7.3f} {r.false_reject:>10.3f} "
+            f"{r.true_reject:>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+def _floats(value: str) -> List[float]:
+    return [float(x) for x in value.split(",") if x]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hiệu chỉnh ngưỡng answerability gate")
+    parser.add_argument("--dataset", help="File .jsonl có nhãn")
+    parser.add_argument("--features", help="Đọc đặc trưng đã lưu thay vì search lại")
+    parser.add_argument("--save-features", help="Ghi đặc trưng ra file .jsonl")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--alpha", type=float, default=0.9)
+    parser.add_argument("--fusion", default="weighted")
+    parser.add_argument("--min-semantic", default="0.3,0.35,0.4,0.45,0.5,0.55,0.6")
+    parser.add_argument("--strong-semantic", default="0.7,0.75,0.8")
+    parser.add_argument("--min-keyword", default="0.5,1,2,3,4,6")
+    parser.add_argument("--min-agreement", default="0,0.2,0.4")
+    parser.add_argument(
+        "--sparse",
+        action="store_true",
+        help="Đặc trưng (--features) lấy từ keyword search sparse phía Qdrant",
+    )
+    parser.add_argument("--max-false-reject", type=float, default=0.02)
+    parser.add_argument("--top", type=int, default=15, help="Số cấu hình in ra")
+    parser.add_argument("--output", help="Ghi kết quả JSON ra file")
+    args = parser.parse_args()
+
+    if args.features:
+        with open(args.features, "r", encoding="utf-8") as f:
+            samples = [GateSample(**json.loads(line)) for line in f if line.strip()]
+    elif args.dataset:
+        searcher = _build_searchers([{"name": "default"}])["default"]
+        args.sparse = searcher.server_side
+        samples = collect_samples(
+            searcher, load_dataset(args.dataset), args.top_k, args.alpha, args.fusion
+        )
+    else:
+        parser.error("Cần --dataset hoặc --features")
+
+    if args.save_features:
+        with open(args.save_features, "w", encoding="utf-8") as f:
+            for s in samples:
+                f.write(json.dumps(s.to_dict(), ensure_ascii=False) + "\n")
+
+    results = sweep(
+        samples,
+        min_semantic=_floats(args.min_semantic),
+        strong_semantic=_floats(args.strong_semantic),
+        min_keyword=_floats(args.min_keyword),
+        min_agreement=_floats(args.min_agreement),
+    )
+    ranked = sorted(results, key=lambda r: (r.false_reject, -r.skip_rate))
+    print(format_results(ranked[: args.top]))
+
+    best = best_thresholds(results, args.max_false_reject)
+    if best:
+        print(f"\n🏁 Chặn nhiều nhất với false_reject <= {args.max_false_reject}:")
+        print(format_results([best]))
+        print(
+            f"\nGATE_MIN_SEMANTIC={best.min_semantic} "
+            f"GATE_STRONG_SEMANTIC={best.strong_semantic} "
+            f"{'GATE_MIN_KEYWORD_SPARSE' if args.sparse else 'GATE_MIN_KEYWORD'}"
+            f"={best.min_keyword} "
+            f"GATE_MIN_AGREEMENT={best.min_agreement}"
+        )
+    else:
+        print(f"\n⚠️ Không cấu hình nào có false_reject <= {args.max_false_reject}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "samples": len(samples),
+                    "results": [r.to_dict() for r in results],
+                    "best": best.to_dict() if best else None,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
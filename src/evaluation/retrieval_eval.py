@@ -0,0 +1,424 @@
+"""
+Đánh giá chất lượng truy hồi (recall@k, MRR, nDCG) song song với độ trễ
+cho các chiến lược tìm kiếm của QdrantSearcher, sau đó in Pareto frontier
+chất lượng / độ trễ để chọn cấu hình nhanh nhất đạt ngưỡng chất lượng.
+
+Định dạng tập đánh giá (.jsonl), mỗi dòng một câu hỏi:
+    {"question": "...", "relevant_ids": ["..."]}
+    {"question": "...", "relevant_pages": [3, 4]}
+    {"question": "...", "relevant_texts": ["đoạn văn bản phải xuất hiện"]}
+
+Định dạng file profile (.json), mỗi profile là một collection/cấu hình HNSW:
+    [{"name": "default", "collection_name": "pdf_documents", "hnsw_ef": 64}]
+
+Ví dụ:
+    python -m src.evaluation.retrieval_eval --dataset data/eval.jsonl \\
+        --modes semantic,keyword,hybrid --alphas 0.5,0.7,0.9 --top-k 3,5 \\
+        --fusions weighted,minmax,rrf --min-quality 0.8
+"""
+
+import argparse
+import json
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from src.utils.logger import Logger
+
+QUALITY_METRICS = ("recall", "mrr", "ndcg")
+
+
+# ==========================================================
+# 🔹 Dữ liệu
+# ==========================================================
+@dataclass
+class EvalExample:
+    """Một câu hỏi kèm các đơn vị liên quan (id, trang hoặc đoạn text)."""
+
+    question: str
+    relevant_ids: List[str] = field(default_factory=list)
+    relevant_pages: List[int] = field(default_factory=list)
+    relevant_texts: List[str] = field(default_factory=list)
+
+    @property
+    def num_relevant(self) -> int:
+        return (
+            len(self.relevant_ids) + len(self.relevant_pages) + len(self.relevant_texts)
+        )
+
+    def matched_units(self, result: Dict[str, Any]) -> Set[str]:
+        """Trả về tập đơn vị liên quan mà một kết quả tìm kiếm bao phủ."""
+        payload = result.get("payload") or {}
+        units = set()
+        if str(result.get("id")) in self.relevant_ids:
+            units.add(f"id:{result['id']}")
+        page = payload.get("page_number")
+        if page is not None and page in self.relevant_pages:
+            units.add(f"page:{page}")
+        text = payload.get("text", "")
+        for i, snippet in enumerate(self.relevant_texts):
+            if snippet and snippet in text:
+                units.add(f"text:{i}")
+        return units
+
+
+@dataclass
+class SearchConfig:
+    """Một điểm trong không gian tham số cần quét."""
+
+    profile: str
+    mode: str  # "semantic" | "keyword" | "hybrid"
+    top_k: int
+    alpha: Optional[float] = None
+    fusion: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        parts = [self.profile, self.mode, f"k={self.top_k}"]
+        if self.mode == "hybrid":
+            parts += [self.fusion, f"alpha={self.alpha}"]
+        return " ".join(parts)
+
+
+@dataclass
+class EvalResult:
+    """Kết quả đánh giá của một cấu hình."""
+
+    config: SearchConfig
+    recall: float
+    mrr: float
+    ndcg: float
+    mean_latency_ms: float
+    p99_latency_ms: float
+    errors: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def load_dataset(path: str) -> List[EvalExample]:
+    """Đọc tập đánh giá từ file .jsonl."""
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            examples.append(
+                EvalExample(
+                    question=record.get("question") or record["query"],
+                    relevant_ids=[str(x) for x in record.get("relevant_ids", [])],
+                    relevant_pages=[int(x) for x in record.get("relevant_pages", [])],
+                    relevant_texts=list(record.get("relevant_texts", [])),
+                )
+            )
+    return examples
+
+
+# ==========================================================
+# 🔹 Metric
+# ==========================================================
+def score_ranking(
+    example: EvalExample, results: Sequence[Dict[str, Any]], k: int
+) -> Dict[str, float]:
+    """
+    Tính recall@k, MRR và nDCG@k (relevance nhị phân) cho một câu hỏi.
+
+    Mỗi đơn vị liên quan chỉ được tính một lần, ở thứ hạng đầu tiên bao phủ nó.
+    """
+    if example.num_relevant == 0:
+        return {"recall": 0.0, "mrr": 0.0, "ndcg": 0.0}
+
+    found: Set[str] = set()
+    first_hit_rank = None
+    dcg = 0.0
+    for rank, result in enumerate(results[:k], start=1):
+        new_units = example.matched_units(result) - found
+        if new_units:
+            found |= new_units
+            dcg += 1.0 / math.log2(rank + 1)
+            if first_hit_rank is None:
+                first_hit_rank = rank
+
+    ideal_hits = min(example.num_relevant, k)
+    idcg = sum(1.0 / math.log2(rank + 1) for rank in range(1, ideal_hits + 1))
+    return {
+        "recall": len(found) / example.num_relevant,
+        "mrr": 1.0 / first_hit_rank if first_hit_rank else 0.0,
+        "ndcg": dcg / idcg if idcg > 0 else 0.0,
+    }
+
+
+def pareto_frontier(
+    results: Sequence[EvalResult], metric: str = "recall"
+) -> List[EvalResult]:
+    """
+    Các cấu hình không bị chi phối: không có cấu hình nào khác vừa có
+    chất lượng >= vừa có p99 latency <= (và tốt hơn hẳn ở ít nhất một tiêu chí).
+    Kết quả sắp xếp theo p99 latency tăng dần.
+    """
+    ordered = sorted(results, key=lambda r: (r.p99_latency_ms, -getattr(r, metric)))
+    frontier: List[EvalResult] = []
+    best_quality = -math.inf
+    for r in ordered:
+        quality = getattr(r, metric)
+        if quality > best_quality:
+            frontier.append(r)
+            best_quality = quality
+    return frontier
+
+
+def fastest_meeting_bar(
+    results: Sequence[EvalResult], metric: str, min_quality: float
+) -> Optional[EvalResult]:
+    """Cấu hình có p99 latency thấp nhất mà vẫn đạt ngưỡng chất lượng."""
+    passing = [r for r in results if getattr(r, metric) >= min_quality]
+    return min(passing, key=lambda r: r.p99_latency_ms) if passing else None
+
+
+# ==========================================================
+# 🔹 Evaluator
+# ==========================================================
+class RetrievalEvaluator:
+    """
+    Quét các cấu hình tìm kiếm trên tập câu hỏi có nhãn và đo chất lượng + độ trễ.
+    """
+
+    def __init__(
+        self,
+        searchers: Dict[str, Any],
+        profile_params: Optional[Dict[str, Dict[str, Any]]] = None,
+        repeats: int = 1,
+        log_name: str = "RetrievalEvaluator",
+    ) -> None:
+        """
+        Args:
+            searchers (Dict[str, QdrantSearcher]): Profile name -> searcher.
+            profile_params (dict, optional): Profile name -> tham số search thêm
+                (VD: {"hnsw_ef": 128}).
+            repeats (int): Số lần chạy lặp mỗi câu hỏi để đo latency ổn định hơn.
+            log_name (str): Tên logger.
+        """
+        self.logger = Logger(name=log_name).get_logger()
+        self.searchers = searchers
+        self.profile_params = profile_params or {}
+        self.repeats = max(1, repeats)
+
+    @staticmethod
+    def build_grid(
+        profiles: Sequence[str],
+        modes: Sequence[str],
+        top_ks: Sequence[int],
+        alphas: Sequence[float],
+        fusions: Sequence[str],
+    ) -> List[SearchConfig]:
+        """Sinh lưới cấu hình; alpha/fusion chỉ áp dụng cho hybrid."""
+        grid = []
+        for profile in profiles:
+            for mode in modes:
+                for top_k in top_ks:
+                    if mode != "hybrid":
+                        grid.append(SearchConfig(profile, mode, top_k))
+                        continue
+                    for fusion in fusions:
+                        for alpha in alphas:
+                            grid.append(
+                                SearchConfig(profile, mode, top_k, alpha, fusion)
+                            )
+        return grid
+
+    def _search(self, config: SearchConfig, query: str) -> List[Dict[str, Any]]:
+        searcher = self.searchers[config.profile]
+        hnsw_ef = self.profile_params.get(config.profile, {}).get("hnsw_ef")
+        if config.mode == "semantic":
+            return searcher.semantic_search(query, top_k=config.top_k, hnsw_ef=hnsw_ef)
+        if config.mode == "keyword":
+            return searcher.keyword_search(query, top_k=config.top_k)
+        if config.mode == "hybrid":
+            return searcher.hybrid_search(
+                query,
+                top_k=config.top_k,
+                alpha=config.alpha,
+                fusion=config.fusion,
+                hnsw_ef=hnsw_ef,
+            )
+        raise ValueError(f"❌ Mode không hợp lệ: {config.mode}")
+
+    def evaluate_config(
+        self, config: SearchConfig, examples: Sequence[EvalExample]
+    ) -> EvalResult:
+        """Đánh giá một cấu hình trên toàn bộ tập câu hỏi."""
+        latencies: List[float] = []
+        scores = {m: [] for m in QUALITY_METRICS}
+        errors = 0
+
+        for example in examples:
+            results: List[Dict[str, Any]] = []
+            for _ in range(self.repeats):
+                start = time.perf_counter()
+                try:
+                    results = self._search(config, example.question)
+                except Exception as e:
+                    errors += 1
+                    self.logger.warning(f"⚠️ {config.label} lỗi: {e}")
+                    results = []
+                latencies.append((time.perf_counter() - start) * 1000.0)
+
+            for metric, value in score_ranking(example, results, config.top_k).items():
+                scores[metric].append(value)
+
+        lat = np.asarray(latencies or [0.0])
+        return EvalResult(
+            config=config,
+            recall=float(np.mean(scores["recall"])) if examples else 0.0,
+            mrr=float(np.mean(scores["mrr"])) if examples else 0.0,
+            ndcg=float(np.mean(scores["ndcg"])) if examples else 0.0,
+            mean_latency_ms=float(lat.mean()),
+            p99_latency_ms=float(np.percentile(lat, 99)),
+            errors=errors,
+        )
+
+    def run(
+        self, grid: Sequence[SearchConfig], examples: Sequence[EvalExample]
+    ) -> List[EvalResult]:
+        """Chạy toàn bộ lưới cấu hình."""
+        self.logger.info(
+            f"🚀 Đánh giá {len(grid)} cấu hình trên {len(examples)} câu hỏi"
+        )
+        results = []
+        for config in grid:
+            result = self.evaluate_config(config, examples)
+            self.logger.info(
+                f"✅ {config.label}: recall={result.recall:.3f} mrr={result.mrr:.3f} "
+                f"ndcg={result.ndcg:.3f} p99={result.p99_latency_ms:.1f}ms"
+            )
+            results.append(result)
+        return results
+
+
+def format_results(results: Sequence[EvalResult]) -> str:
+    """Định dạng bảng kết quả."""
+    header = (
+        f"{'config':<48} {'recall':>7} {'mrr':>7} {'ndcg':>7} "
+        f"{'mean ms':>9} {'p99 ms':>9}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.config.label:<48} {r.recall:>7.3f} {r.mrr:>7.3f} {r.ndcg:>7.3f} "
+            f"{r.mean_latency_ms:>9.2f} {r.p99_latency_ms:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _build_searchers(profiles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Khởi tạo một QdrantSearcher cho mỗi profile (collection)."""
+    from src.embedding.embedding import get_embedding_model
+    from src.utils.config import get_settings
+    from src.utils.text_cleaner import TextCleaner
+    from src.vector_db.client import QdrantIngestor
+    from src.vector_db.connection import get_qdrant_client
+    from src.vector_db.search_strategy import QdrantSearcher
+
+    settings = get_settings()
+    client = get_qdrant_client()
+    embedding_model = get_embedding_model(
+        model_name=settings.JINA_MODEL_NAME,
+        task=settings.JINA_TASK,
+        device=settings.DEVICE,
+        backend=settings.EMBED_BACKEND,
+    )
+    text_cleaner = TextCleaner("TextCleaner")
+
+    searchers = {}
+    for profile in profiles:
+        collection_name = profile.get("collection_name", settings.COLLECTION_NAME)
+        ingestor = QdrantIngestor(
+            client=client,
+            collection_name=collection_name,
+            vector_size=settings.VECTOR_SIZE,
+            device=settings.DEVICE,
+            log_name="EvalIngestor",
+            reset_collection=False,
+        )
+        searchers[profile["name"]] = QdrantSearcher(
+            embedding_model=embedding_model,
+            qdrant_db=ingestor,
+            collection_name=collection_name,
+            text_cleaner=text_cleaner,
+            log_name="EvalSearcher",
+        )
+    return searchers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Đánh giá chất lượng vs độ trễ của các chiến lược tìm kiếm"
+    )
+    parser.add_argument("--dataset", required=True, help="File .jsonl có nhãn")
+    parser.add_argument("--profiles", help="File .json danh sách collection profile")
+    parser.add_argument("--modes", default="semantic,keyword,hybrid")
+    parser.add_argument("--fusions", default="weighted,minmax,rrf")
+    parser.add_argument("--alphas", default="0.3,0.5,0.7,0.9")
+    parser.add_argument("--top-k", default="3,5,10")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--metric", choices=QUALITY_METRICS, default="recall")
+    parser.add_argument("--min-quality", type=float, default=None)
+    parser.add_argument("--output", help="Ghi kết quả JSON ra file")
+    args = parser.parse_args()
+
+    if args.profiles:
+        with open(args.profiles, "r", encoding="utf-8") as f:
+            profiles = json.load(f)
+    else:
+        profiles = [{"name": "default"}]
+
+    examples = load_dataset(args.dataset)
+    evaluator = RetrievalEvaluator(
+        searchers=_build_searchers(profiles),
+        profile_params={p["name"]: p for p in profiles},
+        repeats=args.repeats,
+    )
+    grid = RetrievalEvaluator.build_grid(
+        profiles=[p["name"] for p in profiles],
+        modes=[m for m in args.modes.split(",") if m],
+        top_ks=[int(k) for k in args.top_k.split(",") if k],
+        alphas=[float(a) for a in args.alphas.split(",") if a],
+        fusions=[f for f in args.fusions.split(",") if f],
+    )
+    results = evaluator.run(grid, examples)
+
+    print(format_results(results))
+    frontier = pareto_frontier(results, metric=args.metric)
+    print(f"\nPareto frontier ({args.metric} vs p99 latency):")
+    print(format_results(frontier))
+
+    best = None
+    if args.min_quality is not None:
+        best = fastest_meeting_bar(results, args.metric, args.min_quality)
+        if best:
+            print(f"\n🏁 Nhanh nhất đạt {args.metric} >= {args.min_quality}: ")
+            print(format_results([best]))
+        else:
+            print(f"\n⚠️ Không cấu hình nào đạt {args.metric} >= {args.min_quality}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "results": [r.to_dict() for r in results],
+                    "frontier": [r.to_dict() for r in frontier],
+                    "best": best.to_dict() if best else None,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Loại chunk trùng lặp giữa TextSplitter và bước embedding.
+
+Hai tầng:
+    1. Trùng tuyệt đối: hash của text đã chuẩn hoá (TextCleaner + lowercase).
+    2. Gần trùng: MinHash trên shingle từ (k từ liên tiếp) + LSH chia band;
+       ứng viên cùng bucket được xác nhận khi Jaccard ước lượng >= threshold.
+
+Các bản trùng được gộp vào chunk xuất hiện đầu tiên; chunk giữ lại có thêm
+`references` (mọi cặp source/page đã gộp) và `duplicate_count`.
+"""
+
+import hashlib
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logger import Logger
+from src.utils.text_cleaner import TextCleaner
+
+_REFERENCE_KEYS = ("source", "page", "page_start", "page_end")
+
+
+@dataclass
+class DedupReport:
+    """Thống kê một lần dedup."""
+
+    input_chunks: int = 0
+    output_chunks: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    input_bytes: int = 0
+    bytes_saved: int = 0
+
+    @property
+    def embeddings_saved(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "embeddings_saved": self.embeddings_saved}
+
+    def summary(self) -> str:
+        ratio = self.bytes_saved / self.input_bytes if self.input_bytes else 0.0
+        return (
+            f"{self.input_chunks} → {self.output_chunks} chunk "
+            f"(trùng tuyệt đối: {self.exact_duplicates}, gần trùng: "
+            f"{self.near_duplicates}); tiết kiệm {self.embeddings_saved} embedding, "
+            f"{self.bytes_saved} bytes ({ratio:.1%})"
+        )
+
+
+class ChunkDeduplicator:
+    """Gộp chunk trùng / gần trùng bằng hash + MinHash LSH."""
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        seed: int = 1,
+        log_name: str = "ChunkDeduplicator",
+    ) -> None:
+        """
+        Args:
+            threshold (float): Ngưỡng Jaccard (0-1) để coi hai chunk là gần trùng;
+                >= 1 chỉ gộp chunk trùng tuyệt đối.
+            num_perm (int): Số hàm hash của MinHash signature.
+            shingle_size (int): Số từ mỗi shingle.
+            seed (int): Seed sinh hàm hash.
+            log_name (str): Tên logger.
+        """
+        self.logger = Logger(name=log_name).get_logger()
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = self._lsh_params(threshold, num_perm)
+
+        # Hàm hash dạng multiply-shift: ((a * x + b) mod 2^64) >> 32, a lẻ
+        rng = np.random.default_rng(seed)
+        max_u64 = np.iinfo(np.uint64).max
+        a = rng.integers(1, max_u64, size=num_perm, dtype=np.uint64)
+        self._a = a | np.uint64(1)
+        self._b = rng.integers(0, max_u64, size=num_perm, dtype=np.uint64)
+        self.report = DedupReport()
+
+    @classmethod
+    def from_settings(cls) -> "ChunkDeduplicator":
+        from src.utils.config import get_settings
+
+        settings = get_settings()
+        return cls(
+            threshold=settings.DEDUP_THRESHOLD,
+            num_perm=settings.DEDUP_NUM_PERM,
+        )
+
+    @staticmethod
+    def _lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+        """
+        Chọn (bands, rows) với bands * rows = num_perm; điểm bật (1/b)^(1/r) cao nhất
+        nhưng không vượt threshold, để ưu tiên recall (ứng viên còn được kiểm lại).
+        """
+        candidates = [
+            (b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0
+        ]
+        below = [br for br in candidates if (1 / br[0]) ** (1 / br[1]) <= threshold]
+        return max(below or candidates[-1:], key=lambda br: (1 / br[0]) ** (1 / br[1]))
+
+    # ==========================================================
+    # 🔹 Hash / MinHash
+    # ==========================================================
+    @staticmethod
+    def normalize(text: str) -> str:
+        return TextCleaner.clean(text).lower()
+
+    def _shingles(self, normalized: str) -> np.ndarray:
+        words = normalized.split()
+        k = self.shingle_size
+        grams = {" ".join(words[i : i + k]) for i in range(max(len(words) - k + 1, 1))}
+        return np.fromiter(
+            (
+                int.from_bytes(
+                    hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little"
+                )
+                for g in grams
+            ),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+
+    def signature(self, normalized: str) -> np.ndarray:
+        """MinHash signature (num_perm giá trị 32-bit) của text đã chuẩn hoá."""
+        hashes = self._shingles(normalized)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [band.tobytes() for band in signature.reshape(self.bands, self.rows)]
+
+    # ==========================================================
+    # 🔹 Dedup
+    # ==========================================================
+    @staticmethod
+    def _reference(chunk: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: chunk[k] for k in _REFERENCE_KEYS if k in chunk}
+
+    def _merge(self, kept: Dict[str, Any], duplicate: Dict[str, Any]) -> None:
+        reference = self._reference(duplicate)
+        if reference not in kept["references"]:
+            kept["references"].append(reference)
+        kept["duplicate_count"] += 1
+
+    def deduplicate(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Trả về danh sách chunk đã gộp trùng (giữ thứ tự xuất hiện đầu tiên).
+        Thống kê lần chạy gần nhất nằm ở `self.report`.
+        """
+        report = DedupReport(input_chunks=len(chunks))
+        kept: List[Dict[str, Any]] = []
+        by_hash: Dict[str, int] = {}
+        signatures: List[Optional[np.ndarray]] = []
+        buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        near_enabled = self.threshold < 1.0
+
+        for chunk in chunks:
+            text = chunk.get("text", "")
+            size = len(text.encode("utf-8"))
+            report.input_bytes += size
+            normalized = self.normalize(text)
+            digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+            match = by_hash.get(digest)
+            if match is not None:
+                report.exact_duplicates += 1
+            elif near_enabled and normalized:
+                signature = self.signature(normalized)
+                keys = self._band_keys(signature)
+                candidates = {
+                    i for band, key in enumerate(keys) for i in buckets[band, key]
+                }
+                match = self._best_candidate(signature, candidates, signatures)
+                if match is not None:
+                    report.near_duplicates += 1
+
+            if match is not None:
+                self._merge(kept[match], chunk)
+                report.bytes_saved += size
+                continue
+
+            index = len(kept)
+            kept.append(
+                {**chunk, "references": [self._reference(chunk)], "duplicate_count": 0}
+            )
+            by_hash[digest] = index
+            if near_enabled and normalized:
+                signatures.append(signature)
+                for band, key in enumerate(keys):
+                    buckets[band, key].append(index)
+            else:
+                signatures.append(None)
+
+        report.output_chunks = len(kept)
+        self.report = report
+        self.logger.info(f"🧹 Dedup: {report.summary()}")
+        return kept
+
+    def _best_candidate(
+        self,
+        signature: np.ndarray,
+        candidates: set,
+        signatures: List[Optional[np.ndarray]],
+    ) -> Optional[int]:
+        """Ứng viên có Jaccard ước lượng cao nhất, nếu đạt ngưỡng."""
+        best, best_score = None, 0.0
+        for i in sorted(candidates):
+            score = float(np.mean(signatures[i] == signature))
+            if score >= self.threshold and score > best_score:
+                best, best_score = i, score
+        return best
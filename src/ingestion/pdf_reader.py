@@ -1,22 +1,118 @@
+import io
+import mmap
+import multiprocessing
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
-from typing import List
+from typing import Any, Iterator, List, Optional, Tuple, Union
 
+from src.utils.lazy import optional_import
 from src.utils.logger import Logger
 
+PDFSource = Union[str, Path, bytes, bytearray, memoryview]
 
-try:
-    import fitz  # PyMuPDF
 
-    _HAS_FITZ = True
-except Exception:
-    _HAS_FITZ = False
+class PageTimeoutError(Exception):
+    """Trích xuất text của một trang vượt quá `page_timeout`."""
 
-try:
-    import PyPDF2
 
-    _HAS_PYPDF2 = True
-except Exception:
-    _HAS_PYPDF2 = False
+def _worker_main(conn: Any, backend: str, source: Union[str, bytes]) -> None:
+    """Process con: mở PDF một lần rồi trích text theo index trang nhận qua pipe."""
+    try:
+        if backend == "fitz":
+            fitz = optional_import("fitz")
+            if isinstance(source, bytes):
+                pdf = fitz.open(stream=source, filetype="pdf")
+            else:
+                pdf = fitz.open(source)
+            extract = lambda index: pdf.load_page(index).get_text()
+        else:
+            PyPDF2 = optional_import("PyPDF2")
+            stream = io.BytesIO(source) if isinstance(source, bytes) else source
+            reader = PyPDF2.PdfReader(stream)
+            extract = lambda index: reader.pages[index].extract_text()
+    except Exception as e:
+        conn.send((False, f"không mở được PDF: {e}"))
+        return
+    conn.send((True, None))
+
+    while True:
+        index = conn.recv()
+        if index is None:
+            return
+        try:
+            conn.send((True, extract(index) or ""))
+        except Exception as e:
+            conn.send((False, str(e)))
+
+
+class _PageWorker:
+    """
+    Trích text từng trang trong một process con để `page_timeout` ngắt được cả
+    code C (PyMuPDF): trang quá hạn thì kill process, trang sau dùng process mới.
+    """
+
+    def __init__(self, backend: str, source: PDFSource, timeout: float) -> None:
+        self.backend = backend
+        self.source = (
+            bytes(source)
+            if isinstance(source, (bytes, bytearray, memoryview))
+            else str(source)
+        )
+        self.timeout = timeout
+        self._process: Optional[Any] = None
+        self._conn: Optional[Any] = None
+
+    def _start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        self._conn, child = context.Pipe()
+        self._process = context.Process(
+            target=_worker_main, args=(child, self.backend, self.source), daemon=True
+        )
+        self._process.start()
+        child.close()
+        # Thời gian khởi động + mở file không tính vào timeout của trang
+        try:
+            self._receive()
+        except RuntimeError:
+            self.close(kill=True)
+            raise
+
+    def _receive(self) -> Any:
+        try:
+            ok, value = self._conn.recv()
+        except EOFError:
+            self.close(kill=True)
+            raise RuntimeError("process đọc PDF đã dừng")
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    def extract(self, index: int) -> str:
+        if self._process is None:
+            self._start()
+        self._conn.send(index)
+        if not self._conn.poll(self.timeout):
+            self.close(kill=True)
+            raise PageTimeoutError(f"quá {self.timeout}s")
+        return self._receive()
+
+    def close(self, kill: bool = False) -> None:
+        if self._process is None:
+            return
+        if kill:
+            self._process.kill()
+        else:
+            try:
+                self._conn.send(None)
+            except OSError:
+                pass
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._conn.close()
+        self._process = self._conn = None
 
 
 class PDFReader:
@@ -24,50 +120,169 @@ class PDFReader:
 
     The reader will try PyMuPDF first (faster and more reliable), and fall back
     to PyPDF2 if PyMuPDF is not available or fails for a specific file.
+
+    `iter_pages` streams `(page_number, text)` one page at a time so only the
+    current page is held in memory; `read_pdf` collects it into a list.
     """
 
     def __init__(self, log_name: str = "PDFReader") -> None:
         self.logger = Logger(name=log_name).get_logger()
 
     def read_pdf(self, file_path: str) -> List[str]:
-        path = Path(file_path)
-        if not path.exists() or path.suffix.lower() != ".pdf":
-            self.logger.error("File PDF không tồn tại hoặc không hợp lệ: %s", file_path)
-            return []
+        return [text for _, text in self.iter_pages(file_path)]
 
-        # Try PyMuPDF first
-        if _HAS_FITZ:
+    def iter_pages(
+        self,
+        source: PDFSource,
+        page_range: Optional[Tuple[int, int]] = None,
+        page_timeout: Optional[float] = None,
+        use_mmap: bool = False,
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Đọc PDF từng trang một.
+
+        Args:
+            source: Đường dẫn file PDF hoặc nội dung PDF dạng bytes.
+            page_range (tuple, optional): (trang đầu, trang cuối), đánh số từ 1 và
+                gồm cả hai đầu; dùng để chia một file lớn cho nhiều worker.
+            page_timeout (float, optional): Số giây tối đa trích xuất một trang;
+                trang quá hạn hoặc lỗi được bỏ qua (trả text rỗng). Khi bật, text
+                được trích trong một process con (spawn, bị kill khi trang quá hạn),
+                nên script gọi cần guard `if __name__ == "__main__":`.
+            use_mmap (bool): Memory-map file thay vì để thư viện PDF tự đọc file.
+
+        Yields:
+            Tuple[int, str]: (số trang tính từ 1, text của trang).
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            name = "<bytes>"
+        else:
+            path = Path(source)
+            name = str(source)
+            if not path.exists() or path.suffix.lower() != ".pdf":
+                self.logger.error("File PDF không tồn tại hoặc không hợp lệ: %s", name)
+                return
+
+        # Try PyMuPDF first (PyMuPDF / PyPDF2 chỉ được import khi đọc file đầu tiên)
+        fitz = optional_import("fitz")
+        if fitz is not None:
+            last_page = 0
             try:
-                self.logger.info("Đang đọc PDF với PyMuPDF: %s", file_path)
-                pages: List[str] = []
-                with fitz.open(path) as pdf:
-                    for p in pdf:
-                        try:
-                            pages.append(p.get_text() or "")
-                        except Exception:
-                            pages.append("")
-                return pages
+                with ExitStack() as stack:
+                    pdf = self._open_fitz(fitz, source, use_mmap, stack)
+                    worker = self._worker("fitz", source, page_timeout, stack)
+                    self.logger.info("Đang đọc PDF với PyMuPDF: %s", name)
+                    for page_number, text in self._iter_fitz(pdf, page_range, worker):
+                        last_page = page_number
+                        yield page_number, text
+                return
             except Exception as e:
                 self.logger.warning("PyMuPDF failed (%s), falling back to PyPDF2", e)
+            if last_page:
+                # PyPDF2 đọc tiếp từ trang sau trang cuối đã trả về
+                page_range = (last_page + 1, page_range[1] if page_range else 10**9)
 
         # Fallback to PyPDF2
-        if _HAS_PYPDF2:
+        PyPDF2 = optional_import("PyPDF2")
+        if PyPDF2 is not None:
             try:
-                self.logger.info("Đang đọc PDF với PyPDF2: %s", file_path)
-                pages = []
-                with open(path, "rb") as f:
-                    reader = PyPDF2.PdfReader(f)
-                    for p in reader.pages:
-                        try:
-                            pages.append(p.extract_text() or "")
-                        except Exception:
-                            pages.append("")
-                return pages
+                with ExitStack() as stack:
+                    reader = self._open_pypdf2(PyPDF2, source, use_mmap, stack)
+                    worker = self._worker("pypdf2", source, page_timeout, stack)
+                    self.logger.info("Đang đọc PDF với PyPDF2: %s", name)
+                    yield from self._iter_pypdf2(reader, page_range, worker)
+                return
             except Exception as e:
                 self.logger.exception("PyPDF2 failed to read PDF: %s", e)
+                return
 
         self.logger.error("No PDF reader available (install pymupdf or pypdf2)")
-        return []
+
+    # ==========================================================
+    # 🔹 Helpers
+    # ==========================================================
+    @staticmethod
+    def _map_file(path: PDFSource, stack: ExitStack) -> mmap.mmap:
+        f = stack.enter_context(open(path, "rb"))
+        return stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def _page_indices(page_count: int, page_range: Optional[Tuple[int, int]]) -> range:
+        if page_range is None:
+            return range(page_count)
+        first, last = page_range
+        return range(max(first, 1) - 1, min(last, page_count))
+
+    @staticmethod
+    def _worker(
+        backend: str, source: PDFSource, page_timeout: Optional[float], stack: ExitStack
+    ) -> Optional[_PageWorker]:
+        if not page_timeout:
+            return None
+        worker = _PageWorker(backend, source, page_timeout)
+        stack.callback(worker.close)
+        return worker
+
+    def _extract(self, page_number: int, extract) -> str:
+        try:
+            return extract() or ""
+        except PageTimeoutError as e:
+            self.logger.warning("⏱️ Bỏ qua trang %d (%s)", page_number, e)
+        except Exception as e:
+            self.logger.warning("⚠️ Không đọc được trang %d: %s", page_number, e)
+        return ""
+
+    def _open_fitz(self, fitz, source: PDFSource, use_mmap: bool, stack: ExitStack):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            pdf = fitz.open(stream=source, filetype="pdf")
+        elif use_mmap:
+            view = stack.enter_context(memoryview(self._map_file(source, stack)))
+            pdf = fitz.open(stream=view, filetype="pdf")
+        else:
+            pdf = fitz.open(Path(source))
+        stack.callback(pdf.close)
+        return pdf
+
+    def _iter_fitz(
+        self,
+        pdf,
+        page_range: Optional[Tuple[int, int]],
+        worker: Optional[_PageWorker],
+    ) -> Iterator[Tuple[int, str]]:
+        for index in self._page_indices(pdf.page_count, page_range):
+            if worker is not None:
+                yield index + 1, self._extract(
+                    index + 1, partial(worker.extract, index)
+                )
+                continue
+            page = pdf.load_page(index)
+            yield index + 1, self._extract(index + 1, page.get_text)
+            del page
+
+    def _open_pypdf2(self, PyPDF2, source: PDFSource, use_mmap: bool, stack: ExitStack):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            stream = io.BytesIO(source)
+        elif use_mmap:
+            stream = self._map_file(source, stack)
+        else:
+            stream = stack.enter_context(open(source, "rb"))
+        return PyPDF2.PdfReader(stream)
+
+    def _iter_pypdf2(
+        self,
+        reader,
+        page_range: Optional[Tuple[int, int]],
+        worker: Optional[_PageWorker],
+    ) -> Iterator[Tuple[int, str]]:
+        for index in self._page_indices(len(reader.pages), page_range):
+            if worker is not None:
+                yield index + 1, self._extract(
+                    index + 1, partial(worker.extract, index)
+                )
+                continue
+            page = reader.pages[index]
+            yield index + 1, self._extract(index + 1, page.extract_text)
+            del page
 
 
 if __name__ == "__main__":
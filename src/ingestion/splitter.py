@@ -1,28 +1,38 @@
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+from src.utils.lazy import optional_import
 from src.utils.logger import Logger
 from src.utils.text_cleaner import TextCleaner
 from src.utils.config import get_settings
 
-try:
-    import tiktoken
-
-    _HAS_TIKTOKEN = True
-except Exception:
-    _HAS_TIKTOKEN = False
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class TextSplitter:
     """
     Chia text thành các đoạn (chunk) nhỏ để xử lý embedding hoặc lưu vào Vector DB.
+
+    Chế độ `batch_encode` encode nhiều trang một lần bằng `encode_batch` của tiktoken
+    (chạy song song trên `num_threads` thread) và cắt chunk trực tiếp trên byte của
+    text gốc theo offset của token thay vì decode lại từng cửa sổ token; kết quả
+    giống hệt cách chia mặc định. `cross_page` cho phép chunk nối qua ranh giới trang,
+    kèm metadata `page_start` / `page_end`.
     """
 
+    # Độ dài (byte) của từng token id, dùng chung cho các splitter cùng encoding
+    _token_byte_lengths: Dict[str, "np.ndarray"] = {}
+
     def __init__(
         self,
         chunk_size: int,
         chunk_overlap: int,
         model_name: str,
         log_name: str = "TextSplitter",
+        batch_encode: bool = False,
+        num_threads: int = 8,
+        cross_page: bool = False,
     ):
         """
         Args:
@@ -30,12 +40,20 @@ class TextSplitter:
             chunk_overlap (int): Số token chồng giữa các chunk.
             model_name (str): Tên model để chọn tokenizer tương ứng.
             log_name (str): Tên logger, mặc định là "TextSplitter".
+            batch_encode (bool): Encode các trang theo batch, cắt chunk theo offset.
+            num_threads (int): Số thread cho `encode_batch`.
+            cross_page (bool): Cho phép chunk nối qua nhiều trang (bật batch_encode).
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.batch_encode = batch_encode or cross_page
+        self.num_threads = num_threads
+        self.cross_page = cross_page
         self.logger = Logger(name=log_name).get_logger()
 
-        if _HAS_TIKTOKEN:
+        # tiktoken chỉ được import khi tạo splitter, không phải lúc import module
+        tiktoken = optional_import("tiktoken")
+        if tiktoken is not None:
             try:
                 self.encoding = tiktoken.encoding_for_model(model_name)
                 self.logger.info(f"✅ Sử dụng tokenizer của model: {model_name}")
@@ -99,27 +117,223 @@ class TextSplitter:
         return chunks
 
     def split_pages(
-        self, pages: List[str], source_name: Optional[str] = None
+        self,
+        pages: Iterable[Union[str, Tuple[int, str]]],
+        source_name: Optional[str] = None,
     ) -> List[Dict[str, str]]:
         """
         Chia nhiều trang PDF thành các chunk, mỗi chunk kèm metadata {text, source, page}.
 
         Args:
-            pages (List[str]): Danh sách các trang văn bản.
+            pages: Danh sách các trang văn bản, hoặc stream `(số trang, text)`
+                như `PDFReader.iter_pages` (được đọc dần, không cần giữ mọi trang).
             source_name (str): Tên nguồn hoặc file PDF.
 
         Returns:
             List[Dict[str, str]]: Danh sách tất cả các chunk.
         """
-        all_chunks = []
-        for i, page_text in enumerate(pages):
-            metadata = {"source": source_name, "page": i + 1}
-            page_chunks = self.split_text(page_text, metadata)
-            all_chunks.extend(page_chunks)
+        numbered = self._numbered(pages)
+        if self.batch_encode and self.encoding is not None:
+            if self.cross_page:
+                all_chunks = self._split_cross_page(numbered, source_name)
+            else:
+                all_chunks = []
+                while True:
+                    group = list(islice(numbered, self._group_size))
+                    if not group:
+                        break
+                    all_chunks.extend(self._split_batched(group, source_name))
+        else:
+            all_chunks = []
+            for page_number, page_text in numbered:
+                metadata = {"source": source_name, "page": page_number}
+                page_chunks = self.split_text(page_text, metadata)
+                all_chunks.extend(page_chunks)
 
         self.logger.info(f"✅ Tổng số chunk sau khi chia: {len(all_chunks)}")
         return all_chunks
 
+    # ==========================================================
+    # 🔹 Batch encode + cắt theo offset
+    # ==========================================================
+    @staticmethod
+    def _numbered(
+        pages: Iterable[Union[str, Tuple[int, str]]],
+    ) -> Iterator[Tuple[int, str]]:
+        for i, page in enumerate(pages):
+            yield page if isinstance(page, tuple) else (i + 1, page)
+
+    @property
+    def _group_size(self) -> int:
+        """Số trang encode mỗi lần (`encode_batch`) khi đọc stream trang."""
+        return max(self.num_threads * 8, 64)
+
+    def _byte_lengths(self) -> "np.ndarray":
+        """Bảng độ dài byte của mọi token id (tính một lần cho mỗi encoding)."""
+        import numpy as np
+
+        table = TextSplitter._token_byte_lengths.get(self.encoding.name)
+        if table is None:
+            table = np.zeros(self.encoding.max_token_value + 1, dtype=np.int64)
+            for token in range(len(table)):
+                try:
+                    table[token] = len(self.encoding.decode_single_token_bytes(token))
+                except KeyError:
+                    pass
+            TextSplitter._token_byte_lengths[self.encoding.name] = table
+        return table
+
+    def _windows(self, n_tokens: int) -> Iterable[Tuple[int, int]]:
+        """Các cửa sổ token [start, end) theo đúng cách chia của `split_text`."""
+        start = 0
+        while start < n_tokens:
+            yield start, min(start + self.chunk_size, n_tokens)
+            start += self.chunk_size - self.chunk_overlap
+
+    def _encode_pages(self, texts: List[str]) -> List[List[int]]:
+        return self.encoding.encode_batch(texts, num_threads=self.num_threads)
+
+    @staticmethod
+    def _to_bytes(text: str) -> bytes:
+        try:
+            return text.encode("utf-8")
+        except UnicodeEncodeError:
+            # Giống cách tiktoken xử lý surrogate lẻ trước khi encode
+            text = text.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+            return text.encode("utf-8")
+
+    def _offsets(self, tokens: List[int]) -> "np.ndarray":
+        """Offset byte đầu mỗi token (phần tử cuối = tổng số byte)."""
+        import numpy as np
+
+        offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(
+            self._byte_lengths()[np.asarray(tokens, dtype=np.int64)], out=offsets[1:]
+        )
+        return offsets
+
+    def _split_batched(
+        self, pages: List[Tuple[int, str]], source_name: Optional[str]
+    ) -> List[Dict[str, str]]:
+        """Mỗi trang chia riêng, giống hệt `split_text` nhưng encode cả batch."""
+        all_chunks = []
+        encoded = self._encode_pages([text for _, text in pages if text])
+        encoded_iter = iter(encoded)
+        for page_number, page_text in pages:
+            if not page_text:
+                self.logger.warning("⚠️ Text rỗng, bỏ qua.")
+                continue
+            tokens = next(encoded_iter)
+            data = self._to_bytes(page_text)
+            offsets = self._offsets(tokens)
+            for start, end in self._windows(len(tokens)):
+                payload = {
+                    "text": data[offsets[start] : offsets[end]].decode(
+                        "utf-8", errors="replace"
+                    )
+                }
+                payload.update({"source": source_name, "page": page_number})
+                all_chunks.append(payload)
+        return all_chunks
+
+    def _split_cross_page(
+        self, pages: Iterator[Tuple[int, str]], source_name: Optional[str]
+    ) -> List[Dict[str, str]]:
+        """
+        Nối token của các trang (ngăn cách bởi xuống dòng) thành một dòng token
+        rồi chia cửa sổ; mỗi chunk ghi trang bắt đầu / kết thúc.
+
+        Trang được đọc và encode theo nhóm; sau mỗi nhóm, các cửa sổ đã đủ
+        `chunk_size` token được cắt ngay và chỉ phần đuôi (chưa thuộc cửa sổ
+        nào hoặc thuộc phần overlap) được giữ lại cho nhóm sau.
+        """
+        import numpy as np
+
+        separator = np.asarray(self.encoding.encode("\n"), dtype=np.int64)
+        step = self.chunk_size - self.chunk_overlap
+        # Phần đuôi còn giữ: token, trang của từng token, byte và offset byte
+        tokens = np.zeros(0, dtype=np.int64)
+        page_of_token = np.zeros(0, dtype=np.int64)
+        offsets = np.zeros(1, dtype=np.int64)
+        data = b""
+        first_page = True
+
+        all_chunks: List[Dict[str, str]] = []
+        while True:
+            group = list(islice(pages, self._group_size))
+            if not group:
+                break
+            group = [(number, text) for number, text in group if text]
+            if not group:
+                continue
+
+            token_parts, page_parts, byte_parts = [], [], []
+            for page_tokens, (page_number, page_text) in zip(
+                self._encode_pages([text for _, text in group]), group
+            ):
+                page_tokens = np.asarray(page_tokens, dtype=np.int64)
+                page_bytes = self._to_bytes(page_text)
+                if not first_page:
+                    page_tokens = np.concatenate([separator, page_tokens])
+                    page_bytes = b"\n" + page_bytes
+                first_page = False
+                token_parts.append(page_tokens)
+                page_parts.append(np.full(len(page_tokens), page_number, np.int64))
+                byte_parts.append(page_bytes)
+
+            new_tokens = np.concatenate(token_parts)
+            offsets = np.concatenate(
+                [offsets, self._offsets(new_tokens)[1:] + offsets[-1]]
+            )
+            tokens = np.concatenate([tokens, new_tokens])
+            page_of_token = np.concatenate([page_of_token, *page_parts])
+            data += b"".join(byte_parts)
+
+            # Cửa sổ đủ dài không phụ thuộc các trang sau → cắt ngay
+            start = 0
+            while start + self.chunk_size <= len(tokens):
+                all_chunks.append(
+                    self._cross_page_chunk(
+                        data, offsets, page_of_token, start, start + self.chunk_size
+                    )
+                )
+                start += step
+            data = data[offsets[start] :]
+            offsets = offsets[start:] - offsets[start]
+            tokens = tokens[start:]
+            page_of_token = page_of_token[start:]
+
+        start = 0
+        while start < len(tokens):
+            end = min(start + self.chunk_size, len(tokens))
+            all_chunks.append(
+                self._cross_page_chunk(data, offsets, page_of_token, start, end)
+            )
+            start += step
+
+        for chunk in all_chunks:
+            chunk["source"] = source_name
+        return all_chunks
+
+    @staticmethod
+    def _cross_page_chunk(
+        data: bytes,
+        offsets: "np.ndarray",
+        page_of_token: "np.ndarray",
+        start: int,
+        end: int,
+    ) -> Dict[str, str]:
+        page_start = int(page_of_token[start])
+        return {
+            "text": data[offsets[start] : offsets[end]].decode(
+                "utf-8", errors="replace"
+            ),
+            "source": None,
+            "page": page_start,
+            "page_start": page_start,
+            "page_end": int(page_of_token[end - 1]),
+        }
+
 
 if __name__ == "__main__":
     settings = get_settings()
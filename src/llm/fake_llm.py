@@ -0,0 +1,60 @@
+import random
+import time
+from typing import Iterator, Optional
+
+from src.llm.llm import LLMConfig, LLMGenerator
+
+
+class FakeLLMGenerator(LLMGenerator):
+    """
+    LLM giả lập dùng cho load-test và kiểm thử: không gọi API thật,
+    chỉ ngủ theo độ trễ cấu hình rồi trả về câu trả lời cố định.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        jitter_ms: float = 200.0,
+        error_rate: float = 0.0,
+        answer: str = "Đây là câu trả lời giả lập từ FakeLLM.",
+        seed: Optional[int] = None,
+        log_name: str = "FakeLLM",
+    ) -> None:
+        """
+        Args:
+            latency_ms (float): Độ trễ trung bình mỗi lần gọi (ms).
+            jitter_ms (float): Biên độ dao động ngẫu nhiên quanh latency_ms (ms).
+            error_rate (float): Xác suất một lần gọi bị lỗi (0..1).
+            answer (str): Nội dung câu trả lời trả về.
+            seed (int, optional): Seed cho bộ sinh số ngẫu nhiên.
+            log_name (str): Tên logger.
+        """
+        config = LLMConfig(
+            model_name="fake-llm", temperature=0.0, max_tokens=1024, api_key=""
+        )
+        super().__init__(config=config, log_name=log_name)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.answer = answer
+        self._rng = random.Random(seed)
+
+    def _sample_latency(self) -> float:
+        """Sinh độ trễ (giây) cho một lần gọi, không âm."""
+        delay_ms = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(delay_ms, 0.0) / 1000.0
+
+    def _call_llm(self, prompt: str) -> str:
+        time.sleep(self._sample_latency())
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise RuntimeError("FakeLLM: lỗi giả lập")
+        return self.answer
+
+    def _stream_llm(self, prompt: str) -> Iterator[str]:
+        words = self.answer.split(" ")
+        per_token = self._sample_latency() / max(len(words), 1)
+        for i, word in enumerate(words):
+            time.sleep(per_token)
+            if self.error_rate and self._rng.random() < self.error_rate / len(words):
+                raise RuntimeError("FakeLLM: lỗi giả lập")
+            yield word if i == 0 else " " + word
@@ -1,11 +1,17 @@
 # src/llm/llm_generator.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from dataclasses import dataclass
-from groq import Groq
 
+from src.llm.transport import LLMTransport, LLMTransportError, RetryPolicy
 from src.utils.config import get_settings
 from src.utils.logger import Logger
 
+BUSY_MESSAGE = "Hệ thống đang bận, vui lòng thử lại sau ít phút."
+ERROR_MESSAGE = "Đã có lỗi khi tạo câu trả lời, vui lòng thử lại sau."
+NOT_FOUND_MESSAGE = (
+    "Tôi không tìm thấy thông tin để trả lời câu hỏi này trong tài liệu được cung cấp."
+)
+
 
 @dataclass
 class LLMConfig:
@@ -17,6 +23,13 @@ class LLMConfig:
     temperature: float
     max_tokens: int
     api_key: str
+    base_url: str = "https://api.groq.com/openai/v1"
+    timeout_s: float = 30.0
+    max_retries: int = 3
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    max_concurrency: int = 4
+    hedge_after_s: Optional[float] = None
 
     @classmethod
     def from_settings(cls) -> "LLMConfig":
@@ -29,6 +42,13 @@ class LLMConfig:
             temperature=0.3,
             max_tokens=1024,
             api_key=settings.GROQ_API_KEY,
+            base_url=settings.GROQ_BASE_URL,
+            timeout_s=settings.LLM_TIMEOUT_S,
+            max_retries=settings.LLM_MAX_RETRIES,
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE or None,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE or None,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            hedge_after_s=settings.LLM_HEDGE_AFTER_S or None,
         )
 
 
@@ -42,11 +62,16 @@ class LLMGenerator:
         # Initialize client only if api_key present
         self.client = None
         if config.api_key:
-            try:
-                self.client = Groq(api_key=config.api_key)
-            except Exception:
-                self.client = None
-        self.logger = Logger(name=log_name).get_logger()
+            self.client = LLMTransport(
+                base_url=config.base_url,
+                api_key=config.api_key,
+                timeout_s=config.timeout_s,
+                retry_policy=RetryPolicy(max_retries=config.max_retries),
+                requests_per_minute=config.requests_per_minute,
+                tokens_per_minute=config.tokens_per_minute,
+                max_concurrency=config.max_concurrency,
+                hedge_after_s=config.hedge_after_s,
+            )
         self.logger = Logger(name=log_name).get_logger()
 
     # ==========================================================
@@ -78,7 +103,7 @@ Nhiệm vụ của bạn là đọc kỹ bối cảnh được cung cấp dướ
 **QUY TẮC BẮT BUỘC:**
 1. CHỈ được phép sử dụng thông tin từ mục [Bối cảnh từ tài liệu] để hình thành câu trả lời.
 2. KHÔNG được sử dụng kiến thức bên ngoài hoặc thông tin có sẵn trong mô hình của bạn.
-3. Nếu câu trả lời không có trong bối cảnh, hãy trả lời thẳng thắn là: "Tôi không tìm thấy thông tin để trả lời câu hỏi này trong tài liệu được cung cấp."
+3. Nếu câu trả lời không có trong bối cảnh, hãy trả lời thẳng thắn là: "{NOT_FOUND_MESSAGE}"
 
 [Bối cảnh từ tài liệu]:
 {context_text}
@@ -90,6 +115,59 @@ Nhiệm vụ của bạn là đọc kỹ bối cảnh được cung cấp dướ
 """
         return prompt.strip()
 
+    # ==========================================================
+    # 🔹 Gọi LLM
+    # ==========================================================
+    def _call_llm(self, prompt: str) -> str:
+        """
+        Gửi prompt lên LLM và trả về nội dung câu trả lời.
+
+        Lớp con (VD: FakeLLMGenerator) override hàm này để thay đổi backend.
+
+        Raises:
+            RuntimeError: Nếu client chưa được khởi tạo.
+        """
+        if not self.client:
+            raise RuntimeError(
+                "LLM client not initialized (missing or invalid API key)"
+            )
+
+        return self.client.chat(
+            messages=self._build_messages(prompt),
+            model=self.config.model_name,
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_tokens,
+        )
+
+    def _stream_llm(self, prompt: str) -> Iterator[str]:
+        """
+        Gửi prompt lên LLM ở chế độ streaming, trả về từng đoạn text.
+
+        Raises:
+            RuntimeError: Nếu client chưa được khởi tạo.
+        """
+        if not self.client:
+            raise RuntimeError(
+                "LLM client not initialized (missing or invalid API key)"
+            )
+
+        yield from self.client.stream_chat(
+            messages=self._build_messages(prompt),
+            model=self.config.model_name,
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_tokens,
+        )
+
+    @staticmethod
+    def _build_messages(prompt: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": "Bạn là trợ lý AI thông minh và lịch sự.",
+            },
+            {"role": "user", "content": prompt},
+        ]
+
     # ==========================================================
     # 🔹 Sinh câu trả lời
     # ==========================================================
@@ -105,44 +183,61 @@ Nhiệm vụ của bạn là đọc kỹ bối cảnh được cung cấp dướ
             debug (bool, optional): In prompt để debug. Mặc định False.
 
         Returns:
-            Dict[str, Any]: Kết quả gồm query, answer và context_used.
+            Dict[str, Any]: Kết quả gồm query, answer, context_used và error
+                (None nếu gọi LLM thành công).
         """
         prompt = self.build_prompt(query, contexts)
 
         if debug:
             self.logger.info(f"🧠 Prompt gửi lên LLM:\n{prompt}\n")
 
+        error = None
         try:
-            if not self.client:
-                raise RuntimeError(
-                    "LLM client not initialized (missing or invalid API key)"
-                )
-
-            response = self.client.chat.completions.create(
-                model=self.config.model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Bạn là trợ lý AI thông minh và lịch sự.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens,
-            )
-            answer = response.choices[0].message.content.strip()
+            answer = self._call_llm(prompt)
             self.logger.info("✅ LLM trả lời thành công.")
+        except LLMTransportError as e:
+            # Lỗi tạm thời (429/5xx/timeout) đã retry hết: không hiển thị lỗi thô
+            self.logger.error(f"❌ LLM không khả dụng sau khi retry: {e}")
+            error = str(e)
+            answer = BUSY_MESSAGE
         except Exception as e:
             self.logger.exception("❌ Lỗi khi gọi LLM:")
-            answer = f"[Lỗi khi gọi LLM]: {str(e)}"
+            error = str(e)
+            answer = f"[Lỗi khi gọi LLM]: {error}"
 
         # If API returned empty string or None, provide a safe fallback
         if not answer:
             self.logger.warning("⚠️ LLM trả lời rỗng, trả fallback message.")
-            answer = "Tôi không tìm thấy thông tin để trả lời câu hỏi này trong tài liệu được cung cấp."
+            answer = NOT_FOUND_MESSAGE
 
         return {
             "query": query,
             "answer": answer,
             "context_used": contexts,
+            "error": error,
         }
+
+    def stream_answer(
+        self, query: str, contexts: List[Dict[str, Any]]
+    ) -> Iterator[str]:
+        """
+        Sinh câu trả lời dạng streaming (từng đoạn text) từ truy vấn và ngữ cảnh.
+
+        Args:
+            query (str): Câu hỏi của người dùng.
+            contexts (List[Dict]): Danh sách ngữ cảnh (từ Qdrant search).
+
+        Yields:
+            str: Các đoạn text của câu trả lời.
+        """
+        prompt = self.build_prompt(query, contexts)
+        try:
+            yield from self._stream_llm(prompt)
+            self.logger.info("✅ LLM stream hoàn tất.")
+        except LLMTransportError as e:
+            # Như generate_answer: không hiển thị 429/timeout thô cho người dùng
+            self.logger.error(f"❌ LLM không khả dụng sau khi retry: {e}")
+            yield BUSY_MESSAGE
+        except Exception:
+            self.logger.exception("❌ Lỗi khi stream LLM:")
+            yield ERROR_MESSAGE
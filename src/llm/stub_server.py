@@ -0,0 +1,203 @@
+"""
+Stub server tương thích OpenAI/Groq `POST .../chat/completions` dùng cho kiểm thử
+LLMTransport và load-test mà không cần gọi API thật.
+
+Có thể cấu hình độ trễ, tỉ lệ lỗi 5xx, tỉ lệ 429 (kèm Retry-After) và tỉ lệ
+request "chậm" để mô phỏng tail latency.
+
+Chạy độc lập:
+    python -m src.llm.stub_server --port 8081 --latency-ms 300 --rate-limit-rate 0.1
+    # GROQ_BASE_URL=http://127.0.0.1:8081/v1
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class StubLLMServer:
+    """Server HTTP chạy trong background thread."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 100.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after_s: float = 0.1,
+        slow_rate: float = 0.0,
+        slow_ms: float = 2000.0,
+        answer: str = "Đây là câu trả lời từ stub server.",
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_s = retry_after_s
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.answer = answer
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _roll(self) -> float:
+        with self._lock:
+            self.requests += 1
+            return self._rng.random()
+
+    def _delay_ms(self) -> float:
+        """Độ trễ của một request (latency ± jitter, cộng slow_ms nếu "chậm")."""
+        with self._lock:
+            delay_ms = self.latency_ms + self._rng.uniform(
+                -self.jitter_ms, self.jitter_ms
+            )
+            if self._rng.random() < self.slow_rate:
+                delay_ms += self.slow_ms
+        return delay_ms
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send_json(self, status: int, body: dict, headers=None) -> None:
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                roll = server._roll()
+                if roll < server.rate_limit_rate:
+                    self._send_json(
+                        429,
+                        {"error": {"message": "rate limit exceeded"}},
+                        {"Retry-After": str(server.retry_after_s)},
+                    )
+                    return
+                if roll < server.rate_limit_rate + server.error_rate:
+                    self._send_json(500, {"error": {"message": "internal error"}})
+                    return
+
+                time.sleep(max(server._delay_ms(), 0.0) / 1000.0)
+
+                if request.get("stream"):
+                    self._stream(request)
+                    return
+                self._send_json(
+                    200,
+                    {
+                        "id": "stub-completion",
+                        "object": "chat.completion",
+                        "model": request.get("model", "stub"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {
+                                    "role": "assistant",
+                                    "content": server.answer,
+                                },
+                                "finish_reason": "stop",
+                            }
+                        ],
+                    },
+                )
+
+            def _stream(self, request: dict) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                self.end_headers()
+                for i, word in enumerate(server.answer.split(" ")):
+                    chunk = {
+                        "object": "chat.completion.chunk",
+                        "model": request.get("model", "stub"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "delta": {"content": word if i == 0 else " " + word},
+                            }
+                        ],
+                    }
+                    line = f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                    self.wfile.write(line.encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub server chat-completions")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+    )
+    print(f"Stub LLM server: {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Transport layer cho API chat-completions tương thích OpenAI/Groq.
+
+- Connection pool dùng chung (requests.Session) và timeout cho mỗi lần gọi.
+- Retry với exponential backoff + full jitter, tôn trọng header Retry-After.
+- Token-bucket giới hạn số request/phút và token/phút.
+- Giới hạn số request đồng thời và worker pool cho lời gọi bất đồng bộ.
+- Hedged request (tuỳ chọn): nếu request chưa xong sau `hedge_after_s`
+  thì gửi thêm một bản sao và lấy kết quả về trước.
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from src.utils.logger import Logger
+
+# requests chỉ được import khi tạo LLMTransport (không phải lúc import src.llm.llm)
+if TYPE_CHECKING:
+    import requests
+
+
+class LLMTransportError(RuntimeError):
+    """Lỗi khi gọi LLM qua HTTP."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retryable: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+# ==========================================================
+# 🔹 Retry & rate limit
+# ==========================================================
+@dataclass
+class RetryPolicy:
+    """Exponential backoff với full jitter."""
+
+    max_retries: int = 3
+    base_delay_s: float = 0.5
+    max_delay_s: float = 8.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Thời gian chờ trước lần thử thứ `attempt + 1` (attempt bắt đầu từ 0)."""
+        backoff = min(self.max_delay_s, self.base_delay_s * (2**attempt))
+        delay = random.uniform(0, backoff)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class TokenBucket:
+    """Token bucket thread-safe: `capacity` token, nạp lại `refill_per_s` token/giây."""
+
+    def __init__(self, capacity: float, refill_per_s: float) -> None:
+        self.capacity = capacity
+        self.refill_per_s = refill_per_s
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.refill_per_s
+        )
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Số giây cần chờ để có đủ `amount` token (0 nếu đã đủ)."""
+        with self._lock:
+            self._refill()
+            missing = min(amount, self.capacity) - self._tokens
+            return max(missing, 0.0) / self.refill_per_s
+
+    def try_consume(self, amount: float) -> bool:
+        with self._lock:
+            self._refill()
+            amount = min(amount, self.capacity)
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return True
+            return False
+
+
+class RateLimiter:
+    """Giới hạn đồng thời theo request/phút và token/phút."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> None:
+        self._requests = (
+            TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+            if requests_per_minute
+            else None
+        )
+        self._tokens = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+            if tokens_per_minute
+            else None
+        )
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def penalize(self, seconds: float) -> None:
+        """Tạm dừng mọi request trong `seconds` giây (VD: khi server trả 429)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def try_acquire(self, tokens: float) -> bool:
+        """Lấy quota nếu có sẵn ngay, không chờ."""
+        with self._lock:
+            if time.monotonic() < self._blocked_until:
+                return False
+            if self._requests and self._requests.wait_time(1) > 0:
+                return False
+            if self._tokens and self._tokens.wait_time(tokens) > 0:
+                return False
+            if self._requests:
+                self._requests.try_consume(1)
+            if self._tokens:
+                self._tokens.try_consume(tokens)
+            return True
+
+    def acquire(self, tokens: float, timeout: Optional[float] = None) -> None:
+        """
+        Chờ tới khi đủ quota cho 1 request tiêu tốn `tokens` token.
+
+        Raises:
+            LLMTransportError: Nếu quá `timeout` giây vẫn chưa đủ quota.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire(tokens):
+            with self._lock:
+                wait_s = max(self._blocked_until - time.monotonic(), 0.0)
+            if self._requests:
+                wait_s = max(wait_s, self._requests.wait_time(1))
+            if self._tokens:
+                wait_s = max(wait_s, self._tokens.wait_time(tokens))
+            wait_s = max(wait_s, 0.005)
+            if deadline is not None and time.monotonic() + wait_s > deadline:
+                raise LLMTransportError("Rate limit quota timeout", retryable=True)
+            time.sleep(wait_s)
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """Ước lượng số token (~4 ký tự/token) cho prompt + phần trả lời tối đa."""
+    chars = sum(len(m.get("content", "")) for m in messages)
+    return chars // 4 + max_tokens
+
+
+# ==========================================================
+# 🔹 Transport
+# ==========================================================
+class LLMTransport:
+    """
+    Client HTTP cho endpoint `POST {base_url}/chat/completions`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout_s: float = 30.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 4,
+        hedge_after_s: Optional[float] = None,
+        log_name: str = "LLMTransport",
+    ) -> None:
+        """
+        Args:
+            base_url (str): VD "https://api.groq.com/openai/v1".
+            api_key (str): API key gửi qua header Authorization.
+            timeout_s (float): Timeout mỗi lần gọi HTTP.
+            retry_policy (RetryPolicy, optional): Chính sách retry.
+            requests_per_minute (float, optional): Giới hạn request/phút.
+            tokens_per_minute (float, optional): Giới hạn token/phút.
+            max_concurrency (int): Số request HTTP đồng thời tối đa.
+            hedge_after_s (float, optional): Gửi request dự phòng sau số giây này.
+            log_name (str): Tên logger.
+        """
+        self.logger = Logger(name=log_name).get_logger()
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.api_key = api_key
+        self.timeout_s = timeout_s
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.hedge_after_s = hedge_after_s
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_concurrency * 2, max_retries=0
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="llm-worker"
+        )
+        self._hedge_pool = ThreadPoolExecutor(
+            max_workers=max_concurrency * 2, thread_name_prefix="llm-hedge"
+        )
+
+    # ------------------------------------------------------
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def _classify(response: "requests.Response") -> LLMTransportError:
+        retry_after = response.headers.get("Retry-After")
+        try:
+            retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            retry_after = None
+        status = response.status_code
+        return LLMTransportError(
+            f"LLM HTTP {status}: {response.text[:200]}",
+            status_code=status,
+            retryable=status == 429 or status >= 500,
+            retry_after=retry_after,
+        )
+
+    def _post(
+        self, payload: Dict[str, Any], stream: bool = False
+    ) -> "requests.Response":
+        """Một lần gọi HTTP, chiếm một slot concurrency."""
+        import requests
+
+        with self._slots:
+            try:
+                response = self.session.post(
+                    self.url,
+                    headers=self._headers(),
+                    json=payload,
+                    timeout=self.timeout_s,
+                    stream=stream,
+                )
+            except (requests.Timeout, requests.ConnectionError) as e:
+                raise LLMTransportError(f"LLM request failed: {e}", retryable=True)
+
+            if response.status_code != 200:
+                error = self._classify(response)
+                response.close()
+                if error.status_code == 429:
+                    self.rate_limiter.penalize(error.retry_after or 1.0)
+                raise error
+            return response
+
+    def _complete_once(self, payload: Dict[str, Any]) -> str:
+        response = self._post(payload)
+        data = response.json()
+        return (data["choices"][0]["message"].get("content") or "").strip()
+
+    def _complete_hedged(self, payload: Dict[str, Any], tokens: float) -> str:
+        """Gửi request chính; nếu chậm hơn `hedge_after_s` thì gửi thêm bản dự phòng."""
+        primary = self._hedge_pool.submit(self._complete_once, payload)
+        done, _ = wait([primary], timeout=self.hedge_after_s)
+        if done or not self.rate_limiter.try_acquire(tokens):
+            return primary.result()
+
+        self.logger.debug("⏱️ Request chậm, gửi hedged request.")
+        backup = self._hedge_pool.submit(self._complete_once, payload)
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    # ------------------------------------------------------
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.3,
+        max_tokens: int = 1024,
+    ) -> str:
+        """
+        Gọi chat-completions (blocking) với rate limit, retry và hedging.
+
+        Raises:
+            LLMTransportError: Khi hết lượt retry hoặc gặp lỗi không retry được.
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        tokens = estimate_tokens(messages, max_tokens)
+
+        for attempt in range(self.retry_policy.max_retries + 1):
+            self.rate_limiter.acquire(tokens)
+            try:
+                if self.hedge_after_s:
+                    return self._complete_hedged(payload, tokens)
+                return self._complete_once(payload)
+            except LLMTransportError as e:
+                if not e.retryable or attempt == self.retry_policy.max_retries:
+                    raise
+                delay = self.retry_policy.delay(attempt, e.retry_after)
+                self.logger.warning(
+                    f"⚠️ {e} — thử lại lần {attempt + 1} sau {delay:.2f}s"
+                )
+                time.sleep(delay)
+        raise LLMTransportError("Unreachable")
+
+    def submit(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.3,
+        max_tokens: int = 1024,
+    ) -> Future:
+        """Chạy `chat` trên worker pool giới hạn, trả về Future."""
+        return self._pool.submit(self.chat, messages, model, temperature, max_tokens)
+
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.3,
+        max_tokens: int = 1024,
+    ) -> Iterator[str]:
+        """
+        Gọi chat-completions ở chế độ stream (SSE). Chỉ retry trước khi nhận
+        được đoạn text đầu tiên; không dùng hedging.
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        tokens = estimate_tokens(messages, max_tokens)
+
+        for attempt in range(self.retry_policy.max_retries + 1):
+            self.rate_limiter.acquire(tokens)
+            try:
+                response = self._post(payload, stream=True)
+                break
+            except LLMTransportError as e:
+                if not e.retryable or attempt == self.retry_policy.max_retries:
+                    raise
+                time.sleep(self.retry_policy.delay(attempt, e.retry_after))
+
+        with response:
+            for raw in response.iter_lines():
+                line = raw.decode("utf-8") if raw else ""
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    yield delta
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+        self._hedge_pool.shutdown(wait=False)
+        self.session.close()
@@ -1,46 +1,74 @@
 from src.ingestion.pdf_reader import PDFReader
 from src.ingestion.splitter import TextSplitter
-from qdrant_client import QdrantClient
+from src.ingestion.dedup import ChunkDeduplicator
+from src.vector_db.connection import get_qdrant_client
 from qdrant_client.models import PointStruct, VectorParams, Distance
 from src.vector_db.client import QdrantIngestor
 from src.embedding.embedding import get_embedding_model
+from src.embedding.pool import EmbeddingPool
 from src.utils.logger import Logger
 from src.utils.config import get_settings
+from src.utils.warmup import warm_up
 import hashlib
 
 
-settings = get_settings()
+def main() -> None:
+    settings = get_settings()
+    # Load model embedding trong nền trong lúc đọc + chia PDF (pool tự load ở worker)
+    warm_up(settings, embedding=settings.EMBED_WORKERS <= 1)
 
-pdf_reader = PDFReader(log_name="PDFReader")
-pages = pdf_reader.read_pdf(settings.PDF_PATH)  # -> danh sach cac trang
+    pdf_reader = PDFReader(log_name="PDFReader")
+    # Đọc từng trang (page_number, text); splitter tiêu thụ trực tiếp stream này
+    pages = pdf_reader.iter_pages(settings.PDF_PATH)
 
+    split_page = TextSplitter(
+        settings.CHUNK_SIZE,
+        settings.CHUNK_OVERLAP,
+        settings.MODEL_TOKEN_NAME,
+        log_name="TextSplitter",
+        batch_encode=settings.CHUNK_BATCH_ENCODE,
+        num_threads=settings.CHUNK_THREADS,
+        cross_page=settings.CHUNK_CROSS_PAGE,
+    )
+    chunks = split_page.split_pages(pages=pages, source_name=settings.PDF_PATH)
 
-split_page = TextSplitter(
-    settings.CHUNK_SIZE,
-    settings.CHUNK_OVERLAP,
-    settings.MODEL_TOKEN_NAME,
-    log_name="TextSplitter",
-)
-chunks = split_page.split_pages(pages=pages, source_name=settings.PDF_PATH)
+    if settings.DEDUP_ENABLED:
+        deduplicator = ChunkDeduplicator.from_settings()
+        chunks = deduplicator.deduplicate(chunks)
+        print("Dedup: ", deduplicator.report.summary())
 
+    client = get_qdrant_client()
 
-client = QdrantClient(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT)
+    if settings.EMBED_WORKERS > 1:
+        with EmbeddingPool.from_settings() as pool:
+            embeddings = pool.embed_documents(chunks)
+    else:
+        embeddings_model = get_embedding_model(
+            model_name=settings.JINA_MODEL_NAME,
+            task=settings.JINA_TASK,
+            device=settings.DEVICE,
+            backend=settings.EMBED_BACKEND,
+        )
+        embeddings = embeddings_model.embed_documents(chunks)
 
-embeddings_model = get_embedding_model(
-    model_name=settings.JINA_MODEL_NAME, task=settings.JINA_TASK, device=settings.DEVICE
-)
-embeddings = embeddings_model.embed_documents(chunks)
+    ingestor = QdrantIngestor(
+        client=client,
+        collection_name=settings.COLLECTION_NAME,
+        vector_size=settings.VECTOR_SIZE,
+        device=settings.DEVICE,
+        log_name="QdrantIngestion",
+        reset_collection=True,
+        sparse_vectors=settings.QDRANT_SPARSE_VECTORS,
+        upload_batch_size=settings.QDRANT_UPLOAD_BATCH_SIZE,
+        upload_parallel=settings.QDRANT_UPLOAD_PARALLEL,
+    )
+    ingestor.upsert_to_qdrant(
+        pdf_path=settings.PDF_PATH, chunks=chunks, embeddings=embeddings
+    )
 
-ingestor = QdrantIngestor(
-    client=client,
-    collection_name=settings.COLLECTION_NAME,
-    vector_size=settings.VECTOR_SIZE,
-    device=settings.DEVICE,
-    log_name="QdrantIngestion",
-    reset_collection=True,
-)
-ingestor.upsert_to_qdrant(
-    pdf_path=settings.PDF_PATH, chunks=chunks, embeddings=embeddings
-)
+    print("Collection size: ", ingestor.collection_size())
 
-print("Collection size: ", ingestor.collection_size())
+
+# Guard cần thiết: worker của EmbeddingPool (spawn) import lại module __main__
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+"""
+HTTP query service (ASGI) cho RAG pipeline.
+
+Endpoint:
+    POST /search  - semantic / keyword / hybrid search
+    POST /answer  - search + sinh câu trả lời bằng LLM (hỗ trợ SSE với "stream": true);
+                    bằng chứng yếu (AnswerabilityGate) → trả fallback, không gọi LLM
+    GET  /health  - trạng thái service và thống kê batching
+
+Chạy:
+    uvicorn --factory src.serving.api:create_app_from_settings --port 8000
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Set
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.llm.llm import NOT_FOUND_MESSAGE
+from src.serving.batcher import EmbeddingBatcher, QueueFullError
+from src.serving.pipeline import QueryPipeline, Retrieval
+from src.utils.logger import Logger
+
+
+# ==========================================================
+# 🔹 Schema
+# ==========================================================
+class SearchRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    top_k: int = Field(5, ge=1, le=100)
+    mode: Literal["semantic", "keyword", "hybrid"] = "hybrid"
+    alpha: float = Field(0.9, ge=0.0, le=1.0)
+    fusion: Literal["weighted", "minmax", "rrf", "dbsf"] = "weighted"
+    filters: Optional[Dict[str, Any]] = None
+
+
+class AnswerRequest(SearchRequest):
+    stream: bool = False
+
+
+class SearchResponse(BaseModel):
+    query: str
+    mode: str
+    results: List[Dict[str, Any]]
+    latency_ms: float
+
+
+class AnswerResponse(BaseModel):
+    query: str
+    answer: str
+    contexts: List[Dict[str, Any]]
+    latency_ms: float
+    llm_called: bool = True
+    gate: Optional[Dict[str, Any]] = None
+
+
+# ==========================================================
+# 🔹 Concurrency control
+# ==========================================================
+class Lease:
+    """
+    Slot của một request trong ConcurrencyLimiter.
+
+    Slot chỉ được trả một lần, và chỉ khi request đã kết thúc *và* mọi việc chạy
+    trong thread của request (search, LLM) đã xong: request bị timeout (504) vẫn
+    giữ slot tới khi thread thật sự dừng, nên giới hạn đồng thời áp dụng cho
+    công việc thực chứ không chỉ cho request còn mở.
+    """
+
+    def __init__(
+        self, limiter: "ConcurrencyLimiter", loop: asyncio.AbstractEventLoop
+    ) -> None:
+        self._limiter = limiter
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._running: Set[Future] = set()
+        self._closed = False
+        self._released = False
+
+    def track(self, future: Future) -> None:
+        """Giữ slot cho tới khi `future` (việc trong thread) hoàn tất."""
+        with self._lock:
+            self._running.add(future)
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self._running.discard(future)
+            ready = self._try_release()
+        if ready:
+            # Callback chạy trên thread worker; semaphore thuộc event loop
+            self._loop.call_soon_threadsafe(self._limiter.release)
+
+    def _try_release(self) -> bool:
+        if self._closed and not self._running and not self._released:
+            self._released = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """Request kết thúc (gọi trên event loop); gọi nhiều lần cũng chỉ trả một slot."""
+        with self._lock:
+            self._closed = True
+            ready = self._try_release()
+        if ready:
+            self._limiter.release()
+
+
+class ConcurrencyLimiter:
+    """
+    Giới hạn số request xử lý đồng thời; request vượt quá `max_pending`
+    đang chờ sẽ bị từ chối ngay (503) thay vì xếp hàng vô hạn.
+    """
+
+    def __init__(self, max_concurrency: int, max_pending: int) -> None:
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_pending = max_pending
+        self.pending = 0
+        self.active = 0
+
+    async def acquire(self) -> Lease:
+        # Chỉ từ chối khi phải chờ slot (hết slot và hàng chờ đã đầy)
+        if self._semaphore.locked() and self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail="Server quá tải, vui lòng thử lại sau.",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.pending -= 1
+        self.active += 1
+        return Lease(self, asyncio.get_running_loop())
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+
+class LeasedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse trả slot khi response kết thúc theo bất kỳ cách nào
+    (stream xong, client ngắt kết nối, lỗi khi gửi), kể cả khi body chưa
+    từng được đọc — không phụ thuộc vào `finally` của generator.
+    """
+
+    def __init__(self, content: Any, lease: Lease, **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self.lease = lease
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.lease.release()
+
+
+_STREAM_END = object()
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+# ==========================================================
+# 🔹 App factory
+# ==========================================================
+def create_app(
+    searcher: Any,
+    llm: Any,
+    max_concurrency: int = 8,
+    max_pending: int = 64,
+    request_timeout_s: float = 30.0,
+    batch_size: int = 32,
+    batch_wait_ms: float = 5.0,
+    gate: Optional[Any] = None,
+    log_name: str = "QueryService",
+) -> FastAPI:
+    """
+    Tạo ứng dụng FastAPI dùng chung một searcher (và model embedding) và một LLM.
+
+    Args:
+        searcher (QdrantSearcher): Searcher dùng chung cho mọi request.
+        llm (LLMGenerator): LLM dùng chung cho /answer.
+        max_concurrency (int): Số request được xử lý đồng thời.
+        max_pending (int): Số request tối đa được chờ slot; vượt quá trả 503.
+        request_timeout_s (float): Timeout mỗi request; vượt quá trả 504.
+        batch_size (int): Số query embedding tối đa mỗi batch.
+        batch_wait_ms (float): Thời gian gom batch tối đa (ms).
+        gate (AnswerabilityGate, optional): Gate cho /answer; None = luôn gọi LLM
+            khi có context.
+        log_name (str): Tên logger.
+    """
+    logger = Logger(name=log_name).get_logger()
+    limiter = ConcurrencyLimiter(max_concurrency, max_pending)
+    # Thread pool riêng cho search / LLM: mỗi slot chạy tối đa một việc tại một thời điểm
+    executor = ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="query"
+    )
+    batcher = EmbeddingBatcher(
+        searcher.embedding_model,
+        max_batch_size=batch_size,
+        max_wait_ms=batch_wait_ms,
+        max_queue_size=max_pending + max_concurrency,
+    )
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        await batcher.start()
+        logger.info("🚀 Query service sẵn sàng.")
+        yield
+        await batcher.stop()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    app = FastAPI(title="RAG Query Service", lifespan=lifespan)
+    app.state.searcher = searcher
+    app.state.llm = llm
+    app.state.batcher = batcher
+    app.state.limiter = limiter
+    pipeline = QueryPipeline(searcher, llm, gate=gate)
+    app.state.pipeline = pipeline
+
+    async def embed(query: str) -> List[float]:
+        try:
+            return await batcher.embed(query)
+        except QueueFullError:
+            raise HTTPException(
+                status_code=503,
+                detail="Embedding queue đầy, vui lòng thử lại sau.",
+                headers={"Retry-After": "1"},
+            )
+
+    async def in_thread(
+        lease: Lease, func: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Chạy `func` trong executor; slot của request được giữ tới khi `func` xong."""
+        future = executor.submit(func, *args, **kwargs)
+        lease.track(future)
+        return await asyncio.wrap_future(future)
+
+    async def run_search(req: SearchRequest, lease: Lease) -> List[Dict[str, Any]]:
+        if req.mode == "keyword":
+            return await in_thread(
+                lease,
+                searcher.keyword_search,
+                req.query,
+                top_k=req.top_k,
+                filter_payload=req.filters,
+            )
+
+        query_vector = await embed(req.query)
+
+        if req.mode == "semantic":
+            return await in_thread(
+                lease,
+                searcher.semantic_search,
+                req.query,
+                top_k=req.top_k,
+                filter_payload=req.filters,
+                query_vector=query_vector,
+            )
+        return await in_thread(
+            lease,
+            searcher.hybrid_search,
+            req.query,
+            top_k=req.top_k,
+            alpha=req.alpha,
+            fusion=req.fusion,
+            query_vector=query_vector,
+            filter_payload=req.filters,
+        )
+
+    async def run_retrieval(req: AnswerRequest, lease: Lease) -> Retrieval:
+        # Gate cần cả nhánh semantic nên luôn embed khi bật gate
+        query_vector = None
+        if req.mode != "keyword" or gate is not None:
+            query_vector = await embed(req.query)
+        return await in_thread(
+            lease,
+            pipeline.retrieve,
+            req.query,
+            top_k=req.top_k,
+            mode=req.mode,
+            alpha=req.alpha,
+            fusion=req.fusion,
+            query_vector=query_vector,
+            filters=req.filters,
+        )
+
+    async def with_timeout(coro: Any, timeout_s: float = request_timeout_s) -> Any:
+        try:
+            return await asyncio.wait_for(coro, timeout=timeout_s)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Request timeout.")
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "active": limiter.active,
+            "pending": limiter.pending,
+            "batcher": batcher.stats(),
+            "cache": searcher.cache.stats() if searcher.cache else None,
+        }
+
+    @app.post("/search", response_model=SearchResponse)
+    async def search(req: SearchRequest) -> SearchResponse:
+        started = time.perf_counter()
+        lease = await limiter.acquire()
+        try:
+            results = await with_timeout(run_search(req, lease))
+        finally:
+            lease.release()
+        return SearchResponse(
+            query=req.query,
+            mode=req.mode,
+            results=results,
+            latency_ms=(time.perf_counter() - started) * 1000.0,
+        )
+
+    @app.post("/answer")
+    async def answer(req: AnswerRequest) -> Any:
+        started = time.perf_counter()
+        lease = await limiter.acquire()
+        try:
+            retrieval = await with_timeout(run_retrieval(req, lease))
+        except BaseException:
+            lease.release()
+            raise
+
+        contexts = retrieval.contexts
+        decision = retrieval.decision.to_dict() if retrieval.decision else None
+        if req.stream:
+            return LeasedStreamingResponse(
+                _stream_answer(req, retrieval, started, lease),
+                lease=lease,
+                media_type="text/event-stream",
+            )
+
+        if not retrieval.answerable:
+            lease.release()
+            return AnswerResponse(
+                query=req.query,
+                answer=NOT_FOUND_MESSAGE,
+                contexts=contexts,
+                latency_ms=(time.perf_counter() - started) * 1000.0,
+                llm_called=False,
+                gate=decision,
+            )
+
+        try:
+            response = await with_timeout(
+                in_thread(lease, llm.generate_answer, req.query, contexts),
+                timeout_s=started + request_timeout_s - time.perf_counter(),
+            )
+        finally:
+            lease.release()
+        return AnswerResponse(
+            query=req.query,
+            answer=response["answer"],
+            contexts=contexts,
+            latency_ms=(time.perf_counter() - started) * 1000.0,
+            gate=decision,
+        )
+
+    async def _stream_answer(
+        req: AnswerRequest, retrieval: Retrieval, started: float, lease: Lease
+    ) -> AsyncIterator[str]:
+        """
+        SSE: event `contexts`, nhiều event `token`, rồi `done` (hoặc `error`).
+        Mỗi bước lấy token có timeout bằng phần còn lại của `request_timeout_s`,
+        kể cả khi LLM treo trước token đầu tiên hoặc giữa hai token.
+        """
+        deadline = started + request_timeout_s
+        contexts = retrieval.contexts
+        try:
+            yield _sse("contexts", contexts)
+            if not retrieval.answerable:
+                # Gate chặn: một token fallback, không gọi LLM
+                yield _sse("token", NOT_FOUND_MESSAGE)
+                yield _sse(
+                    "done",
+                    {
+                        "latency_ms": (time.perf_counter() - started) * 1000.0,
+                        "llm_called": False,
+                    },
+                )
+                return
+            tokens = None
+            while True:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError
+                    if tokens is None:
+                        tokens = await asyncio.wait_for(
+                            in_thread(
+                                lease,
+                                lambda: iter(llm.stream_answer(req.query, contexts)),
+                            ),
+                            remaining,
+                        )
+                        continue
+                    token = await asyncio.wait_for(
+                        in_thread(lease, next, tokens, _STREAM_END), remaining
+                    )
+                except asyncio.TimeoutError:
+                    yield _sse("error", {"detail": "Request timeout."})
+                    return
+                if token is _STREAM_END:
+                    break
+                yield _sse("token", token)
+            yield _sse("done", {"latency_ms": (time.perf_counter() - started) * 1000.0})
+        finally:
+            lease.release()
+
+    return app
+
+
+def create_app_from_settings() -> FastAPI:
+    """Khởi tạo service từ Settings (dùng với `uvicorn --factory`)."""
+    from src.embedding.embedding import get_embedding_model
+    from src.llm.llm import LLMConfig, LLMGenerator
+    from src.serving.pipeline import AnswerabilityGate
+    from src.utils.config import get_settings
+    from src.utils.text_cleaner import TextCleaner
+    from src.vector_db.cache import SearchCache
+    from src.vector_db.client import QdrantIngestor
+    from src.vector_db.connection import get_qdrant_client
+    from src.vector_db.search_strategy import QdrantSearcher
+    from src.utils.warmup import warm_up
+
+    settings = get_settings()
+    warm_up(settings)
+    client = get_qdrant_client()
+    embedding_model = get_embedding_model(
+        model_name=settings.JINA_MODEL_NAME,
+        task=settings.JINA_TASK,
+        device=settings.DEVICE,
+        backend=settings.EMBED_BACKEND,
+    )
+    ingestor = QdrantIngestor(
+        client=client,
+        collection_name=settings.COLLECTION_NAME,
+        vector_size=settings.VECTOR_SIZE,
+        device=settings.DEVICE,
+        log_name="QdrantIngestor",
+        reset_collection=False,
+    )
+    corpus = None
+    if settings.SNAPSHOT_PATH:
+        from src.vector_db.snapshot import bootstrap_from_snapshot
+
+        corpus = bootstrap_from_snapshot(
+            ingestor,
+            settings.SNAPSHOT_PATH,
+            parallel=settings.SNAPSHOT_IMPORT_PARALLEL,
+        )
+    searcher = QdrantSearcher(
+        embedding_model=embedding_model,
+        qdrant_db=ingestor,
+        collection_name=settings.COLLECTION_NAME,
+        text_cleaner=TextCleaner("TextCleaner"),
+        log_name="QueryServiceSearcher",
+        cache=SearchCache.from_settings(),
+        corpus=corpus,
+    )
+    return create_app(
+        searcher=searcher,
+        llm=LLMGenerator(config=LLMConfig.from_settings()),
+        max_concurrency=settings.SERVE_MAX_CONCURRENCY,
+        max_pending=settings.SERVE_MAX_PENDING,
+        request_timeout_s=settings.SERVE_REQUEST_TIMEOUT_S,
+        batch_size=settings.EMBED_BATCH_SIZE,
+        batch_wait_ms=settings.EMBED_BATCH_WAIT_MS,
+        gate=AnswerabilityGate.from_settings(sparse=searcher.server_side),
+    )
@@ -0,0 +1,122 @@
+import asyncio
+from typing import Any, List, Optional, Tuple
+
+from src.utils.logger import Logger
+
+
+class QueueFullError(RuntimeError):
+    """Hàng đợi embedding đã đầy, request cần bị từ chối (backpressure)."""
+
+
+class EmbeddingBatcher:
+    """
+    Gom query embedding từ nhiều request đồng thời thành một batch để gọi
+    `embed_queries` một lần, giảm overhead mỗi lần forward của model.
+
+    Một batch được gửi đi khi đủ `max_batch_size` query hoặc khi query đầu tiên
+    trong batch đã chờ quá `max_wait_ms`.
+    """
+
+    def __init__(
+        self,
+        embedding_model: Any,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_queue_size: int = 256,
+        log_name: str = "EmbeddingBatcher",
+    ) -> None:
+        """
+        Args:
+            embedding_model (ModelEmbeddings): Model dùng chung, cần có `embed_queries`.
+            max_batch_size (int): Số query tối đa mỗi batch.
+            max_wait_ms (float): Thời gian chờ tối đa để gom batch (ms).
+            max_queue_size (int): Số query tối đa đang chờ; vượt quá sẽ bị từ chối.
+            log_name (str): Tên logger.
+        """
+        self.logger = Logger(name=log_name).get_logger()
+        self.embedding_model = embedding_model
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.queries = 0
+
+    async def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def embed(self, query: str) -> List[float]:
+        """
+        Đưa query vào hàng đợi và chờ embedding.
+
+        Raises:
+            QueueFullError: Khi hàng đợi đầy.
+        """
+        if self._queue is None:
+            raise RuntimeError("EmbeddingBatcher chưa được start()")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((query, future))
+        except asyncio.QueueFull:
+            raise QueueFullError("Embedding queue is full")
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "avg_batch_size": self.queries / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            # Bỏ các request đã bị huỷ (timeout phía client) trước khi encode
+            batch = [(q, f) for q, f in batch if not f.done()]
+            if not batch:
+                continue
+
+            try:
+                vectors = await asyncio.to_thread(
+                    self.embedding_model.embed_queries, [q for q, _ in batch]
+                )
+            except Exception as e:
+                self.logger.exception(f"❌ Lỗi khi embed batch: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.queries += len(batch)
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
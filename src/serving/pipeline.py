@@ -0,0 +1,371 @@
+"""
+Query pipeline: search → answerability gate → LLM.
+
+AnswerabilityGate xem điểm của từng nhánh (semantic, keyword) và mức đồng thuận
+giữa hai nhánh trước khi gọi LLM. Khi bằng chứng quá yếu, pipeline trả ngay
+NOT_FOUND_MESSAGE thay vì tốn một lượt gọi LLM chỉ để nhận câu trả lời mẫu đó.
+
+Quy tắc (ngưỡng cấu hình qua biến môi trường GATE_*, hiệu chỉnh bằng
+`python -m src.evaluation.gate_calibration`):
+    - semantic_top >= strong_semantic                      → trả lời
+    - semantic_top >= min_semantic và
+      (keyword_top >= min_keyword hoặc agreement >= min_agreement) → trả lời
+    - keyword_top >= min_keyword và agreement >= min_agreement    → trả lời
+    - còn lại                                               → fallback
+
+agreement = số id chung trong top-k của hai nhánh / số kết quả của nhánh ngắn hơn.
+Điểm keyword phía Qdrant (sparse vector) khác thang với BM25 trong process nên
+dùng ngưỡng riêng GATE_MIN_KEYWORD_SPARSE.
+Mỗi quyết định được ghi một dòng JSONL (điểm, id, ngưỡng) để tune offline.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.llm.llm import NOT_FOUND_MESSAGE
+from src.utils.logger import Logger
+
+SEARCH_MODES = ("semantic", "keyword", "hybrid")
+
+
+# ==========================================================
+# 🔹 Answerability gate
+# ==========================================================
+@dataclass
+class GateDecision:
+    """Quyết định của gate cho một query, kèm các đặc trưng đã dùng."""
+
+    query: str
+    answerable: bool
+    reason: str
+    semantic_top: float
+    keyword_top: float
+    agreement: float
+    semantic_ids: List[str] = field(default_factory=list)
+    keyword_ids: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class AnswerabilityGate:
+    """Quyết định có đáng gọi LLM hay không dựa trên điểm hai nhánh search."""
+
+    def __init__(
+        self,
+        min_semantic: float = 0.45,
+        strong_semantic: float = 0.75,
+        min_keyword: float = 2.0,
+        min_agreement: float = 0.2,
+        enabled: bool = True,
+        log_path: Optional[str] = None,
+        log_name: str = "AnswerabilityGate",
+    ) -> None:
+        """
+        Args:
+            min_semantic (float): Điểm cosine top-1 tối thiểu của nhánh semantic.
+            strong_semantic (float): Điểm cosine top-1 đủ mạnh để trả lời ngay.
+            min_keyword (float): Điểm BM25 top-1 tối thiểu của nhánh keyword
+                (theo thang của backend keyword đang dùng).
+            min_agreement (float): Tỷ lệ id chung tối thiểu giữa top-k hai nhánh.
+            enabled (bool): False = luôn cho qua (vẫn ghi log quyết định).
+            log_path (str, optional): File JSONL ghi quyết định; None = không ghi.
+            log_name (str): Tên logger.
+        """
+        self.logger = Logger(name=log_name).get_logger()
+        self.min_semantic = min_semantic
+        self.strong_semantic = strong_semantic
+        self.min_keyword = min_keyword
+        self.min_agreement = min_agreement
+        self.enabled = enabled
+        self.log_path = log_path
+        self._log_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, sparse: bool = False) -> "AnswerabilityGate":
+        """`sparse=True` khi keyword search chạy phía Qdrant (searcher.server_side)."""
+        from src.utils.config import get_settings
+
+        settings = get_settings()
+        return cls(
+            min_semantic=settings.GATE_MIN_SEMANTIC,
+            strong_semantic=settings.GATE_STRONG_SEMANTIC,
+            min_keyword=(
+                settings.GATE_MIN_KEYWORD_SPARSE
+                if sparse
+                else settings.GATE_MIN_KEYWORD
+            ),
+            min_agreement=settings.GATE_MIN_AGREEMENT,
+            enabled=settings.GATE_ENABLED,
+            log_path=settings.GATE_LOG_PATH or None,
+        )
+
+    @property
+    def thresholds(self) -> Dict[str, float]:
+        return {
+            "min_semantic": self.min_semantic,
+            "strong_semantic": self.strong_semantic,
+            "min_keyword": self.min_keyword,
+            "min_agreement": self.min_agreement,
+        }
+
+    @staticmethod
+    def agreement(
+        semantic: Sequence[Dict[str, Any]], keyword: Sequence[Dict[str, Any]]
+    ) -> float:
+        """Tỷ lệ id chung giữa hai nhánh (chia cho số kết quả của nhánh ngắn hơn)."""
+        if not semantic or not keyword:
+            return 0.0
+        shared = {r["id"] for r in semantic} & {r["id"] for r in keyword}
+        return len(shared) / min(len(semantic), len(keyword))
+
+    def decide(
+        self, semantic_top: float, keyword_top: float, agreement: float
+    ) -> Tuple[bool, str]:
+        """Áp quy tắc gate lên các đặc trưng; trả về (answerable, reason)."""
+        if semantic_top >= self.strong_semantic:
+            return True, "strong_semantic"
+        semantic_ok = semantic_top >= self.min_semantic
+        keyword_ok = keyword_top >= self.min_keyword
+        agree = agreement >= self.min_agreement
+        if semantic_ok and keyword_ok:
+            return True, "both_legs"
+        if (semantic_ok or keyword_ok) and agree:
+            return True, "legs_agree"
+        if semantic_ok or keyword_ok:
+            return False, "legs_disagree"
+        return False, "weak_evidence"
+
+    def evaluate(
+        self,
+        query: str,
+        semantic: Sequence[Dict[str, Any]],
+        keyword: Sequence[Dict[str, Any]],
+    ) -> GateDecision:
+        """Tính đặc trưng từ kết quả hai nhánh, ra quyết định và ghi log."""
+        semantic_top = max((float(r["score"]) for r in semantic), default=0.0)
+        keyword_top = max((float(r["score"]) for r in keyword), default=0.0)
+        agreement = self.agreement(semantic, keyword)
+
+        if not semantic and not keyword:
+            answerable, reason = False, "no_results"
+        else:
+            answerable, reason = self.decide(semantic_top, keyword_top, agreement)
+        if not self.enabled and not answerable:
+            answerable, reason = True, f"gate_disabled:{reason}"
+
+        decision = GateDecision(
+            query=query,
+            answerable=answerable,
+            reason=reason,
+            semantic_top=semantic_top,
+            keyword_top=keyword_top,
+            agreement=agreement,
+            semantic_ids=[str(r["id"]) for r in semantic],
+            keyword_ids=[str(r["id"]) for r in keyword],
+        )
+        self._log(decision)
+        return decision
+
+    def _log(self, decision: GateDecision) -> None:
+        if not decision.answerable:
+            self.logger.info(
+                f"🚧 Gate chặn '{decision.query}' ({decision.reason}: "
+                f"semantic={decision.semantic_top:.3f}, "
+                f"keyword={decision.keyword_top:.3f}, "
+                f"agreement={decision.agreement:.2f})"
+            )
+        if not self.log_path:
+            return
+        record = {
+            "ts": time.time(),
+            **decision.to_dict(),
+            "thresholds": self.thresholds,
+        }
+        try:
+            with self._log_lock:
+                directory = os.path.dirname(self.log_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            self.logger.warning(f"⚠️ Không ghi được gate log: {e}")
+
+
+# ==========================================================
+# 🔹 Query pipeline
+# ==========================================================
+@dataclass
+class Retrieval:
+    """Context trả về cho LLM và quyết định của gate (None nếu không dùng gate)."""
+
+    contexts: List[Dict[str, Any]]
+    decision: Optional[GateDecision] = None
+
+    @property
+    def answerable(self) -> bool:
+        return bool(self.contexts) and (
+            self.decision is None or self.decision.answerable
+        )
+
+
+class QueryPipeline:
+    """Search (qua gate) rồi sinh câu trả lời; bỏ qua LLM khi bằng chứng yếu."""
+
+    def __init__(
+        self,
+        searcher: Any,
+        llm: Any,
+        gate: Optional[AnswerabilityGate] = None,
+        log_name: str = "QueryPipeline",
+    ) -> None:
+        """
+        Args:
+            searcher (QdrantSearcher): Searcher dùng chung.
+            llm (LLMGenerator): LLM sinh câu trả lời.
+            gate (AnswerabilityGate, optional): None = search như cũ, không gate.
+            log_name (str): Tên logger.
+        """
+        self.logger = Logger(name=log_name).get_logger()
+        self.searcher = searcher
+        self.llm = llm
+        self.gate = gate
+
+    @classmethod
+    def from_settings(cls, searcher: Any, llm: Any) -> "QueryPipeline":
+        gate = AnswerabilityGate.from_settings(sparse=searcher.server_side)
+        return cls(searcher=searcher, llm=llm, gate=gate)
+
+    # ==========================================================
+    # 🔹 Retrieve
+    # ==========================================================
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        mode: str = "hybrid",
+        alpha: float = 0.9,
+        fusion: str = "weighted",
+        query_vector: Optional[List[float]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Retrieval:
+        """
+        Search theo `mode`. Khi có gate: chạy hai nhánh (chỉ id + score), cho gate
+        quyết định, rồi mới dựng context từ chính kết quả hai nhánh đó.
+        `filters` áp dụng cho cả hai nhánh, nên gate chỉ xét bằng chứng trong filter.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"❌ Mode không hợp lệ: {mode}")
+        if self.gate is None:
+            return Retrieval(
+                self._search(query, top_k, mode, alpha, fusion, query_vector, filters)
+            )
+
+        if query_vector is None:
+            query_vector = self.searcher.embedding_model.embed_query(query)
+        semantic = self.searcher.semantic_search(
+            query,
+            top_k=top_k,
+            with_payload=False,
+            filter_payload=filters,
+            query_vector=query_vector,
+        )
+        keyword = self.searcher.keyword_search(
+            query, top_k=top_k, with_payload=False, filter_payload=filters
+        )
+        decision = self.gate.evaluate(query, semantic, keyword)
+        if not decision.answerable:
+            return Retrieval([], decision)
+
+        if mode == "hybrid" and not self.searcher.server_side:
+            contexts = self.searcher.fuse_results(
+                semantic, keyword, top_k, alpha, fusion
+            )
+        elif mode in ("semantic", "keyword"):
+            contexts = self._with_payloads(semantic if mode == "semantic" else keyword)
+        else:
+            contexts = self._search(
+                query, top_k, mode, alpha, fusion, query_vector, filters
+            )
+        return Retrieval(contexts, decision)
+
+    def _search(
+        self,
+        query: str,
+        top_k: int,
+        mode: str,
+        alpha: float,
+        fusion: str,
+        query_vector: Optional[List[float]],
+        filters: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        if mode == "keyword":
+            return self.searcher.keyword_search(
+                query, top_k=top_k, filter_payload=filters
+            )
+        if mode == "semantic":
+            return self.searcher.semantic_search(
+                query, top_k=top_k, filter_payload=filters, query_vector=query_vector
+            )
+        return self.searcher.hybrid_search(
+            query,
+            top_k=top_k,
+            alpha=alpha,
+            fusion=fusion,
+            query_vector=query_vector,
+            filter_payload=filters,
+        )
+
+    def _with_payloads(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Bản sao kết quả (không sửa object trong cache) kèm payload."""
+        payloads = self.searcher.fetch_payloads([r["id"] for r in results])
+        return [{**r, "payload": payloads.get(r["id"], {})} for r in results]
+
+    # ==========================================================
+    # 🔹 Answer
+    # ==========================================================
+    @staticmethod
+    def fallback_response(query: str, retrieval: Retrieval) -> Dict[str, Any]:
+        """Câu trả lời mẫu khi không đủ bằng chứng (không gọi LLM)."""
+        return {
+            "query": query,
+            "answer": NOT_FOUND_MESSAGE,
+            "context_used": retrieval.contexts,
+            "error": None,
+        }
+
+    def answer(
+        self,
+        query: str,
+        top_k: int = 5,
+        mode: str = "hybrid",
+        alpha: float = 0.9,
+        fusion: str = "weighted",
+        query_vector: Optional[List[float]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        debug: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Search + sinh câu trả lời.
+
+        Returns:
+            Dict[str, Any]: Như `LLMGenerator.generate_answer`, thêm `llm_called`
+                và `gate` (quyết định của gate, None nếu không dùng gate).
+        """
+        retrieval = self.retrieve(
+            query, top_k, mode, alpha, fusion, query_vector, filters
+        )
+        if retrieval.answerable:
+            response = self.llm.generate_answer(
+                query=query, contexts=retrieval.contexts, debug=debug
+            )
+        else:
+            response = self.fallback_response(query, retrieval)
+        response["llm_called"] = retrieval.answerable
+        response["gate"] = retrieval.decision.to_dict() if retrieval.decision else None
+        return response
@@ -1,17 +1,41 @@
 from functools import lru_cache
-from dataclasses import dataclass
-from dotenv import load_dotenv
+from dataclasses import dataclass, field
+from typing import Any
 import os
 
-# Load toàn bộ biến môi trường từ file .env
-load_dotenv()
+
+def _env(name: str, default: str = "") -> Any:
+    """Giá trị đọc từ biến môi trường khi tạo Settings (không phải lúc import)."""
+    return field(default_factory=lambda: os.getenv(name, default))
+
+
+def _env_int(name: str, default: int) -> Any:
+    return field(default_factory=lambda: int(os.getenv(name, str(default))))
+
+
+def _env_float(name: str, default: float) -> Any:
+    return field(default_factory=lambda: float(os.getenv(name, str(default))))
+
+
+def _env_bool(name: str, default: bool = False) -> Any:
+    return field(
+        default_factory=lambda: os.getenv(name, str(default)).lower()
+        in ("1", "true", "yes")
+    )
 
 
 @dataclass
 class Settings:
     # GROQ / LLM
-    GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
+    GROQ_API_KEY: str = _env("GROQ_API_KEY")
     GROQ_MODEL_NAME: str = "meta-llama/llama-4-scout-17b-16e-instruct"
+    GROQ_BASE_URL: str = _env("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+    LLM_TIMEOUT_S: float = 30.0
+    LLM_MAX_RETRIES: int = 3
+    LLM_REQUESTS_PER_MINUTE: float = 30.0  # 0 = không giới hạn
+    LLM_TOKENS_PER_MINUTE: float = 30000.0  # 0 = không giới hạn
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_HEDGE_AFTER_S: float = 0.0  # 0 = tắt hedged request
 
     # PDF
     PDF_PATH: str = "data/raw/bao_cao_imagecaptioning.pdf"
@@ -19,20 +43,87 @@ class Settings:
     # Qdrant
     QDRANT_HOST: str = "localhost"
     QDRANT_PORT: int = 6333
+    # ":memory:", URL đầy đủ, hoặc rỗng = dùng QDRANT_HOST/QDRANT_PORT
+    QDRANT_LOCATION: str = _env("QDRANT_LOCATION")
+    QDRANT_PREFER_GRPC: bool = _env_bool("QDRANT_PREFER_GRPC")
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_TIMEOUT_S: int = 30
+    QDRANT_API_KEY: str = _env("QDRANT_API_KEY")
+    QDRANT_UPLOAD_BATCH_SIZE: int = 256
+    QDRANT_UPLOAD_PARALLEL: int = 4
     QDARNT_DISTANCE: str = "cosine"
     COLLECTION_NAME: str = "pdf_documents"
     VECTOR_SIZE: int = 768
+    # Lưu thêm sparse vector BM25 để keyword/hybrid search chạy phía Qdrant
+    QDRANT_SPARSE_VECTORS: bool = _env_bool("QDRANT_SPARSE_VECTORS")
 
     CHUNK_SIZE: int = 400
     CHUNK_OVERLAP: int = 50
+    # Encode các trang theo batch nhiều thread; CHUNK_CROSS_PAGE cho phép chunk qua nhiều trang
+    CHUNK_BATCH_ENCODE: bool = True
+    CHUNK_THREADS: int = 8
+    CHUNK_CROSS_PAGE: bool = False
+
+    # Gộp chunk trùng / gần trùng (Jaccard MinHash >= DEDUP_THRESHOLD) trước khi embedding.
+    # Tắt mặc định; bật với DEDUP_THRESHOLD = 1.0 chỉ gộp chunk trùng tuyệt đối.
+    # Chunk bị gộp chỉ giữ text + vector của bản đầu tiên (bản sau chỉ còn trong
+    # `references`), nên ngưỡng < 1.0 có thể làm mất nội dung khác biệt (VD số liệu)
+    DEDUP_ENABLED: bool = _env_bool("DEDUP_ENABLED", False)
+    DEDUP_THRESHOLD: float = _env_float("DEDUP_THRESHOLD", 1.0)
+    DEDUP_NUM_PERM: int = 128
 
     # Embedding / device
     JINA_MODEL_NAME: str = "Alibaba-NLP/gte-multilingual-base"
     JINA_TASK: str = "retrieval.passage"
     MODEL_TOKEN_NAME: str = "text-embedding-3-small"
     DEVICE: str = "cpu"
+    # Ingest: EMBED_WORKERS > 1 → embedding song song nhiều process (0/1 = một process)
+    EMBED_WORKERS: int = _env_int("EMBED_WORKERS", 0)
+    EMBED_THREADS_PER_WORKER: int = 0  # 0 = chia đều số CPU cho các worker
+    EMBED_POOL_BATCH_SIZE: int = 32
+    # Backend suy luận trên CPU: torch (fp32) | int8 (dynamic quantization) | onnx
+    # (đo tốc độ + độ lệch cosine so với fp32: `python -m src.benchmark.embedding_backends`)
+    EMBED_BACKEND: str = _env("EMBED_BACKEND", "torch")
+    EMBED_BACKEND_MIN_COSINE: float = _env_float("EMBED_BACKEND_MIN_COSINE", 0.99)
+    # Lúc load int8/onnx: so với fp32 trên vài câu mẫu một lần —
+    # warn (dưới ngưỡng → log lỗi, dùng fp32) | error (dừng hẳn) | off
+    EMBED_BACKEND_CHECK: str = _env("EMBED_BACKEND_CHECK", "warn")
+
+    # Snapshot để khởi tạo node (import khi collection rỗng); rỗng = không dùng
+    SNAPSHOT_PATH: str = _env("SNAPSHOT_PATH")
+    SNAPSHOT_IMPORT_PARALLEL: int = 4
+
+    # Search cache (SEARCH_CACHE_PATH rỗng = cache trong process, có path = SQLite dùng chung)
+    SEARCH_CACHE_SIZE: int = 1024
+    SEARCH_CACHE_TTL_S: float = 300.0
+    SEARCH_CACHE_PATH: str = _env("SEARCH_CACHE_PATH")
+    # Chu kỳ (giây) kiểm tra write marker của collection để bắt ghi từ process khác
+    SEARCH_CACHE_CHECK_S: float = 1.0
+
+    # Answerability gate: bỏ qua LLM khi điểm semantic/keyword quá yếu
+    # (tune bằng `python -m src.evaluation.gate_calibration`)
+    GATE_ENABLED: bool = _env_bool("GATE_ENABLED", True)
+    GATE_MIN_SEMANTIC: float = _env_float("GATE_MIN_SEMANTIC", 0.45)
+    GATE_STRONG_SEMANTIC: float = _env_float("GATE_STRONG_SEMANTIC", 0.75)
+    GATE_MIN_KEYWORD: float = _env_float("GATE_MIN_KEYWORD", 2.0)
+    # Keyword search phía Qdrant (sparse vector) cho điểm theo thang khác BM25Okapi:
+    # IDF = ln(1 + (N - n + 0.5) / (n + 0.5)) luôn lớn hơn IDF của rank_bm25
+    GATE_MIN_KEYWORD_SPARSE: float = _env_float("GATE_MIN_KEYWORD_SPARSE", 2.5)
+    GATE_MIN_AGREEMENT: float = _env_float("GATE_MIN_AGREEMENT", 0.2)
+    GATE_LOG_PATH: str = _env("GATE_LOG_PATH", "logs/gate_decisions.jsonl")
+
+    # HTTP query service
+    SERVE_MAX_CONCURRENCY: int = 8
+    SERVE_MAX_PENDING: int = 64
+    SERVE_REQUEST_TIMEOUT_S: float = 30.0
+    EMBED_BATCH_SIZE: int = 32
+    EMBED_BATCH_WAIT_MS: float = 5.0
 
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    from dotenv import load_dotenv
+
+    # Load toàn bộ biến môi trường từ file .env (lần đầu cần Settings)
+    load_dotenv()
     return Settings()
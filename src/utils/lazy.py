@@ -0,0 +1,36 @@
+"""
+Import thư viện nặng (torch / sentence-transformers, PyMuPDF, qdrant-client...)
+ở lần dùng đầu tiên thay vì lúc import module, để CLI chỉ cần PDF reader hoặc
+splitter không phải trả thời gian khởi động của các thư viện không dùng tới.
+"""
+
+import importlib
+import threading
+from functools import lru_cache
+from types import ModuleType
+from typing import Iterable, Optional
+
+
+@lru_cache(maxsize=None)
+def optional_import(name: str) -> Optional[ModuleType]:
+    """Import `name` khi cần; None nếu thư viện không cài được (kết quả được cache)."""
+    try:
+        return importlib.import_module(name)
+    except Exception:
+        return None
+
+
+def preload_modules(names: Iterable[str]) -> "threading.Thread":
+    """
+    Import trước các module trong thread nền (VD lúc app đang khởi tạo phần khác);
+    lần import sau trong thread chính chỉ lấy từ `sys.modules`.
+    """
+    names = list(names)
+
+    def run() -> None:
+        for name in names:
+            optional_import(name)
+
+    thread = threading.Thread(target=run, name="preload-modules", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,63 @@
+"""
+Warm-up lúc khởi động: load weights model embedding và import các thư viện nặng
+trong thread nền, trong khi app / pipeline khởi tạo phần còn lại (đọc PDF,
+kết nối Qdrant, dựng keyword corpus...).
+
+    warm = warm_up()            # gọi sớm nhất có thể, không chặn
+    ...                         # khởi tạo các thành phần khác
+    warm.result(timeout=120)    # (tuỳ chọn) chờ warm-up xong
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Optional, Sequence
+
+from src.utils.lazy import preload_modules
+
+WARM_MODULES = ("numpy", "qdrant_client", "tiktoken")
+
+
+def warm_up(
+    settings: Optional[Any] = None,
+    embedding: bool = True,
+    modules: Sequence[str] = WARM_MODULES,
+) -> Future:
+    """
+    Bắt đầu warm-up trong thread nền và trả về ngay.
+
+    Args:
+        settings (Settings, optional): Lấy tên model / device (mặc định get_settings()).
+        embedding (bool): Load trước model embedding (`ModelEmbeddings.preload`);
+            ModelEmbeddings tạo sau đó dùng lại model này thay vì load lại.
+        modules (Sequence[str]): Module import trước trong thread nền.
+
+    Returns:
+        Future: Hoàn tất khi model và các module đã sẵn sàng (kết quả là model
+            embedding, hoặc None nếu `embedding=False`).
+    """
+    if settings is None:
+        from src.utils.config import get_settings
+
+        settings = get_settings()
+
+    model_future: Optional[Future] = None
+    if embedding:
+        from src.embedding.embedding import ModelEmbeddings
+
+        model_future = ModelEmbeddings.preload(
+            settings.JINA_MODEL_NAME, settings.DEVICE, backend=settings.EMBED_BACKEND
+        )
+    modules_thread = preload_modules(modules)
+
+    done: Future = Future()
+
+    def wait_all() -> None:
+        try:
+            model = model_future.result() if model_future else None
+            modules_thread.join()
+            done.set_result(model)
+        except BaseException as e:
+            done.set_exception(e)
+
+    threading.Thread(target=wait_all, name="warm-up", daemon=True).start()
+    return done
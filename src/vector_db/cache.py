@@ -0,0 +1,301 @@
+"""
+Cache kết quả tìm kiếm cho QdrantSearcher.
+
+Key gồm query đã chuẩn hoá, mode, top_k, alpha, filter... và "generation" hiện tại
+của cache. Mỗi khi QdrantIngestor ghi vào collection, version của ingestor tăng và
+cache tăng generation → các entry cũ không còn được đọc tới (và sẽ bị LRU/TTL loại bỏ).
+
+Ingest thường chạy ở process khác (`python -m src.main`) so với app / API: mỗi lần
+ghi, ingestor lưu một write marker mới vào metadata của collection; cache đọc lại
+marker tối đa mỗi `check_interval_s` giây và invalidate khi marker đổi, nên kết quả
+cũ chỉ còn được trả trong tối đa `check_interval_s` (không phải tới hết TTL).
+
+Backend:
+    - InMemoryCacheBackend: OrderedDict LRU + TTL, dùng trong một process.
+    - SQLiteCacheBackend: file SQLite (VD trên /dev/shm) dùng chung cho nhiều
+      worker process trên cùng một host.
+"""
+
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.logger import Logger
+from src.utils.text_cleaner import TextCleaner
+
+
+# ==========================================================
+# 🔹 Backend
+# ==========================================================
+class InMemoryCacheBackend:
+    """LRU + TTL trong bộ nhớ của process hiện tại."""
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 300.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.evictions = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_s, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self) -> int:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            return self._generation
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCacheBackend:
+    """
+    LRU + TTL trên file SQLite, dùng chung giữa các process.
+
+    Generation được lưu trong DB nên invalidate ở một process có hiệu lực
+    cho mọi process khác dùng cùng file.
+    """
+
+    def __init__(
+        self, path: str, max_entries: int = 1024, ttl_s: float = 300.0
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)"
+            )
+            self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('generation', 0)")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed = ? WHERE key = ?", (now, key)
+            )
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (key, blob, now + self.ttl_s, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def generation(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE name = 'generation'"
+            ).fetchone()
+        return row[0]
+
+    def bump_generation(self) -> int:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE meta SET value = value + 1 WHERE name = 'generation'"
+            )
+            self._conn.execute("DELETE FROM cache")
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE name = 'generation'"
+            ).fetchone()
+        return row[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+# ==========================================================
+# 🔹 Search cache
+# ==========================================================
+class SearchCache:
+    """
+    Cache kết quả search theo (query chuẩn hoá, mode, tham số), có thống kê hit/miss.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_s: float = 300.0,
+        shared_path: Optional[str] = None,
+        log_name: str = "SearchCache",
+        check_interval_s: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            max_entries (int): Số entry tối đa (LRU).
+            ttl_s (float): Thời gian sống của mỗi entry (giây).
+            shared_path (str, optional): File SQLite để dùng chung cache giữa các
+                process; None = cache trong bộ nhớ của process.
+            log_name (str): Tên logger.
+            check_interval_s (float): Chu kỳ đọc write marker của collection để
+                phát hiện ghi từ process khác (0 = kiểm tra mỗi lần đọc cache).
+        """
+        self.logger = Logger(name=log_name).get_logger()
+        if shared_path:
+            self.backend = SQLiteCacheBackend(shared_path, max_entries, ttl_s)
+        else:
+            self.backend = InMemoryCacheBackend(max_entries, ttl_s)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._stats_lock = threading.Lock()
+        self.check_interval_s = check_interval_s
+        self._ingestor: Optional[Any] = None
+        self._marker: Optional[str] = None
+        self._next_check = 0.0
+        self._check_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "SearchCache":
+        from src.utils.config import get_settings
+
+        settings = get_settings()
+        return cls(
+            max_entries=settings.SEARCH_CACHE_SIZE,
+            ttl_s=settings.SEARCH_CACHE_TTL_S,
+            shared_path=settings.SEARCH_CACHE_PATH or None,
+            check_interval_s=settings.SEARCH_CACHE_CHECK_S,
+        )
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return TextCleaner.clean(query).lower()
+
+    def make_key(self, mode: str, query: str, **params: Any) -> str:
+        """Key = generation + mode + query chuẩn hoá + tham số (sắp xếp ổn định)."""
+        body = json.dumps(
+            {"q": self.normalize_query(query), "mode": mode, **params},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return f"{self.backend.generation()}:{body}"
+
+    def get_or_compute(
+        self, mode: str, query: str, compute: Callable[[], Any], **params: Any
+    ) -> Any:
+        """Trả kết quả từ cache nếu có, nếu không gọi `compute()` và lưu lại."""
+        self._check_remote_writes()
+        key = self.make_key(mode, query, **params)
+        cached = self.backend.get(key)
+        if cached is not None:
+            with self._stats_lock:
+                self.hits += 1
+            return [dict(r) for r in cached]
+
+        with self._stats_lock:
+            self.misses += 1
+        result = compute()
+        self.backend.set(key, [dict(r) for r in result])
+        return result
+
+    def invalidate(self, *_: Any) -> None:
+        """Vô hiệu hoá toàn bộ cache (tăng generation)."""
+        generation = self.backend.bump_generation()
+        with self._stats_lock:
+            self.invalidations += 1
+        self.logger.info(f"♻️ Search cache invalidated (generation={generation})")
+
+    def attach(self, ingestor: Any) -> "SearchCache":
+        """
+        Tự invalidate mỗi khi collection của `ingestor` được ghi: ngay lập tức với
+        ghi trong process này, theo write marker với ghi từ process khác.
+        """
+        self._ingestor = ingestor
+        self._marker = ingestor.read_write_marker()
+        self._next_check = time.monotonic() + self.check_interval_s
+        ingestor.add_write_listener(self._on_local_write)
+        return self
+
+    def _on_local_write(self, _version: int) -> None:
+        with self._check_lock:
+            self._marker = self._ingestor.write_marker
+        self.invalidate()
+
+    def _check_remote_writes(self) -> None:
+        """Đọc write marker (tối đa mỗi `check_interval_s`), đổi → invalidate."""
+        if self._ingestor is None or time.monotonic() < self._next_check:
+            return
+        if not self._check_lock.acquire(blocking=False):
+            return  # thread khác đang kiểm tra
+        try:
+            self._next_check = time.monotonic() + self.check_interval_s
+            marker = self._ingestor.read_write_marker()
+            changed = marker != self._marker
+            self._marker = marker
+        finally:
+            self._check_lock.release()
+        if changed:
+            self.logger.info("🔄 Collection được ghi từ process khác.")
+            self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.backend),
+            "evictions": self.backend.evictions,
+            "invalidations": self.invalidations,
+            "generation": self.backend.generation(),
+        }
@@ -1,10 +1,30 @@
 import hashlib
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    Distance,
+    Modifier,
+    PointStruct,
+    SparseVectorParams,
+    VectorParams,
+)
 
 from src.utils.logger import Logger
+from src.vector_db.connection import is_local_client
+from src.vector_db.sparse import BM25SparseEncoder
+
+DENSE_VECTOR_NAME = "dense"
+SPARSE_VECTOR_NAME = "bm25"
+# Key trong metadata của collection: token đổi sau mỗi lần ghi, để process khác
+# (VD app/API khi `main.py` ingest) biết dữ liệu đã thay đổi
+WRITE_MARKER_KEY = "write_marker"
+# Key trong metadata của collection: thống kê BM25 (avgdl...) của sparse encoder
+SPARSE_STATS_KEY = "bm25_stats"
+# Key trong metadata của collection: checksum snapshot đã import + write marker lúc đó
+SNAPSHOT_KEY = "snapshot"
 
 
 class QdrantIngestor:
@@ -16,12 +36,35 @@ class QdrantIngestor:
         device: str = "cpu",
         log_name: str = "QdrantIngestor",
         reset_collection: bool = False,  # <-- thêm param
+        sparse_vectors: bool = False,
+        upload_batch_size: int = 256,
+        upload_parallel: int = 4,
     ) -> None:
+        """
+        Args:
+            sparse_vectors (bool): Khi tạo collection mới, thêm sparse vector BM25
+                (`bm25`) bên cạnh dense vector (`dense`) để hybrid search chạy
+                phía server. Với collection đã tồn tại, cấu hình được tự phát hiện.
+            upload_batch_size (int): Số point mỗi request upsert.
+            upload_parallel (int): Số request upsert gửi song song (client local
+                luôn chạy tuần tự).
+        """
         self.logger = Logger(name=log_name).get_logger()
         self.client = client
         self.collection_name = collection_name
         self.vector_size = vector_size
         self.device = device
+        # Tăng mỗi lần ghi vào collection (để cache/searcher biết dữ liệu đã đổi)
+        self.version = 0
+        self.write_marker: Optional[str] = None
+        self._write_listeners: List[Callable[[int], None]] = []
+        # Tên vector (None = collection cũ dùng 1 dense vector không đặt tên)
+        self.sparse_vectors = sparse_vectors
+        self.dense_vector_name: Optional[str] = None
+        self.sparse_vector_name: Optional[str] = None
+        self.sparse_encoder = BM25SparseEncoder()
+        self.upload_batch_size = upload_batch_size
+        self.upload_parallel = 1 if is_local_client(client) else upload_parallel
 
         self.logger.info(f"🔧 Embedding model loaded on device: {self.device}")
         # Truyền flag tiếp vào helper
@@ -38,20 +81,142 @@ class QdrantIngestor:
                 self.client.delete_collection(collection_name=self.collection_name)
             else:
                 self.logger.info(f"✅ Collection `{self.collection_name}` đã tồn tại.")
+                self._detect_vector_names()
                 return
 
         self.logger.info(f"🚀 Tạo collection `{self.collection_name}`...")
-        self.client.create_collection(
-            collection_name=self.collection_name,
-            vectors_config=VectorParams(
-                size=self.vector_size, distance=Distance.COSINE
-            ),
-        )
+        # Collection mới: thống kê BM25 tính lại từ đầu
+        encoder = self.sparse_encoder
+        self.sparse_encoder = BM25SparseEncoder(k1=encoder.k1, b=encoder.b)
+        dense_params = VectorParams(size=self.vector_size, distance=Distance.COSINE)
+        if self.sparse_vectors:
+            self.client.create_collection(
+                collection_name=self.collection_name,
+                vectors_config={DENSE_VECTOR_NAME: dense_params},
+                sparse_vectors_config={
+                    SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)
+                },
+            )
+            self.dense_vector_name = DENSE_VECTOR_NAME
+            self.sparse_vector_name = SPARSE_VECTOR_NAME
+        else:
+            self.client.create_collection(
+                collection_name=self.collection_name,
+                vectors_config=dense_params,
+            )
         self.logger.info(f"✅ Collection `{self.collection_name}` được tạo thành công.")
+        if reset_collection:
+            self._notify_write()
+
+    def recreate_collection(self, sparse_vectors: Optional[bool] = None) -> None:
+        """
+        Xoá và tạo lại collection rỗng (VD trước khi import snapshot).
+
+        Args:
+            sparse_vectors (bool, optional): Cấu hình sparse vector của collection
+                mới; None = giữ cấu hình của ingestor.
+        """
+        if sparse_vectors is not None:
+            self.sparse_vectors = sparse_vectors
+        self.dense_vector_name = None
+        self.sparse_vector_name = None
+        self._ensure_collection_exists(reset_collection=True)
+
+    def _detect_vector_names(self) -> None:
+        """Đọc cấu hình collection có sẵn để biết tên dense/sparse vector."""
+        params = self.client.get_collection(self.collection_name).config.params
+        if isinstance(params.vectors, dict):
+            self.dense_vector_name = next(iter(params.vectors))
+        if params.sparse_vectors and SPARSE_VECTOR_NAME in params.sparse_vectors:
+            self.sparse_vector_name = SPARSE_VECTOR_NAME
+            self.load_sparse_stats()
+
+    def load_sparse_stats(self) -> None:
+        """Nạp avgdl / số document của sparse encoder từ metadata collection."""
+        stats = self._collection_metadata().get(SPARSE_STATS_KEY)
+        if stats:
+            self.sparse_encoder.load_state(stats)
+            self.logger.info(
+                f"📐 BM25 avgdl={self.sparse_encoder.avgdl:.1f} "
+                f"({stats.get('docs', 0)} document)"
+            )
 
     # =========================================================
     # Utility helpers
     # =========================================================
+    def add_write_listener(self, listener: Callable[[int], None]) -> None:
+        """Đăng ký callback(version) được gọi sau mỗi lần ghi vào collection."""
+        self._write_listeners.append(listener)
+
+    def _notify_write(self) -> None:
+        self.version += 1
+        self._publish_write_marker()
+        for listener in self._write_listeners:
+            try:
+                listener(self.version)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Write listener lỗi: {e}")
+
+    def _publish_write_marker(self) -> None:
+        """
+        Ghi token mới (và thống kê BM25 nếu có sparse vector) vào metadata
+        collection, thấy được từ mọi process.
+        """
+        self.write_marker = uuid.uuid4().hex
+        metadata: Dict[str, Any] = {WRITE_MARKER_KEY: self.write_marker}
+        if self.sparse_vector_name:
+            metadata[SPARSE_STATS_KEY] = self.sparse_encoder.state()
+        try:
+            self.client.update_collection(
+                collection_name=self.collection_name, metadata=metadata
+            )
+        except Exception as e:
+            # Qdrant cũ không hỗ trợ metadata: cache process khác chỉ hết hạn theo TTL
+            self.logger.warning(f"⚠️ Không ghi được write marker: {e}")
+
+    def _collection_metadata(self) -> Dict[str, Any]:
+        try:
+            info = self.client.get_collection(self.collection_name)
+        except Exception as e:
+            self.logger.debug(f"Không đọc được metadata collection: {e}")
+            return {}
+        return info.config.metadata or {}
+
+    def read_write_marker(self) -> Optional[str]:
+        """Token ghi gần nhất của collection (do bất kỳ process nào ghi); None nếu chưa có."""
+        return self._collection_metadata().get(WRITE_MARKER_KEY)
+
+    def mark_snapshot(self, checksum: str) -> None:
+        """
+        Báo ghi xong (write listeners, write marker) sau khi import snapshot có
+        `checksum`, và ghi nhận checksum đó trong metadata collection.
+        """
+        self._notify_write()
+        try:
+            self.client.update_collection(
+                collection_name=self.collection_name,
+                metadata={
+                    SNAPSHOT_KEY: {
+                        "checksum": checksum,
+                        "write_marker": self.write_marker,
+                    }
+                },
+            )
+        except Exception as e:
+            self.logger.warning(f"⚠️ Không ghi được thông tin snapshot: {e}")
+
+    def loaded_snapshot(self) -> Optional[str]:
+        """
+        Checksum của snapshot đã import nếu collection chưa bị ghi thêm từ đó
+        (write marker không đổi); None nếu không có hoặc dữ liệu đã khác.
+        """
+        metadata = self._collection_metadata()
+        snapshot = metadata.get(SNAPSHOT_KEY) or {}
+        marker = metadata.get(WRITE_MARKER_KEY)
+        if marker is None or snapshot.get("write_marker") != marker:
+            return None
+        return snapshot.get("checksum")
+
     def _generate_chunk_id(self, source: str, chunk_idx: int, chunk_text: Any) -> str:
         """Sinh ID duy nhất dựa vào nội dung và vị trí chunk"""
         if isinstance(chunk_text, dict):
@@ -62,6 +227,17 @@ class QdrantIngestor:
         unique_str = f"{source}-{chunk_idx}-{chunk_text[:100]}"
         return hashlib.md5(unique_str.encode("utf-8")).hexdigest()
 
+    def _point_vector(self, chunk: Dict[str, Any], vector: List[float]) -> Any:
+        """Dense vector (collection cũ) hoặc dict named vectors dense + sparse."""
+        if not self.dense_vector_name:
+            return vector
+        named: Dict[str, Any] = {self.dense_vector_name: vector}
+        if self.sparse_vector_name:
+            named[self.sparse_vector_name] = self.sparse_encoder.encode_document(
+                chunk.get("text", "")
+            )
+        return named
+
     # =========================================================
     # Main function
     # =========================================================
@@ -74,6 +250,11 @@ class QdrantIngestor:
         if len(chunks) != len(embeddings):
             raise ValueError("❌ Số lượng chunks và embeddings không khớp")
 
+        if self.sparse_vector_name:
+            # Process khác có thể đã ingest thêm kể từ lúc khởi tạo
+            self.load_sparse_stats()
+            self.sparse_encoder.fit([chunk.get("text", "") for chunk in chunks])
+
         points = []
         for idx, (chunk, vector) in enumerate(zip(chunks, embeddings)):
             point_id = self._generate_chunk_id(pdf_path, idx, chunk)
@@ -86,14 +267,72 @@ class QdrantIngestor:
                 "page_number": chunk.get("page", None),
                 "language": "vi",
             }
-            points.append(PointStruct(id=point_id, vector=vector, payload=payload))
+            if "references" in chunk:
+                payload["references"] = chunk["references"]
+                payload["duplicate_count"] = chunk.get("duplicate_count", 0)
+            if "page_end" in chunk:
+                payload["page_start"] = chunk.get("page_start")
+                payload["page_end"] = chunk["page_end"]
+            points.append(
+                PointStruct(
+                    id=point_id,
+                    vector=self._point_vector(chunk, vector),
+                    payload=payload,
+                )
+            )
 
         self.logger.info(
             f"🚀 Upserting {len(points)} vectors vào `{self.collection_name}`..."
         )
-        self.client.upsert(collection_name=self.collection_name, points=points)
+        self._upload_points(points)
+        self._notify_write()
         self.logger.info("✅ Upsert hoàn tất.")
 
+    def _upload_points(self, points: List[PointStruct]) -> None:
+        """
+        Gửi point theo batch, song song với `wait=False`; batch cuối gửi với
+        `wait=True` sau khi mọi batch trước đã được nhận, làm barrier: Qdrant áp
+        dụng update theo thứ tự nên khi batch cuối xong, toàn bộ dữ liệu đã hiển thị.
+        """
+        size = self.upload_batch_size
+        batches = [points[i : i + size] for i in range(0, len(points), size)]
+        if not batches:
+            return
+
+        def send(batch: List[PointStruct], wait: bool) -> None:
+            self.client.upsert(
+                collection_name=self.collection_name, points=batch, wait=wait
+            )
+
+        if len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=self.upload_parallel) as pool:
+                for future in [pool.submit(send, b, False) for b in batches[:-1]]:
+                    future.result()
+        send(batches[-1], True)
+
+    # =========================================================
+    # Snapshot
+    # =========================================================
+    def export_snapshot(self, path: str, batch_size: int = 1000) -> Dict[str, Any]:
+        """Ghi collection ra thư mục snapshot (xem `src.vector_db.snapshot`)."""
+        from src.vector_db.snapshot import export_snapshot
+
+        return export_snapshot(self, path, batch_size=batch_size)
+
+    def import_snapshot(
+        self,
+        path: str,
+        parallel: int = 4,
+        batch_size: int = 256,
+        verify: bool = True,
+    ) -> Dict[str, Any]:
+        """Tạo lại collection từ snapshot (xoá dữ liệu hiện có) và bulk-load."""
+        from src.vector_db.snapshot import import_snapshot
+
+        return import_snapshot(
+            self, path, parallel=parallel, batch_size=batch_size, verify=verify
+        )
+
     # =========================================================
     # Optional: Kiểm tra số lượng vector hiện tại
     # =========================================================
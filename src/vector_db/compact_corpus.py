@@ -0,0 +1,235 @@
+"""
+Corpus gọn trong bộ nhớ cho keyword search (BM25) của QdrantSearcher.
+
+Thay cho list token (list[str]) của từng chunk + BM25Okapi (dict tần suất cho mỗi
+chunk), CompactCorpus lưu:
+    - vocab: token → id (mỗi token chỉ lưu một lần)
+    - tokens: id token của mọi chunk nối liền trong một mảng số nguyên
+    - offsets: vị trí bắt đầu của mỗi chunk trong `tokens` (N + 1 phần tử)
+    - ids: point id dạng mảng NumPy (UUID lưu 16 byte, id số lưu int64)
+    - postings theo token (doc, tf) để chấm điểm BM25 không phải duyệt mọi chunk
+
+Điểm BM25 giống hệt `rank_bm25.BM25Okapi` (cùng công thức idf có sàn epsilon).
+Text của chunk không được giữ lại; payload lấy từ Qdrant khi cần.
+"""
+
+import math
+import sys
+import uuid
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _smallest_uint(max_value: int) -> np.dtype:
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def _format_uuid(value: uuid.UUID, fmt: str) -> str:
+    return value.hex if fmt == "hex" else str(value)
+
+
+class CompactCorpus:
+    """Token id + offset dạng mảng liên tục, chấm điểm BM25 trên postings."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25) -> None:
+        """
+        Args:
+            k1, b, epsilon: Tham số BM25, cùng mặc định với BM25Okapi.
+        """
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.vocab: Dict[str, int] = {}
+        self._ids: List[Any] = []
+        self._tokens = array("I")
+        self._offsets = array("q", [0])
+
+        self.ids: np.ndarray = np.empty(0, dtype=np.int64)
+        self.tokens: np.ndarray = np.empty(0, dtype=np.uint32)
+        self.offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self.doc_len: np.ndarray = np.empty(0, dtype=np.int32)
+        self.avgdl = 0.0
+        self.idf: np.ndarray = np.empty(0, dtype=np.float64)
+        self._term_ptr: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._post_docs: np.ndarray = np.empty(0, dtype=np.int32)
+        self._post_tf: np.ndarray = np.empty(0, dtype=np.uint16)
+        self._uuid_format: Optional[str] = None
+
+    # ==========================================================
+    # 🔹 Build
+    # ==========================================================
+    def add(self, point_id: Any, tokens: Iterable[str]) -> None:
+        """Thêm một chunk (gọi `finalize()` sau khi thêm xong)."""
+        vocab = self.vocab
+        for token in tokens:
+            token_id = vocab.get(token)
+            if token_id is None:
+                token_id = vocab[token] = len(vocab)
+            self._tokens.append(token_id)
+        self._offsets.append(len(self._tokens))
+        self._ids.append(point_id)
+
+    @classmethod
+    def from_tokenized(
+        cls, ids: Sequence[Any], tokenized: Iterable[Iterable[str]], **bm25: float
+    ) -> "CompactCorpus":
+        corpus = cls(**bm25)
+        for point_id, tokens in zip(ids, tokenized):
+            corpus.add(point_id, tokens)
+        return corpus.finalize()
+
+    @classmethod
+    def from_arrays(
+        cls,
+        ids: Sequence[Any],
+        vocab: Sequence[str],
+        tokens: np.ndarray,
+        offsets: np.ndarray,
+        **bm25: float,
+    ) -> "CompactCorpus":
+        """Dựng trực tiếp từ mảng đã có (VD keyword index trong snapshot)."""
+        corpus = cls(**bm25)
+        corpus.vocab = {token: i for i, token in enumerate(vocab)}
+        corpus._ids = list(ids)
+        corpus._tokens = array("I", np.asarray(tokens, dtype=np.uint32).tobytes())
+        corpus._offsets = array("q", np.asarray(offsets, dtype=np.int64).tobytes())
+        return corpus.finalize()
+
+    def finalize(self) -> "CompactCorpus":
+        """Chuyển buffer sang mảng NumPy gọn và dựng postings + idf."""
+        n_docs = len(self._ids)
+        self.ids = self._pack_ids(self._ids)
+        self.tokens = np.frombuffer(self._tokens, dtype=np.uint32).astype(
+            _smallest_uint(max(len(self.vocab) - 1, 0))
+        )
+        self.offsets = np.frombuffer(self._offsets, dtype=np.int64).copy()
+        self._ids, self._tokens, self._offsets = [], array("I"), array("q", [0])
+
+        lengths = np.diff(self.offsets)
+        self.doc_len = lengths.astype(np.int32)
+        self.avgdl = float(lengths.sum()) / n_docs if n_docs else 0.0
+
+        # Postings: gom (token, doc) trùng nhau → tf, sắp theo token
+        docs = np.repeat(np.arange(n_docs, dtype=np.int64), lengths)
+        keys, tf = np.unique(
+            self.tokens.astype(np.int64) * n_docs + docs, return_counts=True
+        )
+        terms = keys // max(n_docs, 1)
+        self._post_docs = (keys - terms * n_docs).astype(np.int32)
+        self._post_tf = tf.astype(_smallest_uint(int(tf.max()) if len(tf) else 0))
+        self._term_ptr = np.searchsorted(terms, np.arange(len(self.vocab) + 1))
+        self.idf = self._compute_idf(np.diff(self._term_ptr), n_docs)
+        return self
+
+    def _compute_idf(self, df: np.ndarray, n_docs: int) -> np.ndarray:
+        """idf như BM25Okapi: log((N - df + 0.5) / (df + 0.5)), idf âm → epsilon * idf TB."""
+        idf = np.empty(len(df), dtype=np.float64)
+        idf_sum = 0.0
+        negative = []
+        for term, freq in enumerate(df.tolist()):
+            value = math.log(n_docs - freq + 0.5) - math.log(freq + 0.5)
+            idf[term] = value
+            idf_sum += value
+            if value < 0:
+                negative.append(term)
+        if len(df):
+            idf[negative] = self.epsilon * (idf_sum / len(df))
+        return idf
+
+    def _pack_ids(self, ids: List[Any]) -> np.ndarray:
+        """
+        Id số → int64; UUID (dạng có gạch nối hoặc 32 ký tự hex, VD md5 của
+        chunk) → 16 byte mỗi id; kiểu khác → mảng object.
+        """
+        self._uuid_format = None
+        if all(isinstance(i, int) for i in ids):
+            return np.asarray(ids, dtype=np.int64)
+        try:
+            parsed = [uuid.UUID(str(i)) for i in ids]
+        except ValueError:
+            return np.asarray(ids, dtype=object)
+        for fmt in ("str", "hex"):
+            if all(_format_uuid(u, fmt) == i for u, i in zip(parsed, ids)):
+                self._uuid_format = fmt
+                return np.frombuffer(b"".join(u.bytes for u in parsed), dtype="V16")
+        return np.asarray(ids, dtype=object)
+
+    # ==========================================================
+    # 🔹 Truy cập / chấm điểm
+    # ==========================================================
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def point_id(self, index: int) -> Any:
+        value = self.ids[index]
+        if self._uuid_format:
+            return _format_uuid(uuid.UUID(bytes=value.tobytes()), self._uuid_format)
+        return value.item() if isinstance(value, np.generic) else value
+
+    def doc_tokens(self, index: int) -> List[str]:
+        """Khôi phục danh sách token của một chunk (chủ yếu để debug / export)."""
+        inverse = self._inverse_vocab()
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return [inverse[t] for t in self.tokens[start:end].tolist()]
+
+    def _inverse_vocab(self) -> List[str]:
+        inverse = [""] * len(self.vocab)
+        for token, token_id in self.vocab.items():
+            inverse[token_id] = token
+        return inverse
+
+    def get_scores(self, query_tokens: Sequence[str]) -> np.ndarray:
+        """Điểm BM25 của mọi chunk cho query (giống `BM25Okapi.get_scores`)."""
+        scores = np.zeros(len(self), dtype=np.float64)
+        k1, b = self.k1, self.b
+        for token in query_tokens:
+            term = self.vocab.get(token)
+            if term is None:
+                continue
+            start, end = self._term_ptr[term], self._term_ptr[term + 1]
+            docs = self._post_docs[start:end]
+            tf = self._post_tf[start:end].astype(np.float64)
+            dl = self.doc_len[docs]
+            scores[docs] += self.idf[term] * (
+                tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / self.avgdl))
+            )
+        return scores
+
+    def nbytes(self, include_vocab: bool = True) -> int:
+        """Ước lượng bộ nhớ (byte) của corpus: các mảng NumPy + vocab."""
+        total = sum(
+            a.nbytes
+            for a in (
+                self.tokens,
+                self.offsets,
+                self.doc_len,
+                self.idf,
+                self._term_ptr,
+                self._post_docs,
+                self._post_tf,
+            )
+        )
+        if self.ids.dtype == object:
+            total += sum(len(str(i)) + 49 for i in self.ids) + self.ids.nbytes
+        else:
+            total += self.ids.nbytes
+        if include_vocab:
+            total += sys.getsizeof(self.vocab) + sum(
+                sys.getsizeof(t) for t in self.vocab
+            )
+        return total
+
+    def keyword_search(
+        self, query_tokens: Sequence[str], top_k: int
+    ) -> List[Tuple[Any, float]]:
+        """Top-k (point_id, score) theo BM25."""
+        if not len(self):
+            return []
+        scores = self.get_scores(query_tokens)
+        top_indices = np.argsort(scores)[::-1][:top_k]
+        return [(self.point_id(i), float(scores[i])) for i in top_indices]
@@ -0,0 +1,58 @@
+"""
+Factory tạo QdrantClient từ Settings, dùng chung cho QdrantIngestor và QdrantSearcher.
+
+    - QDRANT_LOCATION: ":memory:", URL ("http://host:6333") hoặc rỗng (dùng host/port).
+    - QDRANT_PREFER_GRPC: gửi request qua gRPC (cổng QDRANT_GRPC_PORT) thay vì REST.
+    - QDRANT_TIMEOUT_S: timeout mỗi request.
+
+`get_qdrant_client()` trả về một client duy nhất cho mỗi process để tái sử dụng
+kết nối (HTTP keep-alive / gRPC channel) giữa các thành phần.
+"""
+
+from functools import lru_cache
+from typing import Any, Optional
+
+from qdrant_client import QdrantClient
+
+
+def create_qdrant_client(
+    settings: Optional[Any] = None, **overrides: Any
+) -> QdrantClient:
+    """
+    Tạo QdrantClient mới từ Settings; `overrides` ghi đè tham số của QdrantClient
+    (VD `prefer_grpc=False` khi benchmark REST).
+    """
+    if settings is None:
+        from src.utils.config import get_settings
+
+        settings = get_settings()
+
+    location = settings.QDRANT_LOCATION
+    if location == ":memory:":
+        return QdrantClient(location=location, **overrides)
+
+    kwargs: Any = {
+        "prefer_grpc": settings.QDRANT_PREFER_GRPC,
+        "grpc_port": settings.QDRANT_GRPC_PORT,
+        "timeout": settings.QDRANT_TIMEOUT_S,
+        "api_key": settings.QDRANT_API_KEY or None,
+    }
+    if location:
+        kwargs["url"] = location
+    else:
+        kwargs["host"] = settings.QDRANT_HOST
+        kwargs["port"] = settings.QDRANT_PORT
+    kwargs.update(overrides)
+    return QdrantClient(**kwargs)
+
+
+@lru_cache(maxsize=1)
+def get_qdrant_client() -> QdrantClient:
+    """Client dùng chung trong process (tạo một lần từ Settings)."""
+    return create_qdrant_client()
+
+
+def is_local_client(client: QdrantClient) -> bool:
+    """True nếu client chạy chế độ local (in-memory hoặc thư mục), không qua mạng."""
+    options = client.init_options
+    return options.get("location") == ":memory:" or bool(options.get("path"))
@@ -1,14 +1,30 @@
 # src/vector_db/searcher.py
-import numpy as np
-from rank_bm25 import BM25Okapi
-from typing import List, Dict, Any, Optional, Tuple
-from qdrant_client.http.models import Filter, FieldCondition, MatchValue
+import uuid
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
-from src.embedding.embedding import ModelEmbeddings
-from src.vector_db.client import QdrantIngestor
+from src.vector_db.cache import SearchCache
 from src.utils.logger import Logger
 from src.utils.text_cleaner import TextCleaner
 
+# qdrant-client, NumPy, model embedding chỉ được import khi thật sự search
+if TYPE_CHECKING:
+    from src.embedding.embedding import ModelEmbeddings
+    from src.vector_db.client import QdrantIngestor
+    from src.vector_db.compact_corpus import CompactCorpus
+
+FUSION_STRATEGIES = ("weighted", "minmax", "rrf", "dbsf")
+RRF_K = 60
+
+
+def _normalize_id(point_id: Any) -> Any:
+    """UUID dạng hex / có gạch nối → một dạng chung để so sánh id với Qdrant."""
+    if isinstance(point_id, str):
+        try:
+            return str(uuid.UUID(point_id))
+        except ValueError:
+            return point_id
+    return point_id
+
 
 class QdrantSearcher:
     """
@@ -17,49 +33,163 @@ class QdrantSearcher:
 
     def __init__(
         self,
-        embedding_model: ModelEmbeddings,
-        qdrant_db: QdrantIngestor,
+        embedding_model: "ModelEmbeddings",
+        qdrant_db: "QdrantIngestor",
         collection_name: str,
         text_cleaner: TextCleaner,
         log_name: str = "QdrantSearcher",
+        cache: Optional[SearchCache] = None,
+        payload_fields: Optional[List[str]] = None,
+        corpus: Optional["CompactCorpus"] = None,
     ) -> None:
+        """
+        Args:
+            payload_fields (List[str], optional): Các field payload mặc định trả về
+                trong kết quả (None = toàn bộ payload).
+            corpus (CompactCorpus, optional): Keyword index dựng sẵn, VD từ
+                `snapshot.load_keyword_index`; None = scroll collection để dựng.
+        """
         self.logger = Logger(name=log_name).get_logger()
         self.collection_name = collection_name
         self.embedding_model = embedding_model
         self.qdrant_db = qdrant_db
         self.text_cleaner = text_cleaner
+        # Cache kết quả (tuỳ chọn), tự invalidate khi ingestor ghi dữ liệu mới
+        self.cache = cache.attach(qdrant_db) if cache else None
+        self.payload_fields = payload_fields
 
-        # Load corpus, point_ids và payload từ Qdrant
-        self.corpus, self.point_ids, self.corpus_payloads = (
-            self._load_corpus_from_qdrant()
-        )
-        self.tokenized_corpus = [
-            self.text_cleaner.clean(doc).split() for doc in self.corpus
-        ]
+        # Collection có sparse vector BM25 → keyword/hybrid search chạy phía Qdrant,
+        # không cần giữ corpus trong process
+        from src.vector_db.compact_corpus import CompactCorpus
 
-        # BM25
-        if self.tokenized_corpus:
-            self.bm25 = BM25Okapi(self.tokenized_corpus)
+        self.server_side = bool(qdrant_db.sparse_vector_name)
+        if self.server_side:
+            self.logger.info("🔎 Keyword/hybrid search dùng sparse vector phía Qdrant.")
+            self.corpus = CompactCorpus().finalize()
+        elif corpus is not None:
+            self.corpus = corpus
         else:
-            self.bm25 = None
+            # Chỉ giữ token id + offset để chấm điểm BM25; text/payload lấy khi cần
+            self.corpus = self._load_corpus_from_qdrant()
+
+        if not len(self.corpus) and not self.server_side:
             self.logger.warning("⚠️ Corpus rỗng, BM25 sẽ không hoạt động.")
 
     # ==========================================================
     # 🔹 Load corpus từ Qdrant
     # ==========================================================
-    def _load_corpus_from_qdrant(
+    def _load_corpus_from_qdrant(self, batch_size: int = 1000) -> "CompactCorpus":
+        """
+        Scroll toàn bộ collection (chỉ field `text`), tokenize từng batch và
+        nạp thẳng vào CompactCorpus, không giữ lại text gốc hay payload.
+        """
+        from src.vector_db.compact_corpus import CompactCorpus
+
+        corpus = CompactCorpus()
+        offset = None
+        while True:
+            records, offset = self.qdrant_db.client.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=["text"],
+                with_vectors=False,
+            )
+            for p in records:
+                corpus.add(
+                    p.id,
+                    self.text_cleaner.clean((p.payload or {}).get("text", "")).split(),
+                )
+            if offset is None:
+                break
+        return corpus.finalize()
+
+    # ==========================================================
+    # 🔹 Payload
+    # ==========================================================
+    def fetch_payloads(
+        self, ids: List[Any], payload_fields: Optional[List[str]] = None
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Lấy payload cho danh sách id trong một lần `retrieve`.
+
+        Args:
+            ids (List): Danh sách point id.
+            payload_fields (List[str], optional): Chỉ lấy các field này
+                (mặc định dùng `self.payload_fields`, None = toàn bộ).
+
+        Returns:
+            Dict: {point_id: payload}
+        """
+        if not ids:
+            return {}
+        fields = payload_fields or self.payload_fields
+        records = self.qdrant_db.client.retrieve(
+            collection_name=self.collection_name,
+            ids=list(ids),
+            with_payload=fields if fields else True,
+            with_vectors=False,
+        )
+        return {r.id: r.payload for r in records}
+
+    def _attach_payloads(
+        self, results: List[Dict[str, Any]], payload_fields: Optional[List[str]]
+    ) -> List[Dict[str, Any]]:
+        payloads = self.fetch_payloads([r["id"] for r in results], payload_fields)
+        for r in results:
+            r["payload"] = payloads.get(r["id"], {})
+        return results
+
+    # ==========================================================
+    # 🔹 Cache
+    # ==========================================================
+    def _cached(
         self,
-    ) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
-        """Lấy toàn bộ text + point_id + payload từ Qdrant để BM25 + hybrid search."""
-        scroll_result = self.qdrant_db.client.scroll(
-            collection_name=self.collection_name, limit=5000, with_payload=True
+        mode: str,
+        query: str,
+        compute: Callable[[], List[Dict[str, Any]]],
+        **params: Any,
+    ) -> List[Dict[str, Any]]:
+        """Đọc kết quả từ cache (nếu bật), nếu miss thì gọi `compute()`."""
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(
+            mode, query, compute, collection=self.collection_name, **params
         )
-        all_docs = scroll_result[0]
 
-        corpus = [p.payload.get("text", "") for p in all_docs]
-        point_ids = [p.id for p in all_docs]
-        payloads = [p.payload for p in all_docs]
-        return corpus, point_ids, payloads
+    # ==========================================================
+    # 🔹 Filter
+    # ==========================================================
+    @staticmethod
+    def _build_filter(
+        filter_payload: Optional[dict], ids: Optional[List[Any]] = None
+    ) -> Any:
+        """Filter Qdrant khớp chính xác từng field (và giới hạn theo `ids` nếu có)."""
+        from qdrant_client.http.models import (
+            FieldCondition,
+            Filter,
+            HasIdCondition,
+            MatchValue,
+        )
+
+        must: List[Any] = [
+            FieldCondition(key=k, match=MatchValue(value=v))
+            for k, v in (filter_payload or {}).items()
+        ]
+        if ids is not None:
+            must.append(HasIdCondition(has_id=list(ids)))
+        return Filter(must=must) if must else None
+
+    def _matching_ids(self, ids: List[Any], filter_payload: dict) -> set:
+        """Các id (dạng chuẩn hoá) trong `ids` có payload khớp filter."""
+        records, _ = self.qdrant_db.client.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=self._build_filter(filter_payload, ids),
+            limit=len(ids),
+            with_payload=False,
+            with_vectors=False,
+        )
+        return {_normalize_id(r.id) for r in records}
 
     # ==========================================================
     # 🔹 Semantic Search
@@ -70,33 +200,67 @@ class QdrantSearcher:
         top_k: int = 5,
         with_payload: bool = True,
         filter_payload: Optional[dict] = None,
+        hnsw_ef: Optional[int] = None,
+        query_vector: Optional[List[float]] = None,
+        payload_fields: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
-        """Semantic search sử dụng Qdrant."""
-        try:
-            query_vector = self.embedding_model.embed_query(query)
+        """
+        Semantic search sử dụng Qdrant.
+        hnsw_ef: kích thước beam khi duyệt HNSW (None = mặc định của collection).
+        query_vector: embedding đã tính sẵn của query (VD: từ batcher), bỏ qua bước embed.
+        payload_fields: chỉ lấy các field payload này (None = `self.payload_fields`).
+        """
+        return self._cached(
+            "semantic",
+            query,
+            lambda: self._semantic_search(
+                query,
+                top_k,
+                with_payload,
+                filter_payload,
+                hnsw_ef,
+                query_vector,
+                payload_fields,
+            ),
+            top_k=top_k,
+            with_payload=with_payload,
+            filter=filter_payload,
+            hnsw_ef=hnsw_ef,
+            fields=payload_fields,
+        )
 
-            qdrant_filter = None
-            if filter_payload:
-                qdrant_filter = Filter(
-                    must=[
-                        FieldCondition(key=k, match=MatchValue(value=v))
-                        for k, v in filter_payload.items()
-                    ]
-                )
+    def _semantic_search(
+        self,
+        query: str,
+        top_k: int,
+        with_payload: bool,
+        filter_payload: Optional[dict],
+        hnsw_ef: Optional[int],
+        query_vector: Optional[List[float]],
+        payload_fields: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        from qdrant_client.http.models import SearchParams
+
+        try:
+            if query_vector is None:
+                query_vector = self.embedding_model.embed_query(query)
 
             hits = self.qdrant_db.client.query_points(
                 collection_name=self.collection_name,
                 query=query_vector,
+                using=self.qdrant_db.dense_vector_name,
                 limit=top_k,
-                with_payload=with_payload,
-                query_filter=qdrant_filter,
+                with_payload=False,
+                query_filter=self._build_filter(filter_payload),
+                search_params=SearchParams(hnsw_ef=hnsw_ef) if hnsw_ef else None,
             )
 
-            # hits.result chứa ScoredPoint
+            # Search chỉ trả id + score; payload lấy sau cho top_k bằng 1 lần retrieve
             results = [
-                {"id": r.id, "score": r.score, "payload": r.payload}
-                for r in hits.points
+                {"id": r.id, "score": r.score, "payload": None} for r in hits.points
             ]
+            if with_payload:
+                self._attach_payloads(results, payload_fields)
             self.logger.info(f"✅ Semantic search: '{query}' → {len(results)} results")
             return results
 
@@ -111,9 +275,40 @@ class QdrantSearcher:
         self,
         query: str,
         top_k: int = 5,
+        with_payload: bool = True,
+        payload_fields: Optional[List[str]] = None,
+        filter_payload: Optional[dict] = None,
     ) -> List[Dict[str, Any]]:
-        """Keyword search sử dụng BM25."""
-        if not self.bm25:
+        """
+        Keyword search sử dụng BM25.
+        filter_payload: chỉ giữ chunk có payload khớp (áp dụng như semantic search).
+        """
+        return self._cached(
+            "keyword",
+            query,
+            lambda: self._keyword_search(
+                query, top_k, with_payload, payload_fields, filter_payload
+            ),
+            top_k=top_k,
+            with_payload=with_payload,
+            fields=payload_fields,
+            filter=filter_payload,
+        )
+
+    def _keyword_search(
+        self,
+        query: str,
+        top_k: int,
+        with_payload: bool,
+        payload_fields: Optional[List[str]],
+        filter_payload: Optional[dict] = None,
+    ) -> List[Dict[str, Any]]:
+        if self.server_side:
+            return self._sparse_search(
+                query, top_k, with_payload, payload_fields, filter_payload
+            )
+
+        if not len(self.corpus):
             self.logger.warning("⚠️ BM25 corpus rỗng, trả về danh sách rỗng.")
             return []
 
@@ -121,17 +316,18 @@ class QdrantSearcher:
             cleaned_query = self.text_cleaner.clean(query)
             tokenized_query = cleaned_query.split()
 
-            scores = self.bm25.get_scores(tokenized_query)
-            top_indices = np.argsort(scores)[::-1][:top_k]
-
+            if filter_payload:
+                hits = self._filtered_keyword_hits(
+                    tokenized_query, top_k, filter_payload
+                )
+            else:
+                hits = self.corpus.keyword_search(tokenized_query, top_k)
             results = [
-                {
-                    "id": self.point_ids[i],
-                    "score": float(scores[i]),
-                    "payload": self.corpus_payloads[i],
-                }
-                for i in top_indices
+                {"id": point_id, "score": score, "payload": None}
+                for point_id, score in hits
             ]
+            if with_payload:
+                self._attach_payloads(results, payload_fields)
 
             self.logger.info(f"✅ Keyword search: '{query}' → {len(results)} results")
             return results
@@ -140,6 +336,31 @@ class QdrantSearcher:
             self.logger.exception(f"❌ Keyword search error: {e}")
             raise
 
+    def _filtered_keyword_hits(
+        self, tokenized_query: List[str], top_k: int, filter_payload: dict
+    ) -> List[Tuple[Any, float]]:
+        """
+        BM25 trong process không biết payload: duyệt ứng viên theo điểm giảm dần
+        từng lô, hỏi Qdrant id nào khớp filter, dừng khi đủ top_k.
+        """
+        import numpy as np
+
+        scores = self.corpus.get_scores(tokenized_query)
+        order = np.argsort(scores)[::-1]
+        hits: List[Tuple[Any, float]] = []
+        start, size = 0, max(4 * top_k, 64)
+        while start < len(order) and len(hits) < top_k:
+            batch = order[start : start + size]
+            ids = [self.corpus.point_id(i) for i in batch]
+            allowed = self._matching_ids(ids, filter_payload)
+            hits.extend(
+                (pid, float(scores[i]))
+                for i, pid in zip(batch, ids)
+                if _normalize_id(pid) in allowed
+            )
+            start, size = start + size, size * 2
+        return hits[:top_k]
+
     # ==========================================================
     # 🔹 Hybrid Search
     # ==========================================================
@@ -148,38 +369,90 @@ class QdrantSearcher:
         query: str,
         top_k: int = 5,
         alpha: float = 0.5,
+        fusion: str = "weighted",
+        hnsw_ef: Optional[int] = None,
+        query_vector: Optional[List[float]] = None,
+        payload_fields: Optional[List[str]] = None,
+        filter_payload: Optional[dict] = None,
     ) -> List[Dict[str, Any]]:
         """
         Kết hợp semantic + keyword search.
         alpha = trọng số semantic, 1-alpha = trọng số keyword
+        filter_payload: áp dụng cho cả hai nhánh.
+
+        fusion:
+            - "weighted": cộng điểm thô theo trọng số alpha (mặc định).
+            - "minmax": chuẩn hoá điểm mỗi nhánh về [0, 1] rồi cộng theo alpha.
+            - "rrf": Reciprocal Rank Fusion, cộng alpha / (k + rank) theo thứ hạng.
+            - "dbsf": chuẩn hoá mỗi nhánh theo mean ± 3σ rồi cộng theo alpha.
+
+        Với collection có sparse vector, hybrid chạy phía Qdrant trong một query
+        prefetch + fusion: "dbsf" dùng Fusion.DBSF (không trọng số), các chiến lược
+        còn lại dùng RRF có trọng số [alpha, 1 - alpha].
         """
-        try:
-            sem_results = self.semantic_search(query, top_k=top_k)
-            kw_results = self.keyword_search(query, top_k=top_k)
-
-            sem_scores = {r["id"]: r["score"] for r in sem_results}
-            kw_scores = {r["id"]: r["score"] for r in kw_results}
-
-            all_ids = set(sem_scores) | set(kw_scores)
-            combined_results = []
-            for pid in all_ids:
-                combined_score = alpha * sem_scores.get(pid, 0.0) + (
-                    1 - alpha
-                ) * kw_scores.get(pid, 0.0)
-
-                # Chọn payload ưu tiên semantic, fallback BM25
-                payload = None
-                if pid in sem_scores:
-                    payload = next(r["payload"] for r in sem_results if r["id"] == pid)
-                elif pid in kw_scores:
-                    payload = next(r["payload"] for r in kw_results if r["id"] == pid)
-
-                combined_results.append(
-                    {"id": pid, "score": combined_score, "payload": payload}
-                )
+        if fusion not in FUSION_STRATEGIES:
+            raise ValueError(f"❌ Fusion không hợp lệ: {fusion}")
+
+        return self._cached(
+            "hybrid",
+            query,
+            lambda: self._hybrid_search(
+                query,
+                top_k,
+                alpha,
+                fusion,
+                hnsw_ef,
+                query_vector,
+                payload_fields,
+                filter_payload,
+            ),
+            top_k=top_k,
+            alpha=alpha,
+            fusion=fusion,
+            hnsw_ef=hnsw_ef,
+            fields=payload_fields,
+            filter=filter_payload,
+        )
 
-            combined_results.sort(key=lambda x: x["score"], reverse=True)
-            final_results = combined_results[:top_k]
+    def _hybrid_search(
+        self,
+        query: str,
+        top_k: int,
+        alpha: float,
+        fusion: str,
+        hnsw_ef: Optional[int],
+        query_vector: Optional[List[float]],
+        payload_fields: Optional[List[str]],
+        filter_payload: Optional[dict] = None,
+    ) -> List[Dict[str, Any]]:
+        if self.server_side:
+            return self._server_hybrid_search(
+                query,
+                top_k,
+                alpha,
+                fusion,
+                hnsw_ef,
+                query_vector,
+                payload_fields,
+                filter_payload,
+            )
+
+        try:
+            # Hai nhánh chỉ trả id + score, payload chỉ lấy cho top_k cuối cùng
+            sem_results = self.semantic_search(
+                query,
+                top_k=top_k,
+                with_payload=False,
+                hnsw_ef=hnsw_ef,
+                query_vector=query_vector,
+                filter_payload=filter_payload,
+            )
+            kw_results = self.keyword_search(
+                query, top_k=top_k, with_payload=False, filter_payload=filter_payload
+            )
+            final_results = self.fuse_results(
+                sem_results, kw_results, top_k, alpha, fusion, payload_fields
+            )
 
             self.logger.info(
                 f"✅ Hybrid search: '{query}' → {len(final_results)} results"
@@ -189,3 +462,169 @@ class QdrantSearcher:
         except Exception as e:
             self.logger.exception(f"❌ Hybrid search error: {e}")
             raise
+
+    def fuse_results(
+        self,
+        sem_results: List[Dict[str, Any]],
+        kw_results: List[Dict[str, Any]],
+        top_k: int,
+        alpha: float = 0.5,
+        fusion: str = "weighted",
+        payload_fields: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fusion phía client cho kết quả hai nhánh đã có sẵn (VD QueryPipeline đã
+        chạy từng nhánh để kiểm tra bằng chứng), rồi lấy payload cho top_k.
+        """
+        sem_scores = self._fusion_scores(sem_results, fusion)
+        kw_scores = self._fusion_scores(kw_results, fusion)
+
+        all_ids = set(sem_scores) | set(kw_scores)
+        combined_results = []
+        for pid in all_ids:
+            combined_score = alpha * sem_scores.get(pid, 0.0) + (
+                1 - alpha
+            ) * kw_scores.get(pid, 0.0)
+            combined_results.append(
+                {"id": pid, "score": combined_score, "payload": None}
+            )
+
+        combined_results.sort(key=lambda x: x["score"], reverse=True)
+        return self._attach_payloads(combined_results[:top_k], payload_fields)
+
+    @staticmethod
+    def _fusion_scores(results: List[Dict[str, Any]], fusion: str) -> Dict[Any, float]:
+        """Chuyển kết quả một nhánh thành {id: điểm} theo chiến lược fusion."""
+        if fusion == "rrf":
+            return {r["id"]: 1.0 / (RRF_K + rank) for rank, r in enumerate(results, 1)}
+
+        scores = {r["id"]: r["score"] for r in results}
+        if fusion == "dbsf" and scores:
+            import numpy as np
+
+            values = np.fromiter(scores.values(), dtype=np.float64)
+            low = values.mean() - 3 * values.std()
+            high = values.mean() + 3 * values.std()
+            span = high - low
+            return {
+                pid: (score - low) / span if span > 0 else 1.0
+                for pid, score in scores.items()
+            }
+        if fusion == "minmax" and scores:
+            low, high = min(scores.values()), max(scores.values())
+            span = high - low
+            return {
+                pid: (score - low) / span if span > 0 else 1.0
+                for pid, score in scores.items()
+            }
+        return scores
+
+    # ==========================================================
+    # 🔹 Server-side (sparse vector)
+    # ==========================================================
+    def _sparse_search(
+        self,
+        query: str,
+        top_k: int,
+        with_payload: bool,
+        payload_fields: Optional[List[str]],
+        filter_payload: Optional[dict] = None,
+    ) -> List[Dict[str, Any]]:
+        """Keyword search bằng sparse vector BM25 lưu trong Qdrant."""
+        try:
+            sparse_query = self.qdrant_db.sparse_encoder.encode_query(query)
+            if not sparse_query.indices:
+                return []
+
+            hits = self.qdrant_db.client.query_points(
+                collection_name=self.collection_name,
+                query=sparse_query,
+                using=self.qdrant_db.sparse_vector_name,
+                limit=top_k,
+                with_payload=False,
+                query_filter=self._build_filter(filter_payload),
+            )
+            results = [
+                {"id": r.id, "score": r.score, "payload": None} for r in hits.points
+            ]
+            if with_payload:
+                self._attach_payloads(results, payload_fields)
+
+            self.logger.info(f"✅ Keyword search: '{query}' → {len(results)} results")
+            return results
+
+        except Exception as e:
+            self.logger.exception(f"❌ Keyword search error: {e}")
+            raise
+
+    def _server_hybrid_search(
+        self,
+        query: str,
+        top_k: int,
+        alpha: float,
+        fusion: str,
+        hnsw_ef: Optional[int],
+        query_vector: Optional[List[float]],
+        payload_fields: Optional[List[str]],
+        filter_payload: Optional[dict] = None,
+    ) -> List[Dict[str, Any]]:
+        """Hybrid search trong một query: prefetch dense + sparse, fusion phía server."""
+        from qdrant_client.http.models import (
+            Fusion,
+            FusionQuery,
+            Prefetch,
+            Rrf,
+            RrfQuery,
+            SearchParams,
+        )
+
+        try:
+            if query_vector is None:
+                query_vector = self.embedding_model.embed_query(query)
+
+            qdrant_filter = self._build_filter(filter_payload)
+            prefetch = [
+                Prefetch(
+                    query=query_vector,
+                    using=self.qdrant_db.dense_vector_name,
+                    limit=top_k,
+                    filter=qdrant_filter,
+                    params=SearchParams(hnsw_ef=hnsw_ef) if hnsw_ef else None,
+                )
+            ]
+            sparse_query = self.qdrant_db.sparse_encoder.encode_query(query)
+            if sparse_query.indices:
+                prefetch.append(
+                    Prefetch(
+                        query=sparse_query,
+                        using=self.qdrant_db.sparse_vector_name,
+                        limit=top_k,
+                        filter=qdrant_filter,
+                    )
+                )
+
+            if fusion == "dbsf":
+                fusion_query = FusionQuery(fusion=Fusion.DBSF)
+            else:
+                weights = [alpha, 1 - alpha][: len(prefetch)]
+                fusion_query = RrfQuery(rrf=Rrf(weights=weights))
+
+            hits = self.qdrant_db.client.query_points(
+                collection_name=self.collection_name,
+                prefetch=prefetch,
+                query=fusion_query,
+                limit=top_k,
+                with_payload=False,
+                query_filter=qdrant_filter,
+            )
+            results = self._attach_payloads(
+                [{"id": r.id, "score": r.score, "payload": None} for r in hits.points],
+                payload_fields,
+            )
+
+            self.logger.info(f"✅ Hybrid search: '{query}' → {len(results)} results")
+            return results
+
+        except Exception as e:
+            self.logger.exception(f"❌ Hybrid search error: {e}")
+            raise
@@ -0,0 +1,384 @@
+"""
+Export / import snapshot của một collection để khởi tạo node mới mà không cần
+đọc PDF, chia chunk và embedding lại.
+
+Cấu trúc thư mục snapshot:
+    manifest.json          - phiên bản định dạng, cấu hình vector, số point, checksum
+    vectors.npy            - dense vector float32 liên tục, shape (N, dim)
+    payloads.json          - payload dạng cột: {"ids": [...], "columns": {field: [...]}}
+    sparse_indptr.npy      - (tuỳ chọn) sparse vector BM25 dạng CSR
+    sparse_indices.npy
+    sparse_values.npy
+    keyword_vocab.json     - keyword index: danh sách token
+    keyword_tokens.npy     - id token của mọi chunk nối liền (int32)
+    keyword_offsets.npy    - offset đầu mỗi chunk trong keyword_tokens (N + 1)
+
+Snapshot dùng được cho cả Qdrant server lẫn chế độ in-memory (`:memory:`).
+
+Ví dụ:
+    python -m src.vector_db.snapshot export --path snapshots/pdf_documents
+    python -m src.vector_db.snapshot import --path snapshots/pdf_documents --parallel 4
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from qdrant_client.models import SparseVector
+
+from src.utils.logger import Logger
+from src.utils.text_cleaner import TextCleaner
+from src.vector_db.compact_corpus import CompactCorpus
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+PAYLOADS_FILE = "payloads.json"
+SPARSE_FILES = ("sparse_indptr.npy", "sparse_indices.npy", "sparse_values.npy")
+KEYWORD_FILES = ("keyword_vocab.json", "keyword_tokens.npy", "keyword_offsets.npy")
+
+logger = Logger(name="Snapshot").get_logger()
+
+
+class SnapshotError(Exception):
+    """Snapshot thiếu file, sai checksum hoặc không khớp cấu hình collection."""
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_checksum(manifest: Dict[str, Any]) -> str:
+    """Checksum của cả snapshot, tính từ checksum từng file trong manifest."""
+    files = sorted((name, meta["sha256"]) for name, meta in manifest["files"].items())
+    return hashlib.sha256(json.dumps(files).encode("utf-8")).hexdigest()
+
+
+# ==========================================================
+# 🔹 Export
+# ==========================================================
+def export_snapshot(ingestor: Any, path: str, batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    Ghi toàn bộ collection của `ingestor` ra thư mục `path`.
+
+    Vector được ghi thẳng vào file .npy (memmap) theo từng batch scroll,
+    nên không cần giữ mọi vector trong bộ nhớ.
+
+    Returns:
+        Dict: Nội dung manifest.
+    """
+    started = time.perf_counter()
+    out = Path(path)
+    out.mkdir(parents=True, exist_ok=True)
+    client = ingestor.client
+    collection = ingestor.collection_name
+    dense_name = ingestor.dense_vector_name
+    sparse_name = ingestor.sparse_vector_name
+
+    total = client.count(collection_name=collection, exact=True).count
+    vectors = np.lib.format.open_memmap(
+        out / VECTORS_FILE,
+        mode="w+",
+        dtype=np.float32,
+        shape=(total, ingestor.vector_size),
+    )
+
+    ids: List[Any] = []
+    columns: Dict[str, List[Any]] = {}
+    sparse_indptr, sparse_indices, sparse_values = [0], [], []
+    vocab: Dict[str, int] = {}
+    keyword_tokens: List[int] = []
+    keyword_offsets = [0]
+
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        for record in records:
+            row = len(ids)
+            if row >= total:
+                break
+            ids.append(record.id)
+            payload = record.payload or {}
+            for field in payload.keys() - columns.keys():
+                columns[field] = [None] * row
+            for field, values in columns.items():
+                values.append(payload.get(field))
+
+            vector = record.vector
+            vectors[row] = vector[dense_name] if dense_name else vector
+            if sparse_name:
+                sparse = vector.get(sparse_name)
+                if sparse is not None:
+                    sparse_indices.extend(sparse.indices)
+                    sparse_values.extend(sparse.values)
+                sparse_indptr.append(len(sparse_indices))
+
+            for token in TextCleaner.clean(payload.get("text", "")).split():
+                keyword_tokens.append(vocab.setdefault(token, len(vocab)))
+            keyword_offsets.append(len(keyword_tokens))
+        if offset is None or len(ids) >= total:
+            break
+
+    vectors.flush()
+    del vectors
+    if len(ids) < total:
+        # Collection bị xoá bớt trong lúc export: cắt phần thừa
+        np.save(out / VECTORS_FILE, np.load(out / VECTORS_FILE)[: len(ids)])
+
+    with open(out / PAYLOADS_FILE, "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "columns": columns}, f, ensure_ascii=False)
+    if sparse_name:
+        np.save(out / SPARSE_FILES[0], np.asarray(sparse_indptr, dtype=np.int64))
+        np.save(out / SPARSE_FILES[1], np.asarray(sparse_indices, dtype=np.uint32))
+        np.save(out / SPARSE_FILES[2], np.asarray(sparse_values, dtype=np.float32))
+    with open(out / KEYWORD_FILES[0], "w", encoding="utf-8") as f:
+        json.dump(list(vocab), f, ensure_ascii=False)
+    np.save(out / KEYWORD_FILES[1], np.asarray(keyword_tokens, dtype=np.int32))
+    np.save(out / KEYWORD_FILES[2], np.asarray(keyword_offsets, dtype=np.int64))
+
+    files = [VECTORS_FILE, PAYLOADS_FILE, *KEYWORD_FILES]
+    if sparse_name:
+        files.extend(SPARSE_FILES)
+    encoder = ingestor.sparse_encoder
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "collection_name": collection,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "points": len(ids),
+        "vector": {
+            "name": dense_name,
+            "size": ingestor.vector_size,
+            "dtype": "float32",
+        },
+        "sparse": (
+            {
+                "name": sparse_name,
+                **encoder.state(),
+            }
+            if sparse_name
+            else None
+        ),
+        "files": {
+            name: {"bytes": (out / name).stat().st_size, "sha256": _sha256(out / name)}
+            for name in files
+        },
+    }
+    with open(out / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    logger.info(
+        f"📦 Export {len(ids)} point của `{collection}` → {out} "
+        f"({time.perf_counter() - started:.1f}s)"
+    )
+    return manifest
+
+
+# ==========================================================
+# 🔹 Import
+# ==========================================================
+def read_manifest(path: str, verify: bool = True) -> Dict[str, Any]:
+    """Đọc manifest và (tuỳ chọn) kiểm tra kích thước + checksum của từng file."""
+    root = Path(path)
+    manifest_path = root / MANIFEST_FILE
+    if not manifest_path.exists():
+        raise SnapshotError(f"❌ Không tìm thấy {manifest_path}")
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise SnapshotError(
+            f"❌ Snapshot format {manifest.get('format_version')} không được hỗ trợ"
+        )
+    for name, meta in manifest["files"].items():
+        file_path = root / name
+        if not file_path.exists() or file_path.stat().st_size != meta["bytes"]:
+            raise SnapshotError(f"❌ File snapshot thiếu hoặc sai kích thước: {name}")
+        if verify and _sha256(file_path) != meta["sha256"]:
+            raise SnapshotError(f"❌ Sai checksum: {name}")
+    return manifest
+
+
+def _iter_payloads(
+    columns: Dict[str, List[Any]], count: int
+) -> Iterator[Dict[str, Any]]:
+    for row in range(count):
+        yield {
+            field: values[row]
+            for field, values in columns.items()
+            if values[row] is not None
+        }
+
+
+def _iter_named_vectors(
+    vectors: np.ndarray,
+    dense_name: str,
+    sparse_name: Optional[str],
+    sparse: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+) -> Iterator[Dict[str, Any]]:
+    for row in range(len(vectors)):
+        named: Dict[str, Any] = {dense_name: vectors[row].tolist()}
+        if sparse_name and sparse is not None:
+            indptr, indices, values = sparse
+            start, end = indptr[row], indptr[row + 1]
+            named[sparse_name] = SparseVector(
+                indices=indices[start:end].tolist(), values=values[start:end].tolist()
+            )
+        yield named
+
+
+def import_snapshot(
+    ingestor: Any,
+    path: str,
+    parallel: int = 4,
+    batch_size: int = 256,
+    verify: bool = True,
+) -> Dict[str, Any]:
+    """
+    Tạo lại collection của `ingestor` từ snapshot rồi bulk-load bằng
+    `upload_collection` (nhiều batch song song với Qdrant server).
+
+    Returns:
+        Dict: Manifest của snapshot đã import.
+    """
+    started = time.perf_counter()
+    root = Path(path)
+    manifest = read_manifest(path, verify=verify)
+    if manifest["vector"]["size"] != ingestor.vector_size:
+        raise SnapshotError(
+            f"❌ Snapshot có vector size {manifest['vector']['size']}, "
+            f"collection cần {ingestor.vector_size}"
+        )
+
+    sparse_meta = manifest.get("sparse")
+    ingestor.recreate_collection(sparse_vectors=bool(sparse_meta))
+    if sparse_meta:
+        ingestor.sparse_encoder.load_state(sparse_meta)
+
+    vectors = np.load(root / VECTORS_FILE, mmap_mode="r")
+    with open(root / PAYLOADS_FILE, "r", encoding="utf-8") as f:
+        payloads = json.load(f)
+
+    if ingestor.dense_vector_name:
+        sparse = (
+            tuple(np.load(root / name, mmap_mode="r") for name in SPARSE_FILES)
+            if sparse_meta
+            else None
+        )
+        vector_source: Any = _iter_named_vectors(
+            vectors, ingestor.dense_vector_name, ingestor.sparse_vector_name, sparse
+        )
+    else:
+        vector_source = vectors
+
+    ingestor.client.upload_collection(
+        collection_name=ingestor.collection_name,
+        vectors=vector_source,
+        payload=_iter_payloads(payloads["columns"], len(payloads["ids"])),
+        ids=payloads["ids"],
+        batch_size=batch_size,
+        parallel=parallel,
+        wait=True,
+    )
+    ingestor.mark_snapshot(snapshot_checksum(manifest))
+
+    logger.info(
+        f"📥 Import {manifest['points']} point vào `{ingestor.collection_name}` "
+        f"({time.perf_counter() - started:.1f}s)"
+    )
+    return manifest
+
+
+def load_keyword_index(path: str) -> CompactCorpus:
+    """
+    Đọc keyword index của snapshot thành CompactCorpus để QdrantSearcher dựng
+    BM25 mà không cần scroll + tokenize lại collection.
+    """
+    root = Path(path)
+    with open(root / PAYLOADS_FILE, "r", encoding="utf-8") as f:
+        ids = json.load(f)["ids"]
+    with open(root / KEYWORD_FILES[0], "r", encoding="utf-8") as f:
+        vocab = json.load(f)
+    return CompactCorpus.from_arrays(
+        ids,
+        vocab,
+        np.load(root / KEYWORD_FILES[1]),
+        np.load(root / KEYWORD_FILES[2]),
+    )
+
+
+def bootstrap_from_snapshot(
+    ingestor: Any, path: str, parallel: int = 4
+) -> Optional[CompactCorpus]:
+    """
+    Khởi tạo node: nếu collection đang rỗng thì import snapshot.
+
+    Collection có dữ liệu chỉ được coi là khớp snapshot khi nó được import từ
+    chính snapshot này (cùng checksum) và chưa bị ghi thêm kể từ đó.
+
+    Returns:
+        Keyword index của snapshot (dùng cho `QdrantSearcher(corpus=...)`) khi
+        collection khớp snapshot; None nếu collection đã có dữ liệu khác.
+    """
+    manifest = read_manifest(path, verify=False)
+    if ingestor.collection_size() == 0:
+        import_snapshot(ingestor, path, parallel=parallel)
+    elif ingestor.loaded_snapshot() != snapshot_checksum(manifest):
+        logger.info("ℹ️ Collection đã có dữ liệu khác snapshot, bỏ qua snapshot.")
+        return None
+    return load_keyword_index(path)
+
+
+# ==========================================================
+# 🔹 CLI
+# ==========================================================
+def main() -> None:
+    from src.utils.config import get_settings
+    from src.vector_db.client import QdrantIngestor
+    from src.vector_db.connection import get_qdrant_client
+
+    parser = argparse.ArgumentParser(description="Export / import snapshot collection")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("--path", required=True, help="Thư mục snapshot")
+    parser.add_argument("--collection", default=None)
+    parser.add_argument("--parallel", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--no-verify", action="store_true", help="Bỏ qua checksum")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    client = get_qdrant_client()
+    ingestor = QdrantIngestor(
+        client=client,
+        collection_name=args.collection or settings.COLLECTION_NAME,
+        vector_size=settings.VECTOR_SIZE,
+        device=settings.DEVICE,
+        log_name="Snapshot",
+        reset_collection=False,
+    )
+    if args.action == "export":
+        manifest = ingestor.export_snapshot(args.path)
+    else:
+        manifest = ingestor.import_snapshot(
+            args.path,
+            parallel=args.parallel,
+            batch_size=args.batch_size,
+            verify=not args.no_verify,
+        )
+    print(f"{args.action}: {manifest['points']} points ({args.path})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import hashlib
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from qdrant_client.models import SparseVector
+
+from src.utils.text_cleaner import TextCleaner
+
+
+class BM25SparseEncoder:
+    """
+    Mã hoá text thành sparse vector kiểu BM25 để lưu trong Qdrant.
+
+    - Tokenize giống keyword search trong process: `TextCleaner.clean(text).split()`.
+    - Token được ánh xạ sang index 32-bit bằng hash ổn định (không cần lưu vocabulary).
+    - Vector document chứa phần TF đã bão hoà của BM25:
+          tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+      còn IDF được Qdrant tính phía server (`Modifier.IDF`).
+    - Vector query chứa số lần xuất hiện của mỗi token trong query.
+    - Thống kê avgdl (số document, số token) được QdrantIngestor lưu trong metadata
+      của collection (`state` / `load_state`), để ingest ở process sau tiếp tục từ
+      cùng avgdl thay vì giá trị mặc định.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, avgdl: float = 256.0):
+        """
+        Args:
+            k1 (float): Tham số bão hoà TF của BM25.
+            b (float): Tham số chuẩn hoá độ dài document.
+            avgdl (float): Độ dài document trung bình (token); cập nhật bằng `fit`.
+        """
+        self.k1 = k1
+        self.b = b
+        self.avgdl = avgdl
+        self._docs = 0
+        self._tokens = 0
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return TextCleaner.clean(text).split()
+
+    @staticmethod
+    def token_index(token: str) -> int:
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest()
+        return int.from_bytes(digest, "little")
+
+    def _to_sparse(self, weights: Dict[int, float]) -> SparseVector:
+        indices = sorted(weights)
+        return SparseVector(indices=indices, values=[weights[i] for i in indices])
+
+    def fit(self, texts: List[str]) -> "BM25SparseEncoder":
+        """Cập nhật avgdl (trung bình tích luỹ qua các lần gọi) từ một batch document."""
+        self._docs += len(texts)
+        self._tokens += sum(len(self.tokenize(t)) for t in texts)
+        if self._docs:
+            self.avgdl = max(self._tokens / self._docs, 1.0)
+        return self
+
+    def state(self) -> Dict[str, Any]:
+        """Tham số và thống kê cần để encode tiếp document nhất quán."""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "docs": self._docs,
+            "tokens": self._tokens,
+            "avgdl": self.avgdl,
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> "BM25SparseEncoder":
+        """Khôi phục từ `state()` (metadata collection hoặc manifest snapshot)."""
+        self.k1 = float(state.get("k1", self.k1))
+        self.b = float(state.get("b", self.b))
+        self._docs = int(state.get("docs", 0))
+        self._tokens = int(state.get("tokens", 0))
+        self.avgdl = float(state.get("avgdl", self.avgdl))
+        return self
+
+    def encode_document(
+        self, text: str, tokens: Optional[List[str]] = None
+    ) -> SparseVector:
+        tokens = tokens if tokens is not None else self.tokenize(text)
+        dl = len(tokens)
+        norm = self.k1 * (1 - self.b + self.b * dl / self.avgdl)
+        weights: Dict[int, float] = {}
+        for token, tf in Counter(tokens).items():
+            idx = self.token_index(token)
+            weights[idx] = weights.get(idx, 0.0) + tf * (self.k1 + 1) / (tf + norm)
+        return self._to_sparse(weights)
+
+    def encode_query(self, text: str) -> SparseVector:
+        weights: Dict[int, float] = {}
+        for token, count in Counter(self.tokenize(text)).items():
+            idx = self.token_index(token)
+            weights[idx] = weights.get(idx, 0.0) + float(count)
+        return self._to_sparse(weights)
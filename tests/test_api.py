@@ -0,0 +1,155 @@
+"""
+Kiểm tra HTTP query service (src/serving/api.py) hoàn toàn trong process:
+TestClient + Qdrant in-memory + embedder hash + FakeLLMGenerator.
+"""
+
+import hashlib
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from qdrant_client import QdrantClient
+
+from src.llm.fake_llm import FakeLLMGenerator
+from src.serving.api import create_app
+from src.utils.text_cleaner import TextCleaner
+from src.vector_db.client import QdrantIngestor
+from src.vector_db.search_strategy import QdrantSearcher
+
+DIM = 16
+TEXTS = [
+    "Mô hình encoder decoder sinh chú thích cho ảnh",
+    "Attention trên đặc trưng CNN cải thiện điểm BLEU",
+    "Bộ dữ liệu gồm ảnh và câu mô tả tiếng Việt",
+    "Kết quả BLEU-4 đạt 0,27 trên tập kiểm thử",
+]
+
+
+class _HashEmbedder:
+    """Embedder tất định (hash của text), không cần model."""
+
+    def embed_query(self, text):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [b / 255.0 + 0.01 for b in digest[:DIM]]
+
+    def embed_queries(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_documents(self, chunks):
+        return self.embed_queries([c["text"] for c in chunks])
+
+
+@pytest.fixture(scope="module")
+def searcher():
+    embedder = _HashEmbedder()
+    ingestor = QdrantIngestor(
+        QdrantClient(":memory:"), "test_api", DIM, log_name="TestIngestor"
+    )
+    chunks = [
+        {"text": text, "page": page, "source": "a.pdf"}
+        for page, text in enumerate(TEXTS * 3, start=1)
+    ]
+    ingestor.upsert_to_qdrant("a.pdf", chunks, embedder.embed_documents(chunks))
+    return QdrantSearcher(
+        embedder, ingestor, "test_api", TextCleaner(), log_name="TestSearcher"
+    )
+
+
+def _fake_llm(latency_ms=0.0):
+    return FakeLLMGenerator(latency_ms=latency_ms, jitter_ms=0.0, seed=0)
+
+
+def _wait_idle(client, limiter, timeout_s=5.0):
+    """Chờ các thread còn chạy xong và trả slot (callback chạy trên event loop)."""
+    deadline = time.monotonic() + timeout_s
+    while limiter.active and time.monotonic() < deadline:
+        client.get("/health")
+        time.sleep(0.05)
+    return limiter.active
+
+
+def _events(body):
+    return [
+        line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event")
+    ]
+
+
+# ==========================================================
+# 🔹 Endpoint
+# ==========================================================
+def test_health_search_answer(searcher):
+    app = create_app(searcher, _fake_llm())
+    with TestClient(app) as client:
+        assert client.get("/health").json()["status"] == "ok"
+
+        for mode in ("semantic", "keyword", "hybrid"):
+            response = client.post(
+                "/search", json={"query": "BLEU attention", "top_k": 3, "mode": mode}
+            )
+            assert response.status_code == 200
+            assert len(response.json()["results"]) == 3
+
+        response = client.post(
+            "/search",
+            json={"query": "BLEU", "mode": "keyword", "filters": {"page_number": 2}},
+        )
+        assert [r["payload"]["page_number"] for r in response.json()["results"]] == [2]
+
+        body = client.post("/answer", json={"query": "BLEU đạt bao nhiêu?"}).json()
+        assert body["answer"] == _fake_llm().answer and body["contexts"]
+
+        stream = client.post("/answer", json={"query": "BLEU", "stream": True})
+        events = _events(stream.text)
+        assert events[0] == "contexts" and events[-1] == "done"
+        assert "token" in events
+        assert _wait_idle(client, app.state.limiter) == 0
+
+
+# ==========================================================
+# 🔹 Backpressure / timeout
+# ==========================================================
+def test_overload_returns_503(searcher):
+    app = create_app(
+        searcher, _fake_llm(latency_ms=500.0), max_concurrency=1, max_pending=0
+    )
+    limiter = app.state.limiter
+    with TestClient(app) as client:
+        slow = threading.Thread(
+            target=client.post, args=("/answer",), kwargs={"json": {"query": "BLEU"}}
+        )
+        slow.start()
+        deadline = time.monotonic() + 5.0
+        while not limiter.active and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        response = client.post("/search", json={"query": "BLEU"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+        slow.join()
+        assert _wait_idle(client, limiter) == 0
+        assert client.post("/search", json={"query": "BLEU"}).status_code == 200
+
+
+def test_timeout_returns_504_and_keeps_slot_until_done(searcher):
+    app = create_app(searcher, _fake_llm(latency_ms=600.0), request_timeout_s=0.2)
+    limiter = app.state.limiter
+    with TestClient(app) as client:
+        response = client.post("/answer", json={"query": "BLEU"})
+        assert response.status_code == 504
+        # LLM vẫn chạy trong thread: slot chưa được trả
+        assert limiter.active == 1
+        assert _wait_idle(client, limiter) == 0
+
+
+def test_stream_timeout_sends_error_and_releases_slot(searcher):
+    app = create_app(searcher, _fake_llm(latency_ms=600.0), request_timeout_s=0.2)
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        stream = client.post("/answer", json={"query": "BLEU", "stream": True})
+        assert time.perf_counter() - started < 0.6
+        events = _events(stream.text)
+        assert events[0] == "contexts" and events[-1] == "error"
+        assert "done" not in events
+        assert _wait_idle(client, app.state.limiter) == 0
@@ -0,0 +1,165 @@
+"""
+Kiểm tra backend suy luận embedding (src/embedding/backends.py).
+
+Các test chạy model thật cần một model SentenceTransformer nhỏ lưu local
+(mặc định `models/test-embedding`, đổi bằng EMBED_TEST_MODEL), VD:
+    python -c "from sentence_transformers import SentenceTransformer; \\
+        SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2').save('models/test-embedding')"
+    python -m pytest tests/test_embedding_backends.py -q
+
+Không có model / sentence-transformers / onnxruntime thì test tương ứng được skip.
+"""
+
+import logging
+import os
+
+import numpy as np
+import pytest
+
+from src.embedding.backends import (
+    PROBE_SENTENCES,
+    BackendCheckError,
+    check_backend,
+    compare_embeddings,
+    load_backend,
+)
+
+MODEL_PATH = os.getenv("EMBED_TEST_MODEL", "models/test-embedding")
+MIN_COSINE = float(os.getenv("EMBED_TEST_MIN_COSINE", "0.99"))
+LOGGER = logging.getLogger("test_embedding_backends")
+
+
+def _encode(model, texts=PROBE_SENTENCES):
+    return model.encode(
+        list(texts),
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+
+
+# ==========================================================
+# 🔹 So sánh cosine (không cần model)
+# ==========================================================
+def test_compare_embeddings_identical_and_opposite():
+    rng = np.random.default_rng(0)
+    ref = rng.normal(size=(4, 16))
+    same = compare_embeddings(ref, ref * 3.0, "int8", min_cosine=0.99)
+    assert same.passed and same.min_cosine == pytest.approx(1.0)
+
+    flipped = compare_embeddings(ref, -ref, "int8", min_cosine=0.99)
+    assert not flipped.passed and flipped.min_cosine == pytest.approx(-1.0)
+
+
+def test_compare_embeddings_shape_mismatch():
+    with pytest.raises(ValueError):
+        compare_embeddings(np.ones((2, 4)), np.ones((2, 3)), "onnx")
+
+
+# ==========================================================
+# 🔹 Fallback và kiểm tra lúc load (SentenceTransformer giả)
+# ==========================================================
+class _FakeModel:
+    def __init__(self, name, flip=False, **kwargs):
+        self.flip = flip
+        self.kwargs = kwargs
+
+    def encode(self, texts, **kwargs):
+        rng = np.random.default_rng(len(texts))
+        out = rng.normal(size=(len(texts), 8))
+        if self.flip:
+            out = -out
+        return out
+
+
+class _FakeST:
+    """Module sentence_transformers giả: backend onnx cho vector ngược dấu."""
+
+    @staticmethod
+    def SentenceTransformer(name, **kwargs):
+        return _FakeModel(name, flip=kwargs.get("backend") == "onnx", **kwargs)
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        load_backend(_FakeST, "m", "cpu", "fp16", LOGGER)
+
+
+def test_probe_check_falls_back_or_raises(monkeypatch):
+    import src.embedding.backends as backends
+
+    # Giả lập có onnxruntime để đi vào nhánh onnx
+    monkeypatch.setattr(backends, "optional_import", lambda name: object())
+    model = load_backend(_FakeST, "m", "cpu", "onnx", LOGGER, min_cosine=0.99)
+    assert model.embedding_backend == "torch"
+
+    with pytest.raises(BackendCheckError):
+        load_backend(_FakeST, "m", "cpu", "onnx", LOGGER, min_cosine=0.99, strict=True)
+
+    unchecked = load_backend(_FakeST, "m", "cpu", "onnx", LOGGER)
+    assert unchecked.embedding_backend == "onnx"
+
+
+# ==========================================================
+# 🔹 Model thật lưu local
+# ==========================================================
+@pytest.fixture(scope="module")
+def sentence_transformers():
+    module = pytest.importorskip("sentence_transformers")
+    if not os.path.isdir(MODEL_PATH):
+        pytest.skip(f"Không có model local tại {MODEL_PATH} (EMBED_TEST_MODEL)")
+    return module
+
+
+@pytest.fixture(scope="module")
+def reference(sentence_transformers):
+    model = load_backend(sentence_transformers, MODEL_PATH, "cpu", "torch", LOGGER)
+    assert model.embedding_backend == "torch"
+    return _encode(model)
+
+
+@pytest.mark.parametrize("backend", ["int8", "onnx"])
+def test_backend_matches_fp32(sentence_transformers, reference, backend):
+    if backend == "onnx":
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("optimum")
+
+    model = load_backend(sentence_transformers, MODEL_PATH, "cpu", backend, LOGGER)
+    assert model.embedding_backend == backend
+
+    vectors = _encode(model)
+    assert vectors.shape == reference.shape
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-3)
+
+    accuracy = compare_embeddings(reference, vectors, backend, MIN_COSINE)
+    assert accuracy.passed, accuracy.to_dict()
+
+
+def test_probe_check_on_real_model(sentence_transformers):
+    pytest.importorskip("torch")
+    model = load_backend(
+        sentence_transformers,
+        MODEL_PATH,
+        "cpu",
+        "int8",
+        LOGGER,
+        min_cosine=MIN_COSINE,
+    )
+    reference = load_backend(sentence_transformers, MODEL_PATH, "cpu", "torch", LOGGER)
+    assert check_backend(model, reference, MIN_COSINE).passed
+
+
+def test_model_embeddings_uses_backend(sentence_transformers):
+    from src.embedding.embedding import ModelEmbeddings
+
+    embedder = ModelEmbeddings(
+        model_name=MODEL_PATH,
+        task="retrieval.passage",
+        device="cpu",
+        log_name="TestEmbedding",
+        backend="int8",
+        verify=False,
+    )
+    vectors = embedder.embed_documents(list(PROBE_SENTENCES[:3]))
+    assert embedder.active_backend == "int8"
+    assert len(vectors) == 3 and len(set(len(v) for v in vectors)) == 1
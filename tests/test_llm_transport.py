@@ -0,0 +1,93 @@
+"""
+Kiểm tra LLMTransport với stub server chat-completions chạy local
+(src/llm/stub_server.py): retry khi 429, timeout, streaming.
+"""
+
+import pytest
+
+from src.llm.llm import BUSY_MESSAGE, LLMConfig, LLMGenerator
+from src.llm.stub_server import StubLLMServer
+from src.llm.transport import LLMTransport, LLMTransportError, RetryPolicy
+
+MESSAGES = [{"role": "user", "content": "Mô hình dùng encoder gì?"}]
+FAST_RETRY = RetryPolicy(max_retries=3, base_delay_s=0.01, max_delay_s=0.05)
+
+
+@pytest.fixture
+def stub(request):
+    options = {"latency_ms": 0.0, "retry_after_s": 0.01, "seed": 1, **request.param}
+    with StubLLMServer(**options) as server:
+        yield server
+
+
+def _transport(server, **kwargs):
+    kwargs.setdefault("retry_policy", FAST_RETRY)
+    kwargs.setdefault("timeout_s", 5.0)
+    return LLMTransport(server.base_url, "test-key", log_name="TestTransport", **kwargs)
+
+
+# ==========================================================
+# 🔹 Retry
+# ==========================================================
+@pytest.mark.parametrize("stub", [{"rate_limit_rate": 0.5}], indirect=True)
+def test_retries_on_429(stub):
+    transport = _transport(stub)
+    try:
+        assert transport.chat(MESSAGES, model="stub") == stub.answer
+    finally:
+        transport.close()
+    assert stub.requests > 1  # seed=1: request đầu tiên bị 429
+
+
+@pytest.mark.parametrize("stub", [{"rate_limit_rate": 1.0}], indirect=True)
+def test_gives_up_after_max_retries(stub):
+    transport = _transport(stub)
+    try:
+        with pytest.raises(LLMTransportError) as info:
+            transport.chat(MESSAGES, model="stub")
+    finally:
+        transport.close()
+    assert info.value.status_code == 429 and info.value.retryable
+    assert stub.requests == FAST_RETRY.max_retries + 1
+
+
+@pytest.mark.parametrize("stub", [{"latency_ms": 500.0}], indirect=True)
+def test_timeout_is_retryable(stub):
+    transport = _transport(stub, timeout_s=0.1, retry_policy=RetryPolicy(0))
+    try:
+        with pytest.raises(LLMTransportError) as info:
+            transport.chat(MESSAGES, model="stub")
+    finally:
+        transport.close()
+    assert info.value.retryable and info.value.status_code is None
+
+
+# ==========================================================
+# 🔹 Streaming
+# ==========================================================
+@pytest.mark.parametrize("stub", [{"rate_limit_rate": 0.5}], indirect=True)
+def test_stream_chat(stub):
+    transport = _transport(stub)
+    try:
+        parts = list(transport.stream_chat(MESSAGES, model="stub"))
+    finally:
+        transport.close()
+    assert len(parts) > 1
+    assert "".join(parts) == stub.answer
+
+
+@pytest.mark.parametrize("stub", [{"rate_limit_rate": 1.0}], indirect=True)
+def test_stream_answer_hides_transport_errors(stub):
+    config = LLMConfig(
+        model_name="stub",
+        temperature=0.0,
+        max_tokens=64,
+        api_key="test-key",
+        base_url=stub.base_url,
+        max_retries=0,
+    )
+    llm = LLMGenerator(config, log_name="TestLLM")
+    try:
+        assert list(llm.stream_answer("câu hỏi", [])) == [BUSY_MESSAGE]
+    finally:
+        llm.client.close()